@@ -0,0 +1,251 @@
+from typing import List
+
+CHARACTER_LORE = {
+    "brass_birmingham": {
+        "default": [
+            "Industrial entrepreneur in Victorian Birmingham during the Industrial Revolution",
+            "Focused on building canal and rail networks across the Midlands",
+            "Establishes cotton mills, coal mines, iron works, breweries, and potteries",
+            "Strategic thinker who balances short-term profits with long-term infrastructure",
+            "Competitive but recognizes value of economic cooperation",
+            "Values efficiency and careful resource management",
+            "Adapts strategy based on available transportation networks",
+            "Prioritizes industries that generate income over those that score points immediately"
+        ]
+    },
+    "gloomhaven": {
+        "brute": [
+            "Inox warrior standing over 7 feet tall with incredible physical strength",
+            "Charges into battle without hesitation, leading the front line",
+            "Impatient with complex planning, prefers direct action",
+            "Loyal to companions who prove themselves in combat",
+            "Uses massive weapons and overwhelming force",
+            "Protective of weaker party members despite gruff exterior",
+            "Dislikes magic and prefers physical solutions",
+            "Values honor and straightforward dealings"
+        ],
+        "tinkerer": [
+            "Quatryl inventor barely 3 feet tall with boundless creativity",
+            "Creates gadgets, traps, and healing devices",
+            "Analytical problem-solver who thinks several steps ahead",
+            "Cautious in combat, preferring to support from range",
+            "Curious about magical and mechanical phenomena",
+            "Patient teacher who explains complex concepts",
+            "Values knowledge and innovation over brute force",
+            "Often underestimated due to small stature"
+        ],
+        "spellweaver": [
+            "Orchid mage wielding devastating elemental magic",
+            "Calculating and precise in spell selection",
+            "Balances offensive power with defensive positioning",
+            "Values efficiency and optimal resource use",
+            "Detached and logical in emotional situations",
+            "Respects those who demonstrate tactical intelligence",
+            "Fragile physically but immensely powerful magically",
+            "Plans around elemental combinations"
+        ],
+        "scoundrel": [
+            "Human rogue skilled in stealth and deception",
+            "Opportunistic and treasure-focused",
+            "Strikes from shadows with poisoned daggers",
+            "Quick-witted and adaptable to changing situations",
+            "Distrusts authority and formal structures",
+            "Values personal freedom and independence",
+            "Willing to take risks for high rewards",
+            "Charismatic but keeps emotional distance"
+        ],
+        "ranger": [
+            "Skilled tracker and archer from wilderness regions",
+            "Patient observer who gathers information before acting",
+            "Methodical in approach to problems",
+            "Prefers ranged combat to avoid direct confrontation",
+            "Values nature and survival skills",
+            "Self-reliant and comfortable alone",
+            "Careful planner who considers all angles",
+            "Loyal once trust is established"
+        ]
+    },
+    "terraforming_mars": {
+        "Credicor": [
+            "Banking corporation focused on financial efficiency and credit systems",
+            "Conservative in spending, opportunistic in investments",
+            "Values economic dominance and market control",
+            "Patient strategy, willing to wait for optimal returns",
+            "Prefers cards that generate ongoing megacredit income",
+            "Risk-averse in early game, aggressive in late game",
+            "Builds engine before pushing terraforming parameters",
+            "Diplomatic when beneficial, competitive when necessary"
+        ],
+        "Ecoline": [
+            "Environmental specialists focused on plant life and oxygen production",
+            "Idealistic about terraforming and ecological balance",
+            "Values greenery placement and oxygen generation",
+            "Aggressive in claiming areas with plant potential",
+            "Cooperative with other green-focused corporations",
+            "Long-term thinker about planetary development",
+            "Sees Mars terraforming as environmental restoration",
+            "Willing to sacrifice short-term gains for ecological goals"
+        ],
+        "Helion": [
+            "Energy corporation specializing in heat and power production",
+            "Aggressive in development and temperature increase",
+            "Values heat resources and energy production",
+            "Quick to act and push game tempo",
+            "Competitive and willing to take risks",
+            "Focuses on temperature track for fast terraforming rating",
+            "Sees Mars as energy resource to be exploited",
+            "Direct and confrontational in playstyle"
+        ],
+        "Mining Guild": [
+            "Resource extraction specialists focused on steel and titanium",
+            "Pragmatic and focused on industrial expansion",
+            "Values asteroid and space projects",
+            "Aggressive in claiming mining rights",
+            "Builds strong production engine early",
+            "Cooperative with other industrial corporations",
+            "Sees Mars as resource cache to be mined",
+            "Efficient and cost-conscious in operations"
+        ],
+        "Tharsis Republic": [
+            "City builders focused on urban development and infrastructure",
+            "Diplomatic and values trade networks",
+            "Prefers city placement and adjacency bonuses",
+            "Balanced approach to all terraforming parameters",
+            "Cooperative and seeks mutually beneficial arrangements",
+            "Long-term planner focused on victory points",
+            "Sees Mars as future human civilization",
+            "Values stability and measured progress"
+        ]
+    },
+    "dune": {
+        "atreides": [
+            "House Atreides led by Duke Leto, noble and honorable rulers",
+            "Paul Atreides possesses prescient visions of possible futures",
+            "Values loyalty, justice, and honorable conduct",
+            "Strategic thinkers who plan multiple moves ahead",
+            "Respected for fair dealing and keeping promises",
+            "Military strength through discipline and leadership",
+            "Special ability: Prescience lets them see battle plans",
+            "Seeks to win through legitimacy and popular support"
+        ],
+        "harkonnen": [
+            "House Harkonnen led by Baron Vladimir, ruthless and treacherous",
+            "Values power and control through any means necessary",
+            "Deceptive and willing to betray alliances",
+            "Brutal military force and economic oppression",
+            "Special ability: Can use more treachery cards",
+            "Seeks to win through manipulation and force",
+            "Views honor as weakness to be exploited",
+            "Patient in planning elaborate betrayals"
+        ],
+        "emperor": [
+            "Emperor Shaddam IV backed by fearsome Sardaukar troops",
+            "Values order, control, and imperial authority",
+            "Politically shrewd and manipulative",
+            "Special ability: Sardaukar worth double strength",
+            "Balances power between other factions",
+            "Seeks to maintain imperial dominance",
+            "Uses wealth and military might",
+            "Views Arrakis as tool for controlling spice economy"
+        ],
+        "guild": [
+            "Spacing Guild controls all interstellar travel",
+            "Neutral but profit-driven merchants",
+            "Values spice above all else for navigation",
+            "Special ability: Free and unlimited shipment",
+            "Plays factions against each other for profit",
+            "Patient and willing to wait for best deals",
+            "Threatens to cut off transportation",
+            "Seeks economic victory through spice monopoly"
+        ],
+        "bene_gesserit": [
+            "Mystical sisterhood with centuries-long plans",
+            "Patient, manipulative, values long-term goals",
+            "Special ability: Voice allows forcing opponent actions",
+            "Predicts winner and turn for victory condition",
+            "Uses subtle influence over direct force",
+            "Values information and secrets",
+            "Appears weak but wields hidden power",
+            "Seeks to guide humanity evolution"
+        ],
+        "fremen": [
+            "Desert warriors native to Arrakis, masters of desert survival",
+            "Fierce, independent, and resourceful",
+            "Special ability: Free desert movement, bonus strength in storms",
+            "Values water and freedom above all",
+            "Expert guerrilla fighters",
+            "Underestimated by off-worlders",
+            "Prophesied to follow a messiah Paul",
+            "Seeks to reclaim Arrakis from oppressors"
+        ]
+    },
+    "dungeons_dragons": {
+        "fighter": [
+            "Disciplined warrior trained in martial combat and tactics",
+            "Brave and protective of allies in dangerous situations",
+            "Values honor, strength, and martial prowess",
+            "Direct problem-solver who prefers action",
+            "Loyal to companions and code of conduct",
+            "Respects worthy opponents and fair combat",
+            "Tactical thinker in battle situations",
+            "Confident in physical abilities, less so in social situations"
+        ],
+        "wizard": [
+            "Scholarly mage who studied arcane arts for years",
+            "Intellectual and cautious, values knowledge",
+            "Prefers preparation and planning over improvisation",
+            "Curious about magical phenomena and ancient lore",
+            "Physically vulnerable, relies on intelligence",
+            "Values books and research over physical training",
+            "Methodical problem-solver using magical solutions",
+            "Respects intelligence and magical skill"
+        ],
+        "rogue": [
+            "Cunning expert in stealth, traps, and deception",
+            "Opportunistic and treasure-focused",
+            "Quick-thinking and adaptable to situations",
+            "Distrusts authority and formal structures",
+            "Values personal freedom and independence",
+            "Willing to take risks for rewards",
+            "Prefers avoiding combat when possible",
+            "Loyal to proven friends despite cynical exterior"
+        ],
+        "cleric": [
+            "Divine servant channeling deity power for healing and protection",
+            "Compassionate and protective of others",
+            "Values life, healing, and supporting allies",
+            "Strategic in using limited divine magic",
+            "Strong moral compass based on deity teachings",
+            "Brave when protecting others despite fear",
+            "Diplomatic and seeks peaceful solutions",
+            "Balances offensive and defensive capabilities"
+        ],
+        "ranger": [
+            "Wilderness expert and skilled tracker",
+            "Patient observer who gathers information",
+            "Self-reliant and comfortable in isolation",
+            "Values nature and natural order",
+            "Methodical in approach to challenges",
+            "Loyal once trust is established",
+            "Prefers ranged combat and tactics",
+            "Quiet but knowledgeable about survival"
+        ]
+    },
+    "exploding_kittens": {
+        "default": [
+            "Chaotic player who embraces randomness and risk",
+            "Opportunistic and adapts quickly to changing circumstances",
+            "Values survival and creating chaos for opponents",
+            "Willing to take calculated risks with deck probabilities",
+            "Enjoys psychological warfare and bluffing",
+            "Balances aggression with self-preservation",
+            "Watches opponents behavior for tells",
+            "Strategic about when to use powerful cards"
+        ]
+    }
+}
+
+
+def get_character_lore(game_type: str, character_name: str) -> List[str]:
+    game_lore = CHARACTER_LORE.get(game_type, {})
+    return game_lore.get(character_name, game_lore.get('default', ['Generic player']))
@@ -1,5 +1,5 @@
 import google.generativeai as genai
-from typing import Dict, List
+from typing import Dict, List, Optional
 import json
 import asyncio
 
@@ -0,0 +1,124 @@
+from typing import Dict, Optional, Tuple
+import json
+import os
+import threading
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+EMBEDDINGS_FILE = 'embeddings.f32'
+INDEX_FILE = 'embeddings.index.json'
+MODELS_FILE = 'behavioral_models.json'
+
+
+# Fixed-stride float32 matrix memory-mapped read-only, so every worker process
+# shares the same page-cache copy. Rows are addressed by a JSON index keyed by
+# "<game_type>_<character>", which also holds the behavioral models so one
+# os.replace publishes both. Writers take an exclusive file lock; readers
+# reload when the index file's identity (inode, size, mtime) changes.
+class EmbeddingStore:
+    def __init__(self, directory: str, dim: int):
+        self.directory = directory
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._index = None
+        self._models = None
+        self._index_stamp = None
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _refresh(self):
+        index_path = self._path(INDEX_FILE)
+        try:
+            # A replaced index is a new inode even when mtime granularity or a
+            # copied timestamp would make the change invisible.
+            stat = os.stat(index_path)
+            stamp = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            stamp = None
+
+        if self._index is not None and stamp == self._index_stamp:
+            return
+
+        if stamp is None:
+            self._index, self._models, self._matrix = {}, {}, None
+        else:
+            with open(index_path) as f:
+                index_data = json.load(f)
+            if index_data.get('dim') != self.dim:
+                raise ValueError(f"Embedding store dimension {index_data.get('dim')} does not match {self.dim}")
+
+            if 'models' in index_data:
+                self._models = index_data['models']
+            else:
+                # Stores written before the models moved into the index.
+                with open(self._path(MODELS_FILE)) as f:
+                    self._models = json.load(f)
+
+            self._index = index_data['rows']
+            rows = len(self._index)
+            self._matrix = np.memmap(
+                self._path(EMBEDDINGS_FILE), dtype=np.float32, mode='r', shape=(rows, self.dim)
+            ) if rows else None
+
+        self._index_stamp = stamp
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, Dict]]:
+        with self._lock:
+            self._refresh()
+            row = self._index.get(key)
+            if row is None or self._matrix is None:
+                return None
+            return self._matrix[row], self._models.get(key, {})
+
+    def keys(self):
+        with self._lock:
+            self._refresh()
+            return list(self._index.keys())
+
+    def put(self, key: str, embedding: np.ndarray, behavioral_model: Dict):
+        vector = np.asarray(embedding, dtype=np.float32).reshape(self.dim)
+
+        with self._lock, open(self._path(EMBEDDINGS_FILE), 'a+b') as data_file:
+            if fcntl:
+                fcntl.flock(data_file, fcntl.LOCK_EX)
+            try:
+                self._index_stamp = None
+                self._refresh()
+
+                index = dict(self._index)
+                models = dict(self._models)
+                row = index.get(key)
+
+                if row is None:
+                    row = len(index)
+                    index[key] = row
+
+                # Rewrites happen in place so existing rows keep their offsets
+                # and concurrent readers never see a shifted matrix.
+                with open(self._path(EMBEDDINGS_FILE), 'r+b') as f:
+                    f.seek(row * self.dim * 4)
+                    f.write(vector.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                models[key] = behavioral_model
+                self._atomic_write(INDEX_FILE, {'dim': self.dim, 'rows': index, 'models': models})
+
+                self._index_stamp = None
+            finally:
+                if fcntl:
+                    fcntl.flock(data_file, fcntl.LOCK_UN)
+
+    def _atomic_write(self, name: str, data: Dict):
+        tmp_path = self._path(f"{name}.tmp.{os.getpid()}")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self._path(name))
@@ -1,14 +1,30 @@
 import google.generativeai as genai
 from typing import Dict, List
+from collections import Counter, deque
 import asyncio
 import json
+import queue
+import threading
+import time
 
 class EnhancedCharacterLearning:
-    def __init__(self, api_key: str, nano_banana_pro):
+    def __init__(self, api_key: str, nano_banana_pro, refinement_window: int = 20,
+                 refinement_interval: int = 10, refinement_alpha: float = 0.3):
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
         self.nano = nano_banana_pro
         self.character_knowledge = {}
+        # Keys whose profile is a stand-in until deep learning stores one.
+        self.provisional_profiles = set()
+        
+        self.refinement_window = refinement_window
+        self.refinement_interval = refinement_interval
+        self.refinement_alpha = refinement_alpha
+        self.pending_events = {}
+        self.refinement_queue = queue.Queue()
+        self.queued_refinements = set()
+        self.refinement_lock = threading.Lock()
+        self.refinement_worker = None
         
     async def deep_learn_character(self, game_type: str, character_name: str,
                                    source_texts: List[str]) -> Dict:
@@ -46,7 +62,9 @@ Provide comprehensive JSON analysis."""
                 character_data
             )
             
-            self.character_knowledge[f"{game_type}_{character_name}"] = character_data
+            key = f"{game_type}_{character_name}"
+            self.character_knowledge[key] = character_data
+            self.provisional_profiles.discard(key)
             
             return character_data
             
@@ -55,11 +73,18 @@ Provide comprehensive JSON analysis."""
     
     async def learn_from_gameplay(self, game_type: str, character_name: str,
                                  game_history: List[Dict]) -> Dict:
+        # Only the most recent window of events is summarized, so prompt size
+        # stays bounded no matter how long the game runs.
+        events = game_history[-self.refinement_window:]
+        if not events:
+            return {}
         
-        learning_prompt = f"""Analyze gameplay decisions for {character_name} in {game_type}:
+        summary = self._summarize_gameplay(events)
+        
+        learning_prompt = f"""Analyze recent gameplay decisions for {character_name} in {game_type}.
 
-Game History:
-{json.dumps(game_history, indent=2)}
+Feature summary of the last {len(events)} decisions:
+{json.dumps(summary, separators=(',', ':'))}
 
 Identify:
 1. Consistent decision patterns
@@ -81,9 +106,11 @@ Return refined character behavioral model as JSON."""
             
             key = f"{game_type}_{character_name}"
             if key in self.character_knowledge:
+                alpha = self.refinement_alpha * len(events) / self.refinement_window
                 self.character_knowledge[key] = self._merge_profiles(
                     self.character_knowledge[key],
-                    refined_data
+                    refined_data,
+                    alpha
                 )
             
             return refined_data
@@ -91,6 +118,55 @@ Return refined character behavioral model as JSON."""
         except Exception as e:
             return {}
     
+    def _summarize_gameplay(self, events: List[Dict]) -> Dict:
+        action_types = Counter(e.get('action_type', 'unknown') for e in events)
+        phases = Counter(e.get('phase', '') for e in events if e.get('phase'))
+        costs = [e.get('cost', 0) for e in events if isinstance(e.get('cost'), (int, float))]
+        turns = [e.get('turn', 0) for e in events]
+        
+        return {
+            'decisions': len(events),
+            'turn_span': [min(turns), max(turns)],
+            'action_types': dict(action_types.most_common()),
+            'phases': dict(phases.most_common()),
+            'mean_cost': round(sum(costs) / len(costs), 2) if costs else 0,
+            'mean_options': round(sum(e.get('options', 0) for e in events) / len(events), 2),
+            'success_rate': round(sum(1 for e in events if e.get('success')) / len(events), 2)
+        }
+    
+    def schedule_refinement(self, game_type: str, character_name: str, event: Dict):
+        key = (game_type, character_name)
+        
+        with self.refinement_lock:
+            buffer = self.pending_events.setdefault(key, deque(maxlen=self.refinement_window))
+            buffer.append(event)
+            
+            if len(buffer) < self.refinement_interval or key in self.queued_refinements:
+                return
+            
+            self.queued_refinements.add(key)
+            
+            if self.refinement_worker is None:
+                self.refinement_worker = threading.Thread(target=self._run_refinements, daemon=True)
+                self.refinement_worker.start()
+        
+        self.refinement_queue.put(key)
+    
+    def _run_refinements(self):
+        while True:
+            key = self.refinement_queue.get()
+            
+            with self.refinement_lock:
+                self.queued_refinements.discard(key)
+                events = list(self.pending_events.pop(key, []))
+            
+            if events:
+                game_type, character_name = key
+                asyncio.run(self.learn_from_gameplay(game_type, character_name, events))
+            
+            # Refinement is low priority: leave the LLM quota to live turns.
+            time.sleep(1.0)
+    
     async def simulate_character_reaction(self, game_type: str, character_name: str,
                                          situation: str) -> str:
         
@@ -169,19 +245,22 @@ How do you react? Stay completely in character. Use your signature phrases and d
         except:
             return 0.5
     
-    def _merge_profiles(self, original: Dict, new: Dict) -> Dict:
+    def _merge_profiles(self, original: Dict, new: Dict, alpha: float = 0.3) -> Dict:
         merged = original.copy()
         
         for key in ['personality', 'decision_weights']:
             if key in new:
-                if key not in merged:
-                    merged[key] = {}
+                merged[key] = dict(merged.get(key, {}))
                 for trait, value in new[key].items():
                     if trait in merged[key]:
-                        merged[key][trait] = (merged[key][trait] * 0.7 + value * 0.3)
+                        merged[key][trait] = merged[key][trait] * (1 - alpha) + value * alpha
                     else:
                         merged[key][trait] = value
         
+        for key in ['risk_tolerance', 'cooperation_level']:
+            if key in new and key in merged:
+                merged[key] = merged[key] * (1 - alpha) + new[key] * alpha
+        
         for key in ['skills', 'motivations', 'signature_phrases', 'tactical_preferences']:
             if key in new:
                 if key not in merged:
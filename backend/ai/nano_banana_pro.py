@@ -1,12 +1,58 @@
 import asyncio
-from typing import Dict, List
+import os
+from typing import Dict, List, Optional
 import numpy as np
 
+from ai.policy_model import PolicyModel
+from ai.embedding_store import EmbeddingStore
+
+EMBEDDING_DIM = 14
+
 class NanoBananaPro:
-    def __init__(self):
+    def __init__(self, policy_dir: Optional[str] = None, confidence_threshold: float = 0.6,
+                 store_dir: Optional[str] = None):
         self.character_embeddings = {}
         self.behavioral_patterns = {}
         self.decision_cache = {}
+        self.policy_models = {}
+        self.confidence_threshold = confidence_threshold
+        self.store = EmbeddingStore(store_dir, EMBEDDING_DIM) if store_dir else None
+        
+        if policy_dir:
+            self.load_policy_models(policy_dir)
+    
+    def load_policy_models(self, policy_dir: str) -> int:
+        if not os.path.isdir(policy_dir):
+            return 0
+        
+        loaded = 0
+        for filename in os.listdir(policy_dir):
+            if not filename.endswith('.npz'):
+                continue
+            
+            model = PolicyModel.load(os.path.join(policy_dir, filename))
+            if model is not None:
+                self.policy_models[filename[:-len('.npz')]] = model
+                loaded += 1
+        
+        return loaded
+    
+    def _load_character(self, key: str) -> bool:
+        if key in self.character_embeddings:
+            return True
+        
+        if self.store is None:
+            return False
+        
+        stored = self.store.get(key)
+        if stored is None:
+            return False
+        
+        self.character_embeddings[key], self.behavioral_patterns[key] = stored
+        return True
+    
+    def _get_policy_model(self, character_name: str, game_type: str) -> Optional[PolicyModel]:
+        return self.policy_models.get(f"{game_type}_{character_name}", self.policy_models.get(game_type))
         
     async def train_character_personality(self, character_name: str, 
                                          game_type: str,
@@ -19,6 +65,10 @@ class NanoBananaPro:
         behavioral_model = self._build_behavioral_model(personality_data)
         self.behavioral_patterns[key] = behavioral_model
         
+        # put takes a file lock and fsyncs; keep that off the event loop.
+        if self.store is not None:
+            await asyncio.to_thread(self.store.put, key, embedding, behavioral_model)
+        
         return {
             "character": character_name,
             "embedding_dimensions": len(embedding),
@@ -26,6 +76,12 @@ class NanoBananaPro:
             "training_complete": True
         }
     
+    def register_character(self, character_name: str, game_type: str,
+                           embedding: np.ndarray, behavioral_model: Dict):
+        key = f"{game_type}_{character_name}"
+        self.character_embeddings[key] = embedding
+        self.behavioral_patterns[key] = behavioral_model
+    
     def _create_personality_embedding(self, personality_data: Dict) -> np.ndarray:
         features = []
         
@@ -107,8 +163,22 @@ class NanoBananaPro:
                             game_context: Dict) -> Dict:
         key = f"{game_type}_{character_name}"
         
-        if key not in self.character_embeddings:
-            return available_actions[0] if available_actions else {}
+        # A policy guess below the threshold is worse evidence than the
+        # character's own behavioral model, so it only wins when confident.
+        policy = self._get_policy_model(character_name, game_type)
+        if policy is not None and available_actions:
+            prediction = self._predict_with_policy(policy, available_actions, game_context)
+            if prediction['use_local']:
+                return prediction
+        
+        if not self._load_character(key):
+            return {
+                'selected_action': available_actions[0] if available_actions else {},
+                'confidence': 0.0,
+                'alternatives': available_actions[1:4],
+                'source': 'default',
+                'use_local': False
+            }
         
         embedding = self.character_embeddings[key]
         behavioral_model = self.behavioral_patterns[key]
@@ -129,7 +199,27 @@ class NanoBananaPro:
         return {
             'selected_action': top_action,
             'confidence': action_scores[0]['score'] if action_scores else 0.0,
-            'alternatives': [a['action'] for a in action_scores[1:4]]
+            'alternatives': [a['action'] for a in action_scores[1:4]],
+            'source': 'heuristic',
+            'use_local': False
+        }
+    
+    def _predict_with_policy(self, policy: PolicyModel, available_actions: List[Dict],
+                             game_context: Dict) -> Dict:
+        probs = policy.action_probabilities(available_actions, game_context)
+        order = np.argsort(-probs)
+        # The top probability alone shrinks as the candidate list grows, so it
+        # is rescaled from the uniform baseline 1/k (0.0) to certainty (1.0);
+        # the same threshold then means the same thing for every engine.
+        baseline = 1.0 / len(probs)
+        confidence = float((probs[order[0]] - baseline) / (1.0 - baseline)) if len(probs) > 1 else 1.0
+        
+        return {
+            'selected_action': available_actions[order[0]],
+            'confidence': confidence,
+            'alternatives': [available_actions[i] for i in order[1:4]],
+            'source': 'policy',
+            'use_local': confidence >= self.confidence_threshold
         }
     
     def _score_action(self, action: Dict, behavioral_model: Dict,
@@ -176,7 +266,7 @@ class NanoBananaPro:
     def get_character_profile(self, character_name: str, game_type: str) -> Dict:
         key = f"{game_type}_{character_name}"
         
-        if key not in self.character_embeddings:
+        if not self._load_character(key):
             return {}
         
         embedding = self.character_embeddings[key]
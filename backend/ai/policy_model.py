@@ -0,0 +1,98 @@
+from typing import Dict, List, Optional
+import zlib
+import numpy as np
+
+ACTION_KEYWORDS = [
+    'attack', 'battle', 'build', 'link', 'trade', 'defend', 'shield',
+    'retreat', 'move', 'draw', 'play', 'pass', 'bid', 'collect',
+    'heal', 'cast', 'loan', 'convert'
+]
+
+TYPE_BUCKETS = 32
+PHASE_BUCKETS = 8
+
+FEATURE_DIM = TYPE_BUCKETS + len(ACTION_KEYWORDS) + 2 + PHASE_BUCKETS * len(ACTION_KEYWORDS)
+
+
+def _bucket(value: str, buckets: int) -> int:
+    return zlib.crc32(value.encode('utf-8')) % buckets
+
+
+def _numeric_cost(action: Dict) -> float:
+    cost = action.get('cost', 0)
+    try:
+        return float(cost)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def compact_action(action: Dict) -> Dict:
+    return {
+        'id': action.get('id', ''),
+        'type': action.get('type', ''),
+        'description': action.get('description', ''),
+        'cost': _numeric_cost(action)
+    }
+
+
+def featurize_action(action: Dict, context: Dict) -> np.ndarray:
+    features = np.zeros(FEATURE_DIM, dtype=np.float32)
+
+    action_type = str(action.get('type', ''))
+    features[_bucket(action_type, TYPE_BUCKETS)] = 1.0
+
+    text = f"{action_type} {action.get('id', '')} {action.get('description', '')}".lower()
+    offset = TYPE_BUCKETS
+    keyword_flags = np.array([1.0 if kw in text else 0.0 for kw in ACTION_KEYWORDS], dtype=np.float32)
+    features[offset:offset + len(ACTION_KEYWORDS)] = keyword_flags
+    offset += len(ACTION_KEYWORDS)
+
+    cost = _numeric_cost(action)
+    features[offset] = cost / 100.0
+    features[offset + 1] = 1.0 if cost > 0 else 0.0
+    offset += 2
+
+    # Context-only features cancel out under a softmax over candidates,
+    # so the phase is crossed with the action keywords instead.
+    phase = str(context.get('phase', ''))
+    phase_offset = offset + _bucket(phase, PHASE_BUCKETS) * len(ACTION_KEYWORDS)
+    features[phase_offset:phase_offset + len(ACTION_KEYWORDS)] = keyword_flags
+
+    return features
+
+
+def featurize_candidates(actions: List[Dict], context: Dict) -> np.ndarray:
+    if not actions:
+        return np.zeros((0, FEATURE_DIM), dtype=np.float32)
+    return np.stack([featurize_action(a, context) for a in actions])
+
+
+class PolicyModel:
+    def __init__(self, weights: Optional[np.ndarray] = None, trained_examples: int = 0):
+        self.weights = weights if weights is not None else np.zeros(FEATURE_DIM, dtype=np.float32)
+        self.trained_examples = trained_examples
+
+    def action_probabilities(self, actions: List[Dict], context: Dict) -> np.ndarray:
+        features = featurize_candidates(actions, context)
+        if len(features) == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        logits = features @ self.weights
+        logits -= logits.max()
+        exp = np.exp(logits)
+        return exp / exp.sum()
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            weights=self.weights,
+            feature_dim=np.array(FEATURE_DIM),
+            trained_examples=np.array(self.trained_examples)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> Optional['PolicyModel']:
+        data = np.load(path)
+        if int(data['feature_dim']) != FEATURE_DIM:
+            return None
+        return cls(data['weights'].astype(np.float32), int(data['trained_examples']))
@@ -0,0 +1,139 @@
+from typing import Dict, Iterable, List, Tuple
+import argparse
+import json
+import os
+import numpy as np
+
+from ai.policy_model import PolicyModel, compact_action, featurize_candidates, FEATURE_DIM
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def build_decision_record(character_name: str, game_state: Dict,
+                          available_actions: List[Dict], chosen_action: Dict) -> Dict:
+    candidates = [compact_action(a) for a in available_actions]
+    chosen_id = chosen_action.get('id') if chosen_action else None
+    chosen = next((i for i, a in enumerate(candidates) if a['id'] == chosen_id), -1)
+
+    return {
+        'character': character_name,
+        'phase': game_state.get('phase', ''),
+        'turn': game_state.get('turn', 0),
+        'candidates': candidates,
+        'chosen': chosen
+    }
+
+
+class PolicyTrainer:
+    def __init__(self, learning_rate: float = 0.5, l2: float = 1e-3,
+                 epochs: int = 200, min_examples: int = 20):
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.epochs = epochs
+        self.min_examples = min_examples
+
+    def collect_examples(self, decisions: Iterable[Tuple[str, Dict]]) -> Dict[str, List[Tuple[np.ndarray, int]]]:
+        examples = {}
+
+        for game_name, decision in decisions:
+            candidates = decision.get('candidates', [])
+            chosen = decision.get('chosen', -1)
+            if len(candidates) < 2 or not 0 <= chosen < len(candidates):
+                continue
+
+            features = featurize_candidates(candidates, {'phase': decision.get('phase', '')})
+            sample = (features, chosen)
+
+            # Every decision also feeds the per-game archetype model, which
+            # covers characters that have too little history of their own.
+            examples.setdefault(f"{game_name}_{decision.get('character', '')}", []).append(sample)
+            examples.setdefault(game_name, []).append(sample)
+
+        return examples
+
+    def fit(self, samples: List[Tuple[np.ndarray, int]]) -> PolicyModel:
+        weights = np.zeros(FEATURE_DIM, dtype=np.float64)
+
+        for _ in range(self.epochs):
+            gradient = np.zeros_like(weights)
+
+            for features, chosen in samples:
+                logits = features @ weights
+                logits -= logits.max()
+                probs = np.exp(logits)
+                probs /= probs.sum()
+                gradient += features.T @ probs - features[chosen]
+
+            gradient = gradient / len(samples) + self.l2 * weights
+            weights -= self.learning_rate * gradient
+
+        return PolicyModel(weights.astype(np.float32), len(samples))
+
+    def evaluate(self, model: PolicyModel, samples: List[Tuple[np.ndarray, int]]) -> float:
+        if not samples:
+            return 0.0
+        hits = sum(1 for features, chosen in samples if int(np.argmax(features @ model.weights)) == chosen)
+        return hits / len(samples)
+
+    def train_all(self, decisions: Iterable[Tuple[str, Dict]], output_dir: str) -> Dict:
+        os.makedirs(output_dir, exist_ok=True)
+        examples = self.collect_examples(decisions)
+
+        manifest = {}
+        for key, samples in examples.items():
+            if len(samples) < self.min_examples:
+                continue
+
+            model = self.fit(samples)
+            model.save(os.path.join(output_dir, f"{key}.npz"))
+
+            manifest[key] = {
+                'examples': len(samples),
+                'train_accuracy': self.evaluate(model, samples)
+            }
+
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f)
+
+        return manifest
+
+
+def load_decisions(path: str) -> List[Tuple[str, Dict]]:
+    with open(path) as f:
+        records = json.load(f)
+    return [(r['game_name'], r['decision']) for r in records]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train local NanoBananaPro policy models from logged decisions')
+    parser.add_argument('decisions', nargs='?', help='JSON file produced by GameStateDatabase.export_decisions()')
+    parser.add_argument('--database', default=os.path.join(os.getenv('DATABASE_PATH', './data'), 'game_state.db'),
+                        help='SQLite game state database to read decisions from when no JSON file is given')
+    parser.add_argument('--output', default=os.getenv('POLICY_MODEL_PATH', './data/policies'))
+    parser.add_argument('--export', metavar='PATH',
+                        help='Write the decisions in --database to a JSON file for later training, then exit')
+    parser.add_argument('--epochs', type=int, default=200)
+    parser.add_argument('--min-examples', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.export:
+        from database.game_state import GameStateDatabase
+        with open(args.export, 'w') as f:
+            f.write(GameStateDatabase(args.database).export_decisions())
+        return
+
+    trainer = PolicyTrainer(epochs=args.epochs, min_examples=args.min_examples)
+    if args.decisions:
+        decisions = load_decisions(args.decisions)
+    else:
+        from database.game_state import GameStateDatabase
+        decisions = GameStateDatabase(args.database).iter_decisions()
+
+    manifest = trainer.train_all(decisions, args.output)
+
+    for key, info in sorted(manifest.items()):
+        print(f"{key}: {info['examples']} examples, train accuracy {info['train_accuracy']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
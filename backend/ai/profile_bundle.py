@@ -0,0 +1,154 @@
+from typing import Dict, List, Optional, Set
+from datetime import datetime
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import numpy as np
+
+from ai.character_lore import CHARACTER_LORE, get_character_lore
+
+BUNDLE_VERSION = 2
+
+
+def lore_fingerprint() -> str:
+    return hashlib.sha256(json.dumps(CHARACTER_LORE, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _lore_tokens(lore: List[str]) -> Set[str]:
+    return {word for line in lore for word in line.lower().split()}
+
+
+class ProfileBundle:
+    def __init__(self, profiles: Dict[str, Dict]):
+        self.profiles = profiles
+
+    def get_entry(self, game_type: str, character_name: str) -> Optional[Dict]:
+        entry = self.profiles.get(f"{game_type}_{character_name}")
+        if entry is None and character_name not in CHARACTER_LORE.get(game_type, {}):
+            # Mirrors get_character_lore: unknown names share the game's default lore.
+            entry = self.profiles.get(f"{game_type}_default")
+
+        # Entries extracted from lore that has since been edited are stale.
+        if entry is None or entry.get('lore') != get_character_lore(game_type, character_name):
+            return None
+        return entry
+
+    def nearest_entry(self, game_type: str, character_name: str) -> Optional[Dict]:
+        tokens = _lore_tokens(get_character_lore(game_type, character_name))
+        best, best_score = None, -1.0
+
+        for entry in self.profiles.values():
+            if entry['game_type'] != game_type:
+                continue
+
+            entry_tokens = _lore_tokens(entry.get('lore', []))
+            union = tokens | entry_tokens
+            score = len(tokens & entry_tokens) / len(union) if union else 0.0
+            if score > best_score:
+                best, best_score = entry, score
+
+        return best
+
+    def hydrate(self, game_type: str, character_name: str, learning,
+                provisional: bool = False) -> Optional[Dict]:
+        entry = self.get_entry(game_type, character_name)
+        nearest = entry is None and provisional
+        if nearest:
+            entry = self.nearest_entry(game_type, character_name)
+        if entry is None:
+            return None
+
+        profile = entry['profile']
+        key = f"{game_type}_{character_name}"
+        learning.character_knowledge[key] = profile
+        if nearest:
+            learning.provisional_profiles.add(key)
+        else:
+            learning.provisional_profiles.discard(key)
+        learning.nano.register_character(
+            character_name,
+            game_type,
+            np.array(entry['embedding'], dtype=np.float32),
+            entry['behavioral_model']
+        )
+
+        return profile
+
+    @classmethod
+    def load(cls, path: str) -> Optional['ProfileBundle']:
+        if not os.path.exists(path):
+            return None
+
+        with open(path) as f:
+            data = json.load(f)
+
+        if data.get('version') != BUNDLE_VERSION:
+            return None
+
+        return cls(data['profiles'])
+
+
+async def build_profile_bundle(learning, path: str, concurrency: int = 4) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def build_entry(game_type: str, character_name: str, lore):
+        async with semaphore:
+            profile = await learning.deep_learn_character(game_type, character_name, lore)
+
+        learned = learning.nano.get_character_profile(character_name, game_type)
+        if not learned:
+            await learning.nano.train_character_personality(character_name, game_type, profile)
+            learned = learning.nano.get_character_profile(character_name, game_type)
+
+        return f"{game_type}_{character_name}", {
+            'game_type': game_type,
+            'character': character_name,
+            'lore': lore,
+            'profile': profile,
+            'embedding': learned['embedding'],
+            'behavioral_model': learned['behavioral_model']
+        }
+
+    entries = await asyncio.gather(*[
+        build_entry(game_type, character_name, lore)
+        for game_type, characters in CHARACTER_LORE.items()
+        for character_name, lore in characters.items()
+    ])
+
+    bundle = {
+        'version': BUNDLE_VERSION,
+        'lore_fingerprint': lore_fingerprint(),
+        'built_at': datetime.now().isoformat(),
+        'profiles': dict(entries)
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(bundle, f)
+    os.replace(tmp_path, path)
+
+    return bundle
+
+
+def main():
+    from ai.nano_banana_pro import NanoBananaPro
+    from ai.enhanced_character_learning import EnhancedCharacterLearning
+
+    parser = argparse.ArgumentParser(description='Extract character profiles for every lore entry into a bundle')
+    parser.add_argument('--output', default=os.getenv(
+        'PROFILE_BUNDLE_PATH', os.path.join(os.getenv('DATABASE_PATH', './data'), 'profile_bundle.json')
+    ))
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    learning = EnhancedCharacterLearning(os.getenv('GEMINI_API_KEY', ''), NanoBananaPro())
+    bundle = asyncio.run(build_profile_bundle(learning, args.output, args.concurrency))
+
+    print(f"Wrote {len(bundle['profiles'])} profiles to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,14 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
 import os
+import time
+import secrets
+import atexit
 import asyncio
 from functools import wraps
+from itertools import islice
+from typing import Dict, List
 
 from models.society_of_thought import SocietyOfThought
 from models.persona_system import PersonaSystem
@@ -17,15 +22,33 @@ from ai.enhanced_character_learning import EnhancedCharacterLearning
 from ai.character_mimicry import CharacterMimicry
 from ai.genie3_integration import Genie3Integration
 from ai.vr_scenario_generator import VRScenarioGenerator
+from ai.policy_trainer import build_decision_record
+from ai.character_lore import get_character_lore
+from ai.profile_bundle import ProfileBundle
 from utils.game_factory import GameFactory
 from database.character_profiles import CharacterProfileDatabase
 from database.game_state import GameStateDatabase
+from database.replay import replay_game
+from database.write_behind import WriteBehindQueue
+from database.hibernation import HibernatingStore
+from database.character_metrics import CharacterMetrics, RESOLUTIONS
 
 app = Flask(__name__)
 CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
 API_KEY = os.getenv("GEMINI_API_KEY", "your-api-key-here")
+DATABASE_PATH = os.getenv("DATABASE_PATH", "./data")
+PROFILE_BUNDLE_PATH = os.getenv("PROFILE_BUNDLE_PATH", os.path.join(DATABASE_PATH, "profile_bundle.json"))
+POLICY_MODEL_PATH = os.getenv("POLICY_MODEL_PATH", "./data/policies")
+POLICY_CONFIDENCE_THRESHOLD = float(os.getenv("POLICY_CONFIDENCE_THRESHOLD", 0.6))
+SEAT_INIT_CONCURRENCY = int(os.getenv("SEAT_INIT_CONCURRENCY", 6))
+HIBERNATION_PATH = os.getenv("HIBERNATION_PATH", os.path.join(DATABASE_PATH, "hibernated"))
+MAX_RESIDENT_GAMES = int(os.getenv("MAX_RESIDENT_GAMES", 500))
+GAME_IDLE_TTL = float(os.getenv("GAME_IDLE_TTL", 600))
+PERSIST_COALESCE_WINDOW = float(os.getenv("PERSIST_COALESCE_WINDOW", 0.2))
+PERSIST_FLUSH_TIMEOUT = float(os.getenv("PERSIST_FLUSH_TIMEOUT", 5))
+ACTIONS_PAGE_SIZE = int(os.getenv("ACTIONS_PAGE_SIZE", 100))
 
 society_of_thought = SocietyOfThought(API_KEY)
 persona_system = PersonaSystem(API_KEY)
@@ -35,18 +58,37 @@ gemini_controller = GeminiController(API_KEY)
 character_trainer = CharacterTrainer(API_KEY)
 decision_engine = DecisionEngine(collective_reasoning, character_trainer)
 
-nano_banana_pro = NanoBananaPro()
+nano_banana_pro = NanoBananaPro(
+    POLICY_MODEL_PATH,
+    POLICY_CONFIDENCE_THRESHOLD,
+    store_dir=os.path.join(DATABASE_PATH, "embeddings")
+)
 enhanced_learning = EnhancedCharacterLearning(API_KEY, nano_banana_pro)
 character_mimicry = CharacterMimicry(API_KEY, enhanced_learning)
+profile_bundle = ProfileBundle.load(PROFILE_BUNDLE_PATH)
 
 genie3_integration = Genie3Integration(API_KEY)
 vr_scenario_generator = VRScenarioGenerator(API_KEY, genie3_integration)
 
-character_db = CharacterProfileDatabase()
-game_state_db = GameStateDatabase()
+character_db = CharacterProfileDatabase(os.path.join(DATABASE_PATH, "character_profiles.db"))
+atexit.register(character_db.close)
+character_metrics = CharacterMetrics(os.path.join(DATABASE_PATH, "metrics.db"))
+atexit.register(character_metrics.close)
+game_state_db = GameStateDatabase(os.path.join(DATABASE_PATH, "game_state.db"))
+atexit.register(game_state_db.close)
+# Registered after the database so it drains first at exit.
+persistence = WriteBehindQueue(game_state_db, window=PERSIST_COALESCE_WINDOW)
+atexit.register(persistence.close)
 
-active_games = {}
-vr_sessions = {}
+active_games = HibernatingStore(
+    os.path.join(HIBERNATION_PATH, "games"), max_resident=MAX_RESIDENT_GAMES, idle_ttl=GAME_IDLE_TTL
+)
+vr_sessions = HibernatingStore(
+    os.path.join(HIBERNATION_PATH, "vr_sessions"), max_resident=MAX_RESIDENT_GAMES, idle_ttl=GAME_IDLE_TTL
+)
+# Resident games survive a restart by being hibernated on the way out.
+atexit.register(active_games.hibernate_all)
+atexit.register(vr_sessions.hibernate_all)
 
 def async_route(f):
     @wraps(f)
@@ -54,6 +96,13 @@ def async_route(f):
         return asyncio.run(f(*args, **kwargs))
     return wrapped
 
+def holds_game(f):
+    @wraps(f)
+    def wrapped(game_id, *args, **kwargs):
+        with active_games.pinned(game_id):
+            return f(game_id, *args, **kwargs)
+    return wrapped
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy", "service": "Intelligent Board Games API"})
@@ -80,11 +129,12 @@ async def create_game():
     data = request.json
     game_type = data.get('game_type')
     player_configs = data.get('players', [])
-    game_id = data.get('game_id', f"game_{len(active_games)}")
+    game_id = data.get('game_id') or f"game_{secrets.token_hex(8)}"
     enable_vr = data.get('enable_vr', False)
+    seed = data.get('seed', secrets.randbits(63))
     
     try:
-        game_instance = GameFactory.create_game(game_type)
+        game_instance = GameFactory.create_game(game_type, seed=seed)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     
@@ -94,321 +144,228 @@ async def create_game():
         "game_type": game_type,
         "instance": game_instance,
         "players": player_configs,
+        "seed": seed,
         "vr_enabled": enable_vr
     }
     
-    game_state_db.save_game_state(game_id, game_type, game_state)
-    
-    vr_data = None
-    if enable_vr and await genie3_integration.check_genie3_availability():
-        vr_world = await genie3_integration.create_vr_world(game_type, game_state)
+    if data.get('game_id'):
+        # A client-chosen id may name an earlier game, possibly from before a
+        # restart; its history, sequence numbers and delta base go with it.
+        persistence.submit(game_state_db.delete_game, game_id)
+    persistence.start_action_log(game_id, game_type, seed, player_configs, game_instance.RULES_VERSION)
+    persistence.save(game_id, game_type, game_instance.get_game_state())
+    
+    # Every AI seat starts from a bundled, previously learned, nearest-neighbor
+    # or default profile; learning and VR assets finish in the background.
+    pending_seats = []
+    seat_perspectives = {}
+    for idx, character_name in _ai_seats(game_id):
+        character_data, final = _provisional_profile(game_type, character_name)
+        seat_perspectives[idx] = _register_ai_seat(game_type, character_name, character_data)
         
-        board_layout = await vr_scenario_generator.generate_board_layout_3d(
+        if not final:
+            pending_seats.append((idx, character_name))
+    
+    profiles_ready = not pending_seats and not enable_vr
+    active_games[game_id]["profiles_ready"] = profiles_ready
+    
+    if not profiles_ready:
+        socketio.start_background_task(
+            _hydrate_game_in_background,
+            game_id,
             game_type,
-            game_state.get('board', {})
+            game_state,
+            pending_seats,
+            seat_perspectives,
+            enable_vr
+        )
+    
+    return jsonify({
+        "game_id": game_id,
+        "game_state": game_state,
+        "vr_data": None,
+        "profiles_ready": profiles_ready,
+        "pending_seats": [idx for idx, _ in pending_seats],
+        "message": "Game created successfully"
+    })
+
+def _provisional_profile(game_type: str, character_name: str):
+    if profile_bundle:
+        character_data = profile_bundle.hydrate(game_type, character_name, enhanced_learning)
+        if character_data is not None:
+            return character_data, True
+    
+    # A stand-in stored by an earlier game is reused, but still reported as
+    # provisional so this game learns the real profile.
+    key = f"{game_type}_{character_name}"
+    if key in enhanced_learning.character_knowledge:
+        return enhanced_learning.character_knowledge[key], key not in enhanced_learning.provisional_profiles
+    
+    if profile_bundle:
+        character_data = profile_bundle.hydrate(game_type, character_name, enhanced_learning, provisional=True)
+        if character_data is not None:
+            return character_data, False
+    
+    character_data = enhanced_learning._get_default_character_profile()
+    enhanced_learning.character_knowledge[key] = character_data
+    enhanced_learning.provisional_profiles.add(key)
+    return character_data, False
+
+def _hydrate_game_in_background(game_id: str, game_type: str, game_state: Dict,
+                                pending_seats: List, seat_perspectives: Dict, enable_vr: bool):
+    with active_games.pinned(game_id):
+        asyncio.run(_hydrate_game(game_id, game_type, game_state, pending_seats, seat_perspectives, enable_vr))
+
+async def _hydrate_game(game_id: str, game_type: str, game_state: Dict,
+                        pending_seats: List, seat_perspectives: Dict, enable_vr: bool):
+    started = time.perf_counter()
+    
+    # Clients wait for one of these two events, so a failed LLM or learning
+    # call must still end in profiles_failed. Seats keep their provisional
+    # profile, which the next game that uses them learns again.
+    try:
+        vr_data, seat_timings = await _hydrate_seats_and_vr(
+            game_id, game_type, game_state, pending_seats, seat_perspectives, enable_vr
         )
+    except Exception as e:
+        if game_id in active_games:
+            active_games[game_id]["profiles_error"] = str(e)
+        
+        socketio.emit('profiles_failed', {
+            "game_id": game_id,
+            "error": str(e),
+            "total_ms": round((time.perf_counter() - started) * 1000, 2)
+        }, room=game_id)
+        return
+    
+    if game_id in active_games:
+        active_games[game_id]["profiles_ready"] = True
+    
+    socketio.emit('profiles_ready', {
+        "game_id": game_id,
+        "vr_data": vr_data,
+        "seat_timings": seat_timings,
+        "total_ms": round((time.perf_counter() - started) * 1000, 2)
+    }, room=game_id)
+
+async def _hydrate_seats_and_vr(game_id: str, game_type: str, game_state: Dict,
+                                pending_seats: List, seat_perspectives: Dict, enable_vr: bool):
+    vr_available = enable_vr and await genie3_integration.check_genie3_availability()
+    semaphore = asyncio.Semaphore(SEAT_INIT_CONCURRENCY)
+    
+    vr_results, seats = await asyncio.gather(
+        _initialize_vr_world(game_type, game_state, vr_available),
+        asyncio.gather(*[
+            _initialize_ai_seat(game_type, idx, character_name, semaphore)
+            for idx, character_name in pending_seats
+        ])
+    )
+    
+    for seat in seats:
+        _refine_ai_seat(game_type, seat, seat_perspectives[seat['timing']['player_index']])
+    
+    vr_data = None
+    if vr_available:
+        vr_world, board_layout = vr_results
+        vr_characters = await asyncio.gather(*[
+            genie3_integration.create_vr_character(
+                game_type,
+                character_name,
+                enhanced_learning.character_knowledge.get(f"{game_type}_{character_name}", {})
+            )
+            for _, character_name in _ai_seats(game_id)
+        ])
         
         vr_data = {
             'world': vr_world,
             'board_layout': board_layout,
-            'characters': [],
+            'characters': [c for c in vr_characters if c],
             'assets': []
         }
-    
-    for idx, config in enumerate(player_configs):
-        if config.get('is_ai', False):
-            character_name = config.get('character', config.get('name'))
-            
-            source_material = await _get_detailed_character_lore(game_type, character_name)
-            
-            character_data = await enhanced_learning.deep_learn_character(
-                game_type,
-                character_name,
-                source_material
-            )
-            
-            persona_system.create_character_persona(character_name, character_data)
-            
-            society_of_thought.create_perspective(
-                personality_traits=character_data['personality'],
-                expertise=character_data.get('tactical_preferences', ['general'])[0] if character_data.get('tactical_preferences') else 'general',
-                role='primary'
-            )
-            
-            character_db.store_character_profile(game_type, character_name, character_data)
-            
-            if enable_vr and vr_data:
-                vr_character = await genie3_integration.create_vr_character(
-                    game_type,
-                    character_name,
-                    character_data
-                )
-                
-                if vr_character:
-                    vr_data['characters'].append(vr_character)
-    
-    if vr_data:
         vr_sessions[game_id] = vr_data
     
-    return jsonify({
-        "game_id": game_id,
-        "game_state": game_state,
-        "vr_data": vr_data,
-        "message": "Game created successfully"
-    })
+    return vr_data, [seat['timing'] for seat in seats]
 
-async def _get_detailed_character_lore(game_type: str, character_name: str):
-    lore_database = {
-        "brass_birmingham": {
-            "default": [
-                "Industrial entrepreneur in Victorian Birmingham during the Industrial Revolution",
-                "Focused on building canal and rail networks across the Midlands",
-                "Establishes cotton mills, coal mines, iron works, breweries, and potteries",
-                "Strategic thinker who balances short-term profits with long-term infrastructure",
-                "Competitive but recognizes value of economic cooperation",
-                "Values efficiency and careful resource management",
-                "Adapts strategy based on available transportation networks",
-                "Prioritizes industries that generate income over those that score points immediately"
-            ]
-        },
-        "gloomhaven": {
-            "brute": [
-                "Inox warrior standing over 7 feet tall with incredible physical strength",
-                "Charges into battle without hesitation, leading the front line",
-                "Impatient with complex planning, prefers direct action",
-                "Loyal to companions who prove themselves in combat",
-                "Uses massive weapons and overwhelming force",
-                "Protective of weaker party members despite gruff exterior",
-                "Dislikes magic and prefers physical solutions",
-                "Values honor and straightforward dealings"
-            ],
-            "tinkerer": [
-                "Quatryl inventor barely 3 feet tall with boundless creativity",
-                "Creates gadgets, traps, and healing devices",
-                "Analytical problem-solver who thinks several steps ahead",
-                "Cautious in combat, preferring to support from range",
-                "Curious about magical and mechanical phenomena",
-                "Patient teacher who explains complex concepts",
-                "Values knowledge and innovation over brute force",
-                "Often underestimated due to small stature"
-            ],
-            "spellweaver": [
-                "Orchid mage wielding devastating elemental magic",
-                "Calculating and precise in spell selection",
-                "Balances offensive power with defensive positioning",
-                "Values efficiency and optimal resource use",
-                "Detached and logical in emotional situations",
-                "Respects those who demonstrate tactical intelligence",
-                "Fragile physically but immensely powerful magically",
-                "Plans around elemental combinations"
-            ],
-            "scoundrel": [
-                "Human rogue skilled in stealth and deception",
-                "Opportunistic and treasure-focused",
-                "Strikes from shadows with poisoned daggers",
-                "Quick-witted and adaptable to changing situations",
-                "Distrusts authority and formal structures",
-                "Values personal freedom and independence",
-                "Willing to take risks for high rewards",
-                "Charismatic but keeps emotional distance"
-            ],
-            "ranger": [
-                "Skilled tracker and archer from wilderness regions",
-                "Patient observer who gathers information before acting",
-                "Methodical in approach to problems",
-                "Prefers ranged combat to avoid direct confrontation",
-                "Values nature and survival skills",
-                "Self-reliant and comfortable alone",
-                "Careful planner who considers all angles",
-                "Loyal once trust is established"
-            ]
-        },
-        "terraforming_mars": {
-            "Credicor": [
-                "Banking corporation focused on financial efficiency and credit systems",
-                "Conservative in spending, opportunistic in investments",
-                "Values economic dominance and market control",
-                "Patient strategy, willing to wait for optimal returns",
-                "Prefers cards that generate ongoing megacredit income",
-                "Risk-averse in early game, aggressive in late game",
-                "Builds engine before pushing terraforming parameters",
-                "Diplomatic when beneficial, competitive when necessary"
-            ],
-            "Ecoline": [
-                "Environmental specialists focused on plant life and oxygen production",
-                "Idealistic about terraforming and ecological balance",
-                "Values greenery placement and oxygen generation",
-                "Aggressive in claiming areas with plant potential",
-                "Cooperative with other green-focused corporations",
-                "Long-term thinker about planetary development",
-                "Sees Mars terraforming as environmental restoration",
-                "Willing to sacrifice short-term gains for ecological goals"
-            ],
-            "Helion": [
-                "Energy corporation specializing in heat and power production",
-                "Aggressive in development and temperature increase",
-                "Values heat resources and energy production",
-                "Quick to act and push game tempo",
-                "Competitive and willing to take risks",
-                "Focuses on temperature track for fast terraforming rating",
-                "Sees Mars as energy resource to be exploited",
-                "Direct and confrontational in playstyle"
-            ],
-            "Mining Guild": [
-                "Resource extraction specialists focused on steel and titanium",
-                "Pragmatic and focused on industrial expansion",
-                "Values asteroid and space projects",
-                "Aggressive in claiming mining rights",
-                "Builds strong production engine early",
-                "Cooperative with other industrial corporations",
-                "Sees Mars as resource cache to be mined",
-                "Efficient and cost-conscious in operations"
-            ],
-            "Tharsis Republic": [
-                "City builders focused on urban development and infrastructure",
-                "Diplomatic and values trade networks",
-                "Prefers city placement and adjacency bonuses",
-                "Balanced approach to all terraforming parameters",
-                "Cooperative and seeks mutually beneficial arrangements",
-                "Long-term planner focused on victory points",
-                "Sees Mars as future human civilization",
-                "Values stability and measured progress"
-            ]
-        },
-        "dune": {
-            "atreides": [
-                "House Atreides led by Duke Leto, noble and honorable rulers",
-                "Paul Atreides possesses prescient visions of possible futures",
-                "Values loyalty, justice, and honorable conduct",
-                "Strategic thinkers who plan multiple moves ahead",
-                "Respected for fair dealing and keeping promises",
-                "Military strength through discipline and leadership",
-                "Special ability: Prescience lets them see battle plans",
-                "Seeks to win through legitimacy and popular support"
-            ],
-            "harkonnen": [
-                "House Harkonnen led by Baron Vladimir, ruthless and treacherous",
-                "Values power and control through any means necessary",
-                "Deceptive and willing to betray alliances",
-                "Brutal military force and economic oppression",
-                "Special ability: Can use more treachery cards",
-                "Seeks to win through manipulation and force",
-                "Views honor as weakness to be exploited",
-                "Patient in planning elaborate betrayals"
-            ],
-            "emperor": [
-                "Emperor Shaddam IV backed by fearsome Sardaukar troops",
-                "Values order, control, and imperial authority",
-                "Politically shrewd and manipulative",
-                "Special ability: Sardaukar worth double strength",
-                "Balances power between other factions",
-                "Seeks to maintain imperial dominance",
-                "Uses wealth and military might",
-                "Views Arrakis as tool for controlling spice economy"
-            ],
-            "guild": [
-                "Spacing Guild controls all interstellar travel",
-                "Neutral but profit-driven merchants",
-                "Values spice above all else for navigation",
-                "Special ability: Free and unlimited shipment",
-                "Plays factions against each other for profit",
-                "Patient and willing to wait for best deals",
-                "Threatens to cut off transportation",
-                "Seeks economic victory through spice monopoly"
-            ],
-            "bene_gesserit": [
-                "Mystical sisterhood with centuries-long plans",
-                "Patient, manipulative, values long-term goals",
-                "Special ability: Voice allows forcing opponent actions",
-                "Predicts winner and turn for victory condition",
-                "Uses subtle influence over direct force",
-                "Values information and secrets",
-                "Appears weak but wields hidden power",
-                "Seeks to guide humanity evolution"
-            ],
-            "fremen": [
-                "Desert warriors native to Arrakis, masters of desert survival",
-                "Fierce, independent, and resourceful",
-                "Special ability: Free desert movement, bonus strength in storms",
-                "Values water and freedom above all",
-                "Expert guerrilla fighters",
-                "Underestimated by off-worlders",
-                "Prophesied to follow a messiah Paul",
-                "Seeks to reclaim Arrakis from oppressors"
-            ]
-        },
-        "dungeons_dragons": {
-            "fighter": [
-                "Disciplined warrior trained in martial combat and tactics",
-                "Brave and protective of allies in dangerous situations",
-                "Values honor, strength, and martial prowess",
-                "Direct problem-solver who prefers action",
-                "Loyal to companions and code of conduct",
-                "Respects worthy opponents and fair combat",
-                "Tactical thinker in battle situations",
-                "Confident in physical abilities, less so in social situations"
-            ],
-            "wizard": [
-                "Scholarly mage who studied arcane arts for years",
-                "Intellectual and cautious, values knowledge",
-                "Prefers preparation and planning over improvisation",
-                "Curious about magical phenomena and ancient lore",
-                "Physically vulnerable, relies on intelligence",
-                "Values books and research over physical training",
-                "Methodical problem-solver using magical solutions",
-                "Respects intelligence and magical skill"
-            ],
-            "rogue": [
-                "Cunning expert in stealth, traps, and deception",
-                "Opportunistic and treasure-focused",
-                "Quick-thinking and adaptable to situations",
-                "Distrusts authority and formal structures",
-                "Values personal freedom and independence",
-                "Willing to take risks for rewards",
-                "Prefers avoiding combat when possible",
-                "Loyal to proven friends despite cynical exterior"
-            ],
-            "cleric": [
-                "Divine servant channeling deity power for healing and protection",
-                "Compassionate and protective of others",
-                "Values life, healing, and supporting allies",
-                "Strategic in using limited divine magic",
-                "Strong moral compass based on deity teachings",
-                "Brave when protecting others despite fear",
-                "Diplomatic and seeks peaceful solutions",
-                "Balances offensive and defensive capabilities"
-            ],
-            "ranger": [
-                "Wilderness expert and skilled tracker",
-                "Patient observer who gathers information",
-                "Self-reliant and comfortable in isolation",
-                "Values nature and natural order",
-                "Methodical in approach to challenges",
-                "Loyal once trust is established",
-                "Prefers ranged combat and tactics",
-                "Quiet but knowledgeable about survival"
-            ]
-        },
-        "exploding_kittens": {
-            "default": [
-                "Chaotic player who embraces randomness and risk",
-                "Opportunistic and adapts quickly to changing circumstances",
-                "Values survival and creating chaos for opponents",
-                "Willing to take calculated risks with deck probabilities",
-                "Enjoys psychological warfare and bluffing",
-                "Balances aggression with self-preservation",
-                "Watches opponents behavior for tells",
-                "Strategic about when to use powerful cards"
-            ]
+def _ai_seats(game_id: str) -> List:
+    game_data = active_games.get(game_id, {})
+    return [
+        (idx, config.get('character', config.get('name')))
+        for idx, config in enumerate(game_data.get("players", []))
+        if config.get('is_ai', False)
+    ]
+
+async def _initialize_vr_world(game_type: str, game_state: Dict, vr_available: bool):
+    if not vr_available:
+        return None
+    
+    return await asyncio.gather(
+        genie3_integration.create_vr_world(game_type, game_state),
+        vr_scenario_generator.generate_board_layout_3d(game_type, game_state.get('board', {}))
+    )
+
+async def _initialize_ai_seat(game_type: str, player_index: int, character_name: str,
+                              semaphore: asyncio.Semaphore) -> Dict:
+    started = time.perf_counter()
+    
+    async with semaphore:
+        waited = time.perf_counter()
+        
+        source_material = await _get_detailed_character_lore(game_type, character_name)
+        
+        character_data = await enhanced_learning.deep_learn_character(
+            game_type,
+            character_name,
+            source_material
+        )
+        
+        finished = time.perf_counter()
+    
+    return {
+        "character": character_name,
+        "character_data": character_data,
+        "timing": {
+            "player_index": player_index,
+            "character": character_name,
+            "queued_ms": round((waited - started) * 1000, 2),
+            "profile_ms": round((finished - waited) * 1000, 2),
+            "total_ms": round((finished - started) * 1000, 2)
         }
     }
+
+def _register_ai_seat(game_type: str, character_name: str, character_data: Dict) -> Dict:
+    persona_system.create_character_persona(character_name, character_data)
+    
+    perspective = society_of_thought.create_perspective(
+        personality_traits=character_data['personality'],
+        expertise=_primary_expertise(character_data),
+        role='primary'
+    )
+    
+    persistence.submit(character_db.store_character_profile, game_type, character_name, character_data)
+    
+    return perspective
+
+def _refine_ai_seat(game_type: str, seat: Dict, perspective: Dict):
+    character_name = seat['character']
+    character_data = seat['character_data']
     
-    game_lore = lore_database.get(game_type, {})
-    character_lore = game_lore.get(character_name, game_lore.get('default', ['Generic player']))
+    persona_system.create_character_persona(character_name, character_data)
     
-    return character_lore
+    # The seat's perspective was created from the provisional profile; update
+    # it in place rather than adding a second one to the society.
+    perspective['personality'].update(character_data['personality'])
+    perspective['expertise'] = _primary_expertise(character_data)
+    
+    persistence.submit(character_db.store_character_profile, game_type, character_name, character_data)
+
+def _primary_expertise(character_data: Dict) -> str:
+    return character_data.get('tactical_preferences', ['general'])[0] if character_data.get('tactical_preferences') else 'general'
+
+async def _get_detailed_character_lore(game_type: str, character_name: str):
+    return get_character_lore(game_type, character_name)
 
 @app.route('/api/games/<game_id>/vr/update', methods=['POST'])
+@holds_game
 @async_route
 async def update_vr_world(game_id):
     if game_id not in active_games:
@@ -435,6 +392,7 @@ async def update_vr_world(game_id):
     return jsonify({"success": success})
 
 @app.route('/api/games/<game_id>/vr/session', methods=['GET'])
+@holds_game
 def get_vr_session(game_id):
     if game_id not in active_games:
         return jsonify({"error": "Game not found"}), 404
@@ -451,11 +409,13 @@ def get_vr_session(game_id):
     })
 
 @app.route('/api/games/<game_id>/ai_turn', methods=['POST'])
+@holds_game
 @async_route
 async def execute_ai_turn(game_id):
     if game_id not in active_games:
         return jsonify({"error": "Game not found"}), 404
     
+    started = time.perf_counter()
     data = request.json
     ai_player_id = data.get('player_id')
     
@@ -464,18 +424,11 @@ async def execute_ai_turn(game_id):
     game_type = game_data["game_type"]
     
     game_state = game_instance.get_game_state()
-    available_actions = game_instance.get_available_actions(ai_player_id)
+    available_actions = game_instance.legal_actions(ai_player_id)
     
     player_config = game_data["players"][ai_player_id]
     character_name = player_config.get('character', player_config.get('name'))
     
-    mimic_decision = await character_mimicry.mimic_character_decision(
-        game_type,
-        character_name,
-        game_state,
-        available_actions
-    )
-    
     nano_prediction = await nano_banana_pro.predict_action(
         character_name,
         game_type,
@@ -483,30 +436,75 @@ async def execute_ai_turn(game_id):
         game_state
     )
     
-    society_decision = await decision_engine.process_turn(
-        game_name=game_type,
-        game_state=game_state,
-        ai_character=character_name,
-        available_actions=available_actions
-    )
-    
-    final_action = mimic_decision.get('action')
-    
-    result = game_instance.execute_action(ai_player_id, final_action)
-    
-    if result.get('success'):
-        new_state = game_instance.get_game_state()
-        game_state_db.save_game_state(game_id, game_type, new_state)
-        
-        character_db.update_performance_metrics(
+    # Confident local policy predictions answer the turn without calling out
+    # to the LLM; everything else goes through the full mimicry pipeline.
+    if nano_prediction.get('use_local'):
+        mimic_decision = {
+            'action': nano_prediction.get('selected_action'),
+            'reasoning': 'Local policy model prediction',
+            'confidence': nano_prediction.get('confidence')
+        }
+        society_decision = {}
+        decision_record = None
+    else:
+        mimic_decision = await character_mimicry.mimic_character_decision(
             game_type,
             character_name,
-            {
-                "decisions_made": 1,
-                "successful_outcomes": 1
-            }
+            game_state,
+            available_actions
         )
         
+        society_decision = await decision_engine.process_turn(
+            game_name=game_type,
+            game_state=game_state,
+            ai_character=character_name,
+            available_actions=available_actions
+        )
+        
+        decision_record = build_decision_record(
+            character_name,
+            game_state,
+            available_actions,
+            mimic_decision.get('action')
+        )
+    
+    chosen_id = (mimic_decision.get('action') or {}).get('id')
+    
+    with persistence.game_lock(game_id):
+        # Another request may have moved the game on while the AI was thinking.
+        final_action = game_instance.resolve_action(ai_player_id, chosen_id)
+        if final_action is None:
+            result = {"success": False, "error": "Action not available"}
+        else:
+            persistence.record_action(game_id, ai_player_id, final_action, decision=decision_record)
+            result = game_instance.execute_action(ai_player_id, final_action)
+            if result.get('success'):
+                new_state = game_instance.get_game_state()
+                persistence.save(game_id, game_type, new_state)
+    
+    character_metrics.record(
+        game_type, character_name, bool(result.get('success')), (time.perf_counter() - started) * 1000
+    )
+    persistence.submit(
+        character_db.update_performance_metrics,
+        game_type,
+        character_name,
+        {
+            "decisions_made": 1,
+            "successful_outcomes": 1 if result.get('success') else 0
+        }
+    )
+    
+    enhanced_learning.schedule_refinement(game_type, character_name, {
+        "turn": game_state.get('turn', 0),
+        "phase": game_state.get('phase', ''),
+        "action_type": (final_action or {}).get('type', 'unknown'),
+        "cost": (final_action or {}).get('cost', 0),
+        "options": len(available_actions),
+        "success": bool(result.get('success'))
+    })
+    
+    if result.get('success'):
         dialogue = await character_mimicry.generate_character_dialogue(
             game_type,
             character_name,
@@ -540,6 +538,7 @@ async def execute_ai_turn(game_id):
     })
 
 @app.route('/api/games/<game_id>/state', methods=['GET'])
+@holds_game
 def get_game_state(game_id):
     if game_id not in active_games:
         return jsonify({"error": "Game not found"}), 404
@@ -549,19 +548,80 @@ def get_game_state(game_id):
     
     return jsonify(state)
 
+@app.route('/api/games/<game_id>/region', methods=['GET'])
+@holds_game
+def get_board_region(game_id):
+    if game_id not in active_games:
+        return jsonify({"error": "Game not found"}), 404
+    
+    game_instance = active_games[game_id]["instance"]
+    if not hasattr(game_instance, 'get_region'):
+        return jsonify({"error": "Game has no board regions"}), 400
+    
+    try:
+        x, y = int(request.args.get('x', 0)), int(request.args.get('y', 0))
+        width = int(request.args.get('width', 32))
+        height = int(request.args.get('height', 32))
+    except ValueError:
+        return jsonify({"error": "Invalid region"}), 400
+    
+    # Cap the cells materialised per request
+    width, height = max(0, min(width, 256)), max(0, min(height, 256))
+    return jsonify(game_instance.get_region(x, y, width, height))
+
 @app.route('/api/games/<game_id>/actions', methods=['GET'])
+@holds_game
 def get_available_actions(game_id):
     if game_id not in active_games:
         return jsonify({"error": "Game not found"}), 404
     
-    player_id = int(request.args.get('player_id', 0))
+    try:
+        player_id = int(request.args.get('player_id', 0))
+        limit = request.args.get('limit')
+        page_size = max(1, min(int(limit or ACTIONS_PAGE_SIZE), 1000))
+    except ValueError:
+        return jsonify({"error": "player_id and limit must be integers"}), 400
+    
+    action_type = request.args.get('type')
+    cursor = request.args.get('cursor')
     
     game_instance = active_games[game_id]["instance"]
-    actions = game_instance.get_available_actions(player_id)
+    version = game_instance.state_version
+    
+    if request.args.get('view') == 'families':
+        families = [
+            family.describe() for family in game_instance.action_families(player_id)
+            if action_type in (None, family.action_type)
+        ]
+        return jsonify({"families": families, "state_version": version})
+    
+    if cursor is None and limit is None and action_type is None:
+        return jsonify({"actions": game_instance.legal_actions(player_id), "state_version": version})
+    
+    # Cursors are "<state_version>:<offset>" and only valid while the game
+    # has not moved on.
+    start = 0
+    if cursor:
+        try:
+            cursor_version, offset = (int(part) for part in cursor.split(':'))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        if offset < 0:
+            return jsonify({"error": "Invalid cursor"}), 400
+        if cursor_version != version:
+            return jsonify({"error": "Game state changed; restart from the first page", "state_version": version}), 409
+        start = offset
+    
+    page = list(islice(game_instance.iter_actions(player_id, action_type, start), page_size + 1))
     
-    return jsonify({"actions": actions})
+    return jsonify({
+        "actions": page[:page_size],
+        "state_version": version,
+        "next_cursor": f"{version}:{start + page_size}" if len(page) > page_size else None
+    })
 
 @app.route('/api/games/<game_id>/execute', methods=['POST'])
+@holds_game
 @async_route
 async def execute_action(game_id):
     if game_id not in active_games:
@@ -569,17 +629,30 @@ async def execute_action(game_id):
     
     data = request.json
     player_id = data.get('player_id')
-    action = data.get('action')
+    # Only the id is taken from the client; the action itself (and its cost)
+    # always comes from the engine's current legal set.
+    action_id = data.get('action_id') or (data.get('action') or {}).get('id')
     
     game_data = active_games[game_id]
     game_instance = game_data["instance"]
     
-    result = game_instance.execute_action(player_id, action)
+    with persistence.game_lock(game_id):
+        action = game_instance.resolve_action(player_id, action_id)
+        if action is None:
+            return jsonify({
+                "success": False,
+                "error": "Action not available",
+                "state_version": game_instance.state_version
+            }), 409
+        
+        persistence.record_action(game_id, player_id, action)
+        result = game_instance.execute_action(player_id, action)
+        state_version = game_instance.state_version
+        if result.get('success'):
+            new_state = game_instance.get_game_state()
+            persistence.save(game_id, game_data["game_type"], new_state)
     
     if result.get('success'):
-        new_state = game_instance.get_game_state()
-        game_state_db.save_game_state(game_id, game_data["game_type"], new_state)
-        
         if game_data.get('vr_enabled'):
             await genie3_integration.update_vr_world_state(
                 game_data["game_type"],
@@ -592,7 +665,60 @@ async def execute_action(game_id):
             "last_action": result
         }, room=game_id)
     
-    return jsonify(result)
+    return jsonify({**result, "state_version": state_version})
+
+@app.route('/api/metrics/games', methods=['GET'])
+def get_game_residency_metrics():
+    return jsonify({
+        "games": active_games.stats(),
+        "vr_sessions": vr_sessions.stats()
+    })
+
+@app.route('/api/metrics/characters', methods=['GET'])
+def get_character_metrics():
+    resolution = request.args.get('resolution', 'minute')
+    if resolution not in RESOLUTIONS:
+        return jsonify({"error": f"resolution must be one of {sorted(RESOLUTIONS)}"}), 400
+    
+    window = request.args.get('window', '60')
+    if not window.isdigit() or int(window) < 1:
+        return jsonify({"error": "window must be a positive integer"}), 400
+    
+    characters = character_metrics.query(
+        resolution=resolution,
+        window=int(window),
+        game_type=request.args.get('game_type'),
+        character_name=request.args.get('character'),
+        series=request.args.get('series', 'false').lower() == 'true'
+    )
+    
+    return jsonify({"resolution": resolution, "characters": characters})
+
+@app.route('/api/decisions/export', methods=['GET'])
+def export_decisions():
+    # Training input for ai.policy_trainer; pending writes are flushed
+    # first so the export includes the latest AI turns.
+    if not persistence.flush(PERSIST_FLUSH_TIMEOUT):
+        return jsonify({"error": "Pending writes did not finish in time"}), 503
+    return Response(game_state_db.export_decisions(request.args.get('game_name')), mimetype='application/json')
+
+@app.route('/api/games/<game_id>/replay', methods=['GET'])
+def replay_game_state(game_id):
+    upto = request.args.get('upto')
+    if upto is not None and not upto.isdigit():
+        return jsonify({"error": "upto must be a non-negative integer"}), 400
+    
+    if not persistence.flush(PERSIST_FLUSH_TIMEOUT):
+        return jsonify({"error": "Pending writes did not finish in time"}), 503
+    try:
+        game_instance = replay_game(game_state_db, game_id, int(upto) if upto is not None else None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    
+    if game_instance is None:
+        return jsonify({"error": "Game not found"}), 404
+    
+    return jsonify(game_instance.get_game_state())
 
 @socketio.on('join_game')
 def handle_join_game(data):
@@ -0,0 +1,266 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+# Latency histogram with log-spaced buckets (ratio 1.3 from 1 ms up to about
+# five minutes), so histograms from any number of buckets merge by addition.
+HISTOGRAM_RATIO = 1.3
+HISTOGRAM_BUCKETS = 48
+
+MINUTE = 60
+HOUR = 3600
+RESOLUTIONS = {"minute": MINUTE, "hour": HOUR}
+RETENTION = {MINUTE: 24 * HOUR, HOUR: 30 * 24 * HOUR}
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS rollups (
+        game TEXT NOT NULL,
+        character TEXT NOT NULL,
+        resolution INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        decisions INTEGER NOT NULL,
+        successes INTEGER NOT NULL,
+        latency_sum REAL NOT NULL,
+        latency_max REAL NOT NULL,
+        histogram BLOB NOT NULL,
+        PRIMARY KEY (resolution, bucket, game, character)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS idx_rollups_character ON rollups (game, character, resolution, bucket)"
+]
+
+SELECT_ROLLUP = """SELECT decisions, successes, latency_sum, latency_max, histogram FROM rollups
+    WHERE resolution = ? AND bucket = ? AND game = ? AND character = ?"""
+UPSERT_ROLLUP = """INSERT OR REPLACE INTO rollups
+    (game, character, resolution, bucket, decisions, successes, latency_sum, latency_max, histogram)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+SELECT_WINDOW = """SELECT game, character, bucket, decisions, successes, latency_sum, latency_max, histogram
+    FROM rollups WHERE resolution = ? AND bucket >= ?
+        AND (? IS NULL OR game = ?) AND (? IS NULL OR character = ?)
+    ORDER BY game, character, bucket"""
+DELETE_EXPIRED = "DELETE FROM rollups WHERE resolution = ? AND bucket < ?"
+
+
+def histogram_bucket(latency_ms: float) -> int:
+    if latency_ms < 1.0:
+        return 0
+    return min(HISTOGRAM_BUCKETS - 1, int(math.log(latency_ms, HISTOGRAM_RATIO)) + 1)
+
+
+def _pack(histogram: List[int]) -> bytes:
+    # Trailing empty buckets are dropped; most personas never reach them.
+    end = len(histogram)
+    while end and not histogram[end - 1]:
+        end -= 1
+    return array('I', histogram[:end]).tobytes()
+
+
+def _unpack(blob: bytes) -> List[int]:
+    counts = array('I')
+    counts.frombytes(blob)
+    return list(counts) + [0] * (HISTOGRAM_BUCKETS - len(counts))
+
+
+def percentile(histogram: List[int], p: float) -> float:
+    total = sum(histogram)
+    if not total:
+        return 0.0
+
+    rank = p * total
+    seen = 0
+    for idx, count in enumerate(histogram):
+        seen += count
+        if seen >= rank:
+            if idx == 0:
+                return 1.0
+            # Geometric midpoint of the bucket.
+            return round(HISTOGRAM_RATIO ** (idx - 0.5), 2)
+    return round(HISTOGRAM_RATIO ** (HISTOGRAM_BUCKETS - 1), 2)
+
+
+def _new_cell() -> List:
+    return [0, 0, 0.0, 0.0, [0] * HISTOGRAM_BUCKETS]
+
+
+def _merge_cell(into: List, decisions: int, successes: int, latency_sum: float,
+                latency_max: float, histogram: List[int]):
+    into[0] += decisions
+    into[1] += successes
+    into[2] += latency_sum
+    into[3] = max(into[3], latency_max)
+    into[4] = [a + b for a, b in zip(into[4], histogram)]
+
+
+# Per-character decision counters with minute and hour rollups.
+#
+# record() only touches a buffer owned by the calling thread, so the hot path
+# takes no lock. A flusher thread moves minutes that have closed (plus a grace
+# period) out of every buffer and merges them into SQLite, where both the
+# minute and the hour row are kept as counts plus a latency histogram.
+class CharacterMetrics:
+    def __init__(self, database_path: str = ':memory:', flush_interval: float = 10.0,
+                 grace_seconds: int = 5):
+        if database_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
+
+        self.grace_seconds = grace_seconds
+        self._local = threading.local()
+        self._buffers = []
+        self._buffers_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+
+        self._conn = sqlite3.connect(database_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+        if flush_interval:
+            threading.Thread(target=self._flush_periodically, args=(flush_interval,), daemon=True).start()
+
+    def _buffer(self) -> Dict:
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = {}
+            # Registration happens once per thread.
+            with self._buffers_lock:
+                self._buffers.append((threading.current_thread(), buffer))
+        return buffer
+
+    def record(self, game_type: str, character_name: str, success: bool, latency_ms: float):
+        minute = int(time.time()) // MINUTE * MINUTE
+        key = (game_type, character_name, minute)
+
+        buffer = self._buffer()
+        cell = buffer.get(key)
+        if cell is None:
+            cell = buffer[key] = _new_cell()
+
+        cell[0] += 1
+        cell[1] += 1 if success else 0
+        cell[2] += latency_ms
+        cell[3] = max(cell[3], latency_ms)
+        cell[4][histogram_bucket(latency_ms)] += 1
+
+    def _drain(self, closed_before: Optional[int]) -> Dict:
+        with self._buffers_lock:
+            buffers = list(self._buffers)
+
+        drained = {}
+        finished = []
+        for thread, buffer in buffers:
+            alive = thread.is_alive()
+            # Writers only touch their current minute, so popping closed
+            # minutes never races with an increment.
+            for key in [k for k in list(buffer) if not alive or closed_before is None or k[2] < closed_before]:
+                cell = buffer.pop(key)
+                _merge_cell(drained.setdefault(key, _new_cell()), *cell)
+            if not alive:
+                finished.append(buffer)
+
+        # Request threads come and go; their emptied buffers are dropped.
+        if finished:
+            with self._buffers_lock:
+                self._buffers = [(t, b) for t, b in self._buffers if not any(b is f for f in finished)]
+        return drained
+
+    def flush(self, force: bool = False):
+        closed_before = None if force else int(time.time() - self.grace_seconds) // MINUTE * MINUTE
+        now = int(time.time())
+
+        # Draining under the database lock keeps query() from seeing a
+        # minute that has left the buffers but is not yet written.
+        with self._db_lock:
+            drained = self._drain(closed_before)
+            if not drained:
+                return
+
+            rows = {}
+            for (game, character, minute), cell in drained.items():
+                for resolution in (MINUTE, HOUR):
+                    bucket = minute // resolution * resolution
+                    _merge_cell(rows.setdefault((game, character, resolution, bucket), _new_cell()), *cell)
+
+            for (game, character, resolution, bucket), cell in rows.items():
+                existing = self._conn.execute(SELECT_ROLLUP, (resolution, bucket, game, character)).fetchone()
+                if existing:
+                    _merge_cell(cell, *existing[:4], _unpack(existing[4]))
+                self._conn.execute(UPSERT_ROLLUP, (
+                    game, character, resolution, bucket, cell[0], cell[1], cell[2], cell[3], _pack(cell[4])
+                ))
+
+            for resolution, retention in RETENTION.items():
+                self._conn.execute(DELETE_EXPIRED, (resolution, now - retention))
+            self._conn.commit()
+
+    def _flush_periodically(self, interval: float):
+        while True:
+            time.sleep(interval)
+            self.flush()
+
+    def close(self):
+        self.flush(force=True)
+        with self._db_lock:
+            self._conn.close()
+
+    def query(self, resolution: str = "minute", window: int = 60, game_type: Optional[str] = None,
+              character_name: Optional[str] = None, series: bool = False) -> List[Dict]:
+        # Summaries per character over the last `window` buckets, including
+        # decisions still sitting in the per-thread buffers.
+        step = RESOLUTIONS[resolution]
+        since = (int(time.time()) // step - window + 1) * step
+
+        cells = {}
+        with self._db_lock:
+            rows = self._conn.execute(SELECT_WINDOW, (
+                step, since, game_type, game_type, character_name, character_name
+            )).fetchall()
+
+            with self._buffers_lock:
+                buffers = [buffer for _, buffer in self._buffers]
+            for buffer in buffers:
+                for (game, character, minute), cell in list(buffer.items()):
+                    bucket = minute // step * step
+                    if bucket < since or game_type not in (None, game) or character_name not in (None, character):
+                        continue
+                    _merge_cell(cells.setdefault((game, character, bucket), _new_cell()),
+                                cell[0], cell[1], cell[2], cell[3], list(cell[4]))
+
+        for game, character, bucket, decisions, successes, latency_sum, latency_max, blob in rows:
+            _merge_cell(cells.setdefault((game, character, bucket), _new_cell()),
+                        decisions, successes, latency_sum, latency_max, _unpack(blob))
+
+        summaries = {}
+        for (game, character, bucket), cell in sorted(cells.items()):
+            summary = summaries.setdefault((game, character), {"cell": _new_cell(), "series": []})
+            _merge_cell(summary["cell"], *cell)
+            if series:
+                summary["series"].append({"bucket": bucket, **self._describe(cell)})
+
+        results = []
+        for (game, character), summary in summaries.items():
+            entry = {"game_type": game, "character": character, **self._describe(summary["cell"])}
+            if series:
+                entry["series"] = summary["series"]
+            results.append(entry)
+        return results
+
+    @staticmethod
+    def _describe(cell: List) -> Dict:
+        decisions, successes, latency_sum, latency_max, histogram = cell
+        return {
+            "decisions": decisions,
+            "successes": successes,
+            "failure_rate": round(1 - successes / decisions, 4) if decisions else 0.0,
+            "latency_ms": {
+                "mean": round(latency_sum / decisions, 2) if decisions else 0.0,
+                "p50": min(percentile(histogram, 0.5), round(latency_max, 2)),
+                "p95": min(percentile(histogram, 0.95), round(latency_max, 2)),
+                "p99": min(percentile(histogram, 0.99), round(latency_max, 2)),
+                "max": round(latency_max, 2)
+            }
+        }
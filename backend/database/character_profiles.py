@@ -1,59 +1,213 @@
 import json
-from typing import Dict, List, Optional
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Union
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS characters (
+        game TEXT NOT NULL,
+        character TEXT NOT NULL,
+        profile TEXT NOT NULL,
+        training_iterations INTEGER NOT NULL DEFAULT 0,
+        decisions_made INTEGER NOT NULL DEFAULT 0,
+        successful_outcomes INTEGER NOT NULL DEFAULT 0,
+        alignment_score REAL NOT NULL DEFAULT 0.0,
+        updated TEXT NOT NULL,
+        PRIMARY KEY (game, character)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS idx_characters_character ON characters (character)"
+]
+
+METRIC_COLUMNS = ("decisions_made", "successful_outcomes", "alignment_score")
+GAUGE_COLUMNS = ("alignment_score",)
+COLUMNS = "game, character, profile, training_iterations, " + ", ".join(METRIC_COLUMNS)
+
+# Re-storing a character replaces its profile but keeps its accumulated metrics.
+UPSERT_PROFILE = """INSERT INTO characters (game, character, profile, updated) VALUES (?, ?, ?, ?)
+    ON CONFLICT (game, character) DO UPDATE SET
+        profile = excluded.profile,
+        updated = excluded.updated"""
+UPSERT_RECORD = f"""INSERT INTO characters ({COLUMNS}, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (game, character) DO UPDATE SET
+        profile = excluded.profile,
+        training_iterations = excluded.training_iterations,
+        decisions_made = excluded.decisions_made,
+        successful_outcomes = excluded.successful_outcomes,
+        alignment_score = excluded.alignment_score,
+        updated = excluded.updated"""
+SELECT_PROFILE = f"SELECT {COLUMNS} FROM characters WHERE game = ? AND character = ?"
+SELECT_GAME_CHARACTERS = "SELECT character FROM characters WHERE game = ? ORDER BY character"
+SELECT_GAME_METRICS = f"""SELECT character, training_iterations, {", ".join(METRIC_COLUMNS)}
+    FROM characters WHERE game = ? ORDER BY character"""
+SELECT_CHARACTER_GAMES = "SELECT game FROM characters WHERE character = ? ORDER BY game"
+SELECT_ALL = f"SELECT {COLUMNS} FROM characters ORDER BY game, character"
+
+
+def _record(row) -> Dict:
+    game, character, profile, iterations, decisions, successes, alignment = row
+    return {
+        "game": game,
+        "character": character,
+        "profile": json.loads(profile),
+        "training_iterations": iterations,
+        "performance_metrics": {
+            "decisions_made": decisions,
+            "successful_outcomes": successes,
+            "alignment_score": alignment
+        }
+    }
+
 
 class CharacterProfileDatabase:
-    def __init__(self):
-        self.profiles = {}
-        self.game_mappings = {}
-        
-    def store_character_profile(self, game_name: str, character_name: str, 
+    def __init__(self, database_path: str = ':memory:'):
+        if database_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
+
+        self.database_path = database_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(database_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def store_character_profile(self, game_name: str, character_name: str,
                                 profile_data: Dict):
-        key = f"{game_name}_{character_name}"
-        self.profiles[key] = {
-            "game": game_name,
-            "character": character_name,
-            "profile": profile_data,
-            "training_iterations": 0,
-            "performance_metrics": {
-                "decisions_made": 0,
-                "successful_outcomes": 0,
-                "alignment_score": 0.0
-            }
-        }
-        
-        if game_name not in self.game_mappings:
-            self.game_mappings[game_name] = []
-        
-        self.game_mappings[game_name].append(character_name)
-    
+        with self._lock:
+            self._conn.execute(UPSERT_PROFILE, (
+                game_name, character_name, json.dumps(profile_data, default=str), datetime.now().isoformat()
+            ))
+            self._conn.commit()
+
     def get_character_profile(self, game_name: str, character_name: str) -> Optional[Dict]:
-        key = f"{game_name}_{character_name}"
-        return self.profiles.get(key)
-    
-    def update_performance_metrics(self, game_name: str, character_name: str, 
-                                  metrics: Dict):
-        key = f"{game_name}_{character_name}"
-        if key in self.profiles:
-            self.profiles[key]["performance_metrics"].update(metrics)
-    
+        with self._lock:
+            row = self._conn.execute(SELECT_PROFILE, (game_name, character_name)).fetchone()
+        return _record(row) if row else None
+
+    def update_performance_metrics(self, game_name: str, character_name: str,
+                                   metrics: Dict):
+        # Decision counts are increments; alignment_score is a gauge and is replaced.
+        columns = [column for column in METRIC_COLUMNS if column in metrics]
+        if not columns:
+            return
+
+        assignments = ", ".join(
+            f"{column} = ?" if column in GAUGE_COLUMNS else f"{column} = {column} + ?"
+            for column in columns
+        )
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE characters SET {assignments} WHERE game = ? AND character = ?",
+                [metrics[column] for column in columns] + [game_name, character_name]
+            )
+            self._conn.commit()
+
     def get_all_characters_for_game(self, game_name: str) -> List[str]:
-        return self.game_mappings.get(game_name, [])
-    
-    def export_profiles(self) -> str:
-        return json.dumps(self.profiles, indent=2)
-    
-    def import_profiles(self, json_data: str):
-        imported = json.loads(json_data)
-        self.profiles.update(imported)
-        
-        # Rebuild game mappings
-        self.game_mappings = {}
-        for key, data in self.profiles.items():
-            game = data["game"]
-            char = data["character"]
-            
-            if game not in self.game_mappings:
-                self.game_mappings[game] = []
-            
-            if char not in self.game_mappings[game]:
-                self.game_mappings[game].append(char)
\ No newline at end of file
+        with self._lock:
+            return [row[0] for row in self._conn.execute(SELECT_GAME_CHARACTERS, (game_name,))]
+
+    def get_games_for_character(self, character_name: str) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(SELECT_CHARACTER_GAMES, (character_name,))]
+
+    def _stream(self, query: str, params=(), chunk_size: int = 500) -> Iterator:
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+
+    def iter_game_metrics(self, game_name: str, chunk_size: int = 500) -> Iterator[Dict]:
+        # Profiles are never read here, so large games stream cheaply.
+        for character, iterations, decisions, successes, alignment in self._stream(
+                SELECT_GAME_METRICS, (game_name,), chunk_size):
+            yield {
+                "character": character,
+                "training_iterations": iterations,
+                "performance_metrics": {
+                    "decisions_made": decisions,
+                    "successful_outcomes": successes,
+                    "alignment_score": alignment
+                }
+            }
+
+    def iter_profiles(self, chunk_size: int = 500) -> Iterator[Dict]:
+        for row in self._stream(SELECT_ALL, (), chunk_size):
+            yield _record(row)
+
+    def export_profiles(self, out: Optional[IO[str]] = None) -> Optional[str]:
+        # NDJSON, one character per line. Written straight to `out` when given,
+        # otherwise returned as a string.
+        lines = (json.dumps(record, separators=(',', ':'), default=str) + "\n" for record in self.iter_profiles())
+        if out is None:
+            return "".join(lines)
+
+        for line in lines:
+            out.write(line)
+        return None
+
+    def import_profiles(self, source: Union[str, IO[str], Iterable[str]], batch_size: int = 500) -> int:
+        if isinstance(source, str):
+            legacy = self._legacy_records(source)
+            source = legacy if legacy is not None else source.splitlines()
+
+        imported = 0
+        batch = []
+        with self._lock:
+            for item in source:
+                if isinstance(item, str):
+                    item = item.strip()
+                    if not item:
+                        continue
+                    item = json.loads(item)
+                batch.append(self._import_row(item))
+
+                if len(batch) >= batch_size:
+                    self._conn.executemany(UPSERT_RECORD, batch)
+                    imported += len(batch)
+                    batch = []
+
+            if batch:
+                self._conn.executemany(UPSERT_RECORD, batch)
+                imported += len(batch)
+            self._conn.commit()
+
+        return imported
+
+    @staticmethod
+    def _legacy_records(data: str) -> Optional[List[Dict]]:
+        # Exports from the in-memory store were one JSON object keyed by
+        # "<game>_<character>".
+        try:
+            parsed = json.loads(data)
+        except ValueError:
+            return None
+
+        if isinstance(parsed, dict) and all(isinstance(value, dict) and "game" in value for value in parsed.values()):
+            return list(parsed.values())
+        return None
+
+    @staticmethod
+    def _import_row(record: Dict) -> tuple:
+        metrics = record.get("performance_metrics", {})
+        return (
+            record["game"],
+            record["character"],
+            json.dumps(record.get("profile", {}), default=str),
+            record.get("training_iterations", 0),
+            metrics.get("decisions_made", 0),
+            metrics.get("successful_outcomes", 0),
+            metrics.get("alignment_score", 0.0),
+            datetime.now().isoformat()
+        )
@@ -1,48 +1,387 @@
 import json
-from typing import Dict, Optional
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
+from database.state_diff import diff_states, apply_diff
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS games (
+        game_id TEXT PRIMARY KEY,
+        game_name TEXT NOT NULL,
+        state TEXT NOT NULL,
+        turn_number INTEGER NOT NULL,
+        last_updated TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS history (
+        game_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        turn_number INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        decision TEXT,
+        timestamp TEXT NOT NULL,
+        PRIMARY KEY (game_id, seq)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS idx_history_decisions ON history (game_id, seq) WHERE decision IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_history_keyframes ON history (game_id, seq) WHERE kind = 'K'",
+    """CREATE TABLE IF NOT EXISTS action_logs (
+        game_id TEXT PRIMARY KEY,
+        game_type TEXT NOT NULL,
+        seed INTEGER NOT NULL,
+        players TEXT NOT NULL,
+        created TEXT NOT NULL,
+        rules_version INTEGER NOT NULL DEFAULT 1
+    )""",
+    """CREATE TABLE IF NOT EXISTS actions (
+        game_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        player_id INTEGER,
+        action TEXT,
+        decision TEXT,
+        PRIMARY KEY (game_id, seq)
+    ) WITHOUT ROWID"""
+]
+
+# History rows written before delta encoding stored a full state per row;
+# they carry over unchanged as keyframes.
+MIGRATE_FULL_SNAPSHOT_HISTORY = [
+    "DROP INDEX IF EXISTS idx_history_decisions",
+    "ALTER TABLE history RENAME TO history_snapshots",
+    SCHEMA[1],
+    """INSERT INTO history (game_id, seq, turn_number, kind, payload, decision, timestamp)
+        SELECT game_id, seq, COALESCE(json_extract(state, '$.turn'), 0), 'K', state, decision, timestamp
+        FROM history_snapshots""",
+    "DROP TABLE history_snapshots"
+]
+
+KEYFRAME = 'K'
+DELTA = 'D'
+
+UPSERT_GAME = """INSERT INTO games (game_id, game_name, state, turn_number, last_updated)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (game_id) DO UPDATE SET
+        game_name = excluded.game_name,
+        state = excluded.state,
+        turn_number = excluded.turn_number,
+        last_updated = excluded.last_updated"""
+INSERT_HISTORY = """INSERT INTO history (game_id, seq, turn_number, kind, payload, decision, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)"""
+SELECT_STATE = "SELECT state FROM games WHERE game_id = ?"
+SELECT_HISTORY = "SELECT kind, payload, decision, timestamp FROM history WHERE game_id = ? ORDER BY seq"
+SELECT_KEYFRAME_AT = "SELECT MAX(seq) FROM history WHERE game_id = ? AND kind = 'K' AND seq <= ?"
+SELECT_HISTORY_RANGE = """SELECT kind, payload FROM history
+    WHERE game_id = ? AND seq BETWEEN ? AND ? ORDER BY seq"""
+SELECT_SEQ_AT_TURN = "SELECT MAX(seq) FROM history WHERE game_id = ? AND turn_number <= ?"
+SELECT_HISTORY_BYTES = """SELECT COUNT(*), SUM(LENGTH(payload)), SUM(kind = 'K') FROM history
+    WHERE game_id = ?"""
+INSERT_ACTION_LOG = """INSERT OR REPLACE INTO action_logs (game_id, game_type, seed, players, created, rules_version)
+    VALUES (?, ?, ?, ?, ?, ?)"""
+INSERT_ACTION = "INSERT INTO actions (game_id, seq, player_id, action, decision) VALUES (?, ?, ?, ?, ?)"
+SELECT_ACTION_LOG = "SELECT game_type, seed, players, rules_version FROM action_logs WHERE game_id = ?"
+SELECT_ACTIONS = """SELECT seq, player_id, action FROM actions
+    WHERE game_id = ? AND seq < ? ORDER BY seq"""
+SELECT_MAX_ACTION_SEQ = "SELECT MAX(seq) FROM actions WHERE game_id = ?"
+SELECT_ACTION_BYTES = "SELECT COUNT(*), SUM(LENGTH(action)) FROM actions WHERE game_id = ?"
+SELECT_MAX_SEQ = "SELECT MAX(seq) FROM history WHERE game_id = ?"
+SELECT_GAMES = "SELECT game_id, game_name, turn_number, last_updated FROM games ORDER BY last_updated DESC"
+# Decisions are stored on the action they chose, so each one is keyed to the
+# state it was made in: the log replayed up to that action's seq. History rows
+# only carry decisions recorded before that, and are still exported.
+SELECT_DECISIONS = """SELECT game_name, decision FROM (
+        SELECT g.game_name, h.decision, h.game_id, 0 AS source, h.seq FROM history h
+            JOIN games g ON g.game_id = h.game_id WHERE h.decision IS NOT NULL
+        UNION ALL
+        SELECT l.game_type, a.decision, a.game_id, 1, a.seq FROM actions a
+            JOIN action_logs l ON l.game_id = a.game_id WHERE a.decision IS NOT NULL
+    ) WHERE ? IS NULL OR game_name = ?
+    ORDER BY game_id, source, seq"""
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, separators=(',', ':'), default=str)
+
+
 class GameStateDatabase:
-    def __init__(self):
-        self.game_states = {}
-        self.game_history = {}
-        
+    def __init__(self, database_path: str = ':memory:', batch_size: int = 50,
+                 commit_interval: float = 1.0, keyframe_interval: int = 20,
+                 cached_states: int = 64):
+        if database_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
+
+        self.database_path = database_path
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self.keyframe_interval = keyframe_interval
+        self.cached_states = cached_states
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(database_path, check_same_thread=False, cached_statements=64)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+        self._next_seq = {}
+        self._next_action_seq = {}
+        # Latest state of the most recently saved games, to diff the next
+        # save against; evicted games are rebuilt from their last keyframe.
+        self._last_states = OrderedDict()
+        self._pending_writes = 0
+        self._last_commit = time.monotonic()
+        self._closed = False
+
+        # Batches are committed by size on the write path; this thread bounds
+        # how long a quiet game's last writes can stay uncommitted.
+        threading.Thread(target=self._flush_periodically, daemon=True).start()
+
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(history)")}
+        if "state" in columns:
+            for statement in MIGRATE_FULL_SNAPSHOT_HISTORY:
+                self._conn.execute(statement)
+
+        # Logs recorded before rules were versioned were played under version 1.
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(action_logs)")}
+        if columns and "rules_version" not in columns:
+            self._conn.execute("ALTER TABLE action_logs ADD COLUMN rules_version INTEGER NOT NULL DEFAULT 1")
+
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(actions)")}
+        if columns and "decision" not in columns:
+            self._conn.execute("ALTER TABLE actions ADD COLUMN decision TEXT")
+
+    def _flush_periodically(self):
+        while not self._closed:
+            time.sleep(self.commit_interval)
+            if not self._closed:
+                self.flush()
+
     def save_game_state(self, game_id: str, game_name: str, state: Dict):
-        self.game_states[game_id] = {
-            "game_name": game_name,
-            "state": state,
-            "last_updated": datetime.now().isoformat(),
-            "turn_number": state.get("turn", 0)
+        timestamp = datetime.now().isoformat()
+        turn = state.get("turn", 0)
+        # Serializing here also snapshots the live engine state, so later
+        # mutations can no longer leak into stored history entries.
+        state_json = _dumps(state)
+        snapshot = json.loads(state_json)
+
+        with self._lock:
+            seq = self._allocate_seq(game_id)
+            previous = self._last_state(game_id, seq)
+
+            if previous is None or seq % self.keyframe_interval == 0:
+                kind, payload = KEYFRAME, state_json
+            else:
+                kind, payload = DELTA, _dumps(diff_states(previous, snapshot))
+
+            self._conn.execute(UPSERT_GAME, (game_id, game_name, state_json, turn, timestamp))
+            self._conn.execute(INSERT_HISTORY, (
+                game_id, seq, turn, kind, payload, None, timestamp
+            ))
+            self._remember_state(game_id, snapshot)
+            self._pending_writes += 1
+            self._maybe_commit()
+
+    def _last_state(self, game_id: str, seq: int) -> Optional[Dict]:
+        if game_id in self._last_states:
+            return self._last_states[game_id]
+        return self._reconstruct(game_id, seq - 1) if seq > 0 else None
+
+    def _remember_state(self, game_id: str, state: Dict):
+        self._last_states[game_id] = state
+        self._last_states.move_to_end(game_id)
+        while len(self._last_states) > self.cached_states:
+            self._last_states.popitem(last=False)
+
+    def _reconstruct(self, game_id: str, seq: int) -> Optional[Dict]:
+        keyframe = self._conn.execute(SELECT_KEYFRAME_AT, (game_id, seq)).fetchone()[0]
+        if keyframe is None:
+            return None
+
+        state = None
+        for kind, payload in self._conn.execute(SELECT_HISTORY_RANGE, (game_id, keyframe, seq)):
+            data = json.loads(payload)
+            state = data if kind == KEYFRAME else apply_diff(state, data)
+        return state
+
+    def get_state_at(self, game_id: str, seq: int) -> Optional[Dict]:
+        # At most keyframe_interval rows are read and applied.
+        with self._lock:
+            return self._reconstruct(game_id, seq)
+
+    def get_state_at_turn(self, game_id: str, turn: int) -> Optional[Dict]:
+        with self._lock:
+            seq = self._conn.execute(SELECT_SEQ_AT_TURN, (game_id, turn)).fetchone()[0]
+            return self._reconstruct(game_id, seq) if seq is not None else None
+
+    def history_storage_stats(self, game_id: str) -> Dict:
+        with self._lock:
+            entries, total_bytes, keyframes = self._conn.execute(SELECT_HISTORY_BYTES, (game_id,)).fetchone()
+
+        return {
+            "entries": entries,
+            "keyframes": keyframes or 0,
+            "total_bytes": total_bytes or 0,
+            "bytes_per_entry": (total_bytes or 0) / entries if entries else 0
         }
-        
-        if game_id not in self.game_history:
-            self.game_history[game_id] = []
-        
-        self.game_history[game_id].append({
-            "state": state.copy(),
-            "timestamp": datetime.now().isoformat()
-        })
-    
+
+    def start_action_log(self, game_id: str, game_type: str, seed: int, players: List,
+                         rules_version: int):
+        with self._lock:
+            self._conn.execute("DELETE FROM actions WHERE game_id = ?", (game_id,))
+            self._conn.execute(INSERT_ACTION_LOG, (
+                game_id, game_type, seed, _dumps(players), datetime.now().isoformat(), rules_version
+            ))
+            self._next_action_seq[game_id] = 0
+            self._pending_writes += 1
+            self._maybe_commit()
+
+    def record_action(self, game_id: str, player_id: Optional[int], action: Optional[Dict] = None,
+                      decision: Optional[Dict] = None):
+        # A row without a player is an advance_turn call. `decision` is the
+        # training record for an AI seat that chose this action.
+        action_json = _dumps(action) if player_id is not None else None
+        decision_json = _dumps(decision) if decision else None
+
+        with self._lock:
+            if game_id not in self._next_action_seq:
+                row = self._conn.execute(SELECT_MAX_ACTION_SEQ, (game_id,)).fetchone()
+                self._next_action_seq[game_id] = (row[0] + 1) if row[0] is not None else 0
+
+            seq = self._next_action_seq[game_id]
+            self._next_action_seq[game_id] = seq + 1
+            self._conn.execute(INSERT_ACTION, (game_id, seq, player_id, action_json, decision_json))
+            self._pending_writes += 1
+            self._maybe_commit()
+
+    def record_advance_turn(self, game_id: str):
+        self.record_action(game_id, None)
+
+    def load_action_log(self, game_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(SELECT_ACTION_LOG, (game_id,)).fetchone()
+        if row is None:
+            return None
+
+        game_type, seed, players, rules_version = row
+        return {"game_type": game_type, "seed": seed, "players": json.loads(players),
+                "rules_version": rules_version}
+
+    def iter_actions(self, game_id: str, upto: Optional[int] = None,
+                     chunk_size: int = 1000) -> Iterator[Tuple[int, Optional[int], Optional[Dict]]]:
+        with self._lock:
+            cursor = self._conn.execute(SELECT_ACTIONS, (game_id, upto if upto is not None else 2 ** 62))
+
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for seq, player_id, action_json in rows:
+                yield seq, player_id, json.loads(action_json) if action_json is not None else None
+
+    def action_log_stats(self, game_id: str) -> Dict:
+        with self._lock:
+            entries, total_bytes = self._conn.execute(SELECT_ACTION_BYTES, (game_id,)).fetchone()
+        return {"entries": entries, "total_bytes": total_bytes or 0}
+
+    def _allocate_seq(self, game_id: str) -> int:
+        if game_id not in self._next_seq:
+            row = self._conn.execute(SELECT_MAX_SEQ, (game_id,)).fetchone()
+            self._next_seq[game_id] = (row[0] + 1) if row[0] is not None else 0
+
+        seq = self._next_seq[game_id]
+        self._next_seq[game_id] = seq + 1
+        return seq
+
+    def _maybe_commit(self):
+        if (self._pending_writes >= self.batch_size or
+                time.monotonic() - self._last_commit >= self.commit_interval):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._closed:
+                return
+            if self._pending_writes:
+                self._conn.commit()
+            self._pending_writes = 0
+            self._last_commit = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._closed = True
+            self._conn.close()
+
     def load_game_state(self, game_id: str) -> Optional[Dict]:
-        game_data = self.game_states.get(game_id)
-        return game_data["state"] if game_data else None
-    
+        with self._lock:
+            row = self._conn.execute(SELECT_STATE, (game_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
     def get_game_history(self, game_id: str) -> List[Dict]:
-        return self.game_history.get(game_id, [])
-    
+        with self._lock:
+            rows = self._conn.execute(SELECT_HISTORY, (game_id,)).fetchall()
+
+        history = []
+        state = None
+        for kind, payload, decision_json, timestamp in rows:
+            data = json.loads(payload)
+            state = data if kind == KEYFRAME else apply_diff(state, data)
+
+            # Entries must not share structure with the running state.
+            entry = {"state": json.loads(_dumps(state)), "timestamp": timestamp}
+            if decision_json:
+                entry["decision"] = json.loads(decision_json)
+            history.append(entry)
+        return history
+
+    def iter_decisions(self, game_name: Optional[str] = None,
+                       chunk_size: int = 500) -> Iterator[Tuple[str, Dict]]:
+        with self._lock:
+            cursor = self._conn.execute(SELECT_DECISIONS, (game_name, game_name))
+
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for name, decision_json in rows:
+                yield name, json.loads(decision_json)
+
+    def export_decisions(self, game_name: Optional[str] = None) -> str:
+        return json.dumps([
+            {"game_name": name, "decision": decision}
+            for name, decision in self.iter_decisions(game_name)
+        ])
+
     def delete_game(self, game_id: str):
-        if game_id in self.game_states:
-            del self.game_states[game_id]
-        if game_id in self.game_history:
-            del self.game_history[game_id]
-    
+        with self._lock:
+            self._conn.execute("DELETE FROM games WHERE game_id = ?", (game_id,))
+            self._conn.execute("DELETE FROM history WHERE game_id = ?", (game_id,))
+            self._conn.execute("DELETE FROM action_logs WHERE game_id = ?", (game_id,))
+            self._conn.execute("DELETE FROM actions WHERE game_id = ?", (game_id,))
+            self._next_seq.pop(game_id, None)
+            self._next_action_seq.pop(game_id, None)
+            self._last_states.pop(game_id, None)
+            self._pending_writes += 1
+            self.flush()
+
     def list_active_games(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(SELECT_GAMES).fetchall()
+
         return [
             {
                 "game_id": gid,
-                "game_name": data["game_name"],
-                "turn": data["turn_number"],
-                "last_updated": data["last_updated"]
+                "game_name": game_name,
+                "turn": turn,
+                "last_updated": last_updated
             }
-            for gid, data in self.game_states.items()
-        ]
\ No newline at end of file
+            for gid, game_name, turn, last_updated in rows
+        ]
@@ -0,0 +1,248 @@
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import quote, unquote
+import os
+import pickle
+import threading
+import time
+
+SUFFIX = '.pkl'
+
+
+# Dict-like game registry that keeps at most `max_resident` entries in memory.
+# Least recently used entries, and any entry idle for longer than `idle_ttl`
+# seconds, are pickled to `directory` and transparently loaded back on the
+# next lookup. Membership tests never load from disk.
+#
+# The registry lock only guards the bookkeeping. Pickling and file IO run
+# outside it, with the entry listed in `_moving`; lookups of that one entry
+# wait for the move to finish while every other game stays available.
+class HibernatingStore(MutableMapping):
+    def __init__(self, directory: str, max_resident: int = 500, idle_ttl: float = 600.0,
+                 sweep_interval: float = 30.0):
+        self.directory = directory
+        self.max_resident = max_resident
+        self.idle_ttl = idle_ttl
+
+        self._lock = threading.RLock()
+        self._resident = OrderedDict()
+        self._last_access = {}
+        self._pins = {}
+        self._moving = {}
+        self._rehydrate_ms = deque(maxlen=256)
+        self._counters = {"hibernations": 0, "rehydrations": 0}
+
+        os.makedirs(directory, exist_ok=True)
+        self._hibernated = {
+            unquote(name[:-len(SUFFIX)])
+            for name in os.listdir(directory)
+            if name.endswith(SUFFIX)
+        }
+
+        if sweep_interval:
+            threading.Thread(target=self._sweep_periodically, args=(sweep_interval,), daemon=True).start()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, quote(key, safe='') + SUFFIX)
+
+    @contextmanager
+    def _settled(self, key: str):
+        # Holds the lock at a moment when `key` is not being moved.
+        while True:
+            with self._lock:
+                moving = self._moving.get(key)
+                if moving is None:
+                    yield
+                    return
+            moving.wait()
+
+    def _touch(self, key: str):
+        self._resident.move_to_end(key)
+        self._last_access[key] = time.monotonic()
+
+    def __getitem__(self, key: str) -> Any:
+        with self._settled(key):
+            if key in self._resident:
+                self._touch(key)
+                return self._resident[key]
+            if key not in self._hibernated:
+                raise KeyError(key)
+            self._hibernated.discard(key)
+            moving = self._moving[key] = threading.Event()
+
+        started = time.perf_counter()
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.remove(path)
+        except BaseException:
+            with self._lock:
+                self._hibernated.add(key)
+                del self._moving[key]
+            moving.set()
+            raise
+
+        with self._lock:
+            self._resident[key] = value
+            self._touch(key)
+            del self._moving[key]
+            self._counters["rehydrations"] += 1
+            self._rehydrate_ms.append((time.perf_counter() - started) * 1000)
+        moving.set()
+
+        self._enforce_capacity(keep=key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        with self._settled(key):
+            stale = key in self._hibernated
+            if stale:
+                # Nothing may reload or rewrite the old file while it goes.
+                self._hibernated.discard(key)
+                moving = self._moving[key] = threading.Event()
+            else:
+                self._resident[key] = value
+                self._touch(key)
+
+        if stale:
+            try:
+                os.remove(self._path(key))
+            finally:
+                with self._lock:
+                    self._resident[key] = value
+                    self._touch(key)
+                    del self._moving[key]
+                moving.set()
+
+        self._enforce_capacity(keep=key)
+
+    def __delitem__(self, key: str):
+        with self._settled(key):
+            if key in self._resident:
+                del self._resident[key]
+                self._last_access.pop(key, None)
+                return
+            if key not in self._hibernated:
+                raise KeyError(key)
+            self._hibernated.discard(key)
+            moving = self._moving[key] = threading.Event()
+
+        try:
+            os.remove(self._path(key))
+        finally:
+            with self._lock:
+                del self._moving[key]
+            moving.set()
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._resident or key in self._hibernated or key in self._moving
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._resident) + list(self._hibernated) + list(self._moving))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._resident) + len(self._hibernated) + len(self._moving)
+
+    @contextmanager
+    def pinned(self, key: str):
+        # Pinned entries are never hibernated, so in-flight requests and
+        # background tasks keep mutating the object that stays resident.
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pins[key] -= 1
+                if not self._pins[key]:
+                    del self._pins[key]
+
+    def _hibernate(self, key: str, idle_before: Optional[float] = None) -> bool:
+        # Claims the entry under the lock, then writes it without holding it.
+        # False if it was pinned, touched or moved in the meantime.
+        with self._lock:
+            if key not in self._resident or key in self._pins or key in self._moving:
+                return False
+            if idle_before is not None and self._last_access.get(key, 0) >= idle_before:
+                return False
+            value = self._resident.pop(key)
+            accessed = self._last_access.pop(key, None)
+            moving = self._moving[key] = threading.Event()
+
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with self._lock:
+                self._resident[key] = value
+                self._last_access[key] = accessed or time.monotonic()
+                del self._moving[key]
+            moving.set()
+            raise
+
+        with self._lock:
+            self._hibernated.add(key)
+            del self._moving[key]
+            self._counters["hibernations"] += 1
+        moving.set()
+        return True
+
+    def _enforce_capacity(self, keep: Optional[str] = None):
+        while True:
+            with self._lock:
+                if len(self._resident) <= self.max_resident:
+                    return
+                # Oldest first; `keep` is the entry the caller just touched.
+                victim = next((key for key in self._resident if key != keep and key not in self._pins), None)
+            if victim is None:
+                return
+            self._hibernate(victim)
+
+    def sweep(self) -> int:
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            idle = [
+                key for key, accessed in self._last_access.items()
+                if accessed < cutoff and key not in self._pins
+            ]
+        return sum(self._hibernate(key, idle_before=cutoff) for key in idle)
+
+    def _sweep_periodically(self, interval: float):
+        while True:
+            time.sleep(interval)
+            self.sweep()
+
+    def hibernate_all(self):
+        with self._lock:
+            keys = list(self._resident)
+        for key in keys:
+            self._hibernate(key)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            latencies = sorted(self._rehydrate_ms)
+            resident, hibernated = len(self._resident), len(self._hibernated)
+            counters = dict(self._counters)
+
+        def percentile(p: float) -> float:
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3) if latencies else 0.0
+
+        return {
+            "resident": resident,
+            "hibernated": hibernated,
+            **counters,
+            "rehydrate_ms": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1], 3) if latencies else 0.0
+            }
+        }
@@ -0,0 +1,79 @@
+from typing import Dict
+import argparse
+import random
+
+from database.game_state import GameStateDatabase, _dumps
+from utils.game_factory import GameFactory
+
+GAME_TYPES = [
+    'brass_birmingham', 'gloomhaven', 'terraforming_mars',
+    'dune', 'dungeons_dragons', 'exploding_kittens'
+]
+
+
+def _play(game_type: str, turns: int, db: GameStateDatabase, seed: int) -> int:
+    game = GameFactory.create_game(game_type, seed=seed)
+    count = GameFactory.get_player_count(game_type)
+    players = [{"name": f"Player{i}"} for i in range(count)]
+    game.setup_game(players)
+
+    game_id = f"stats_{game_type}"
+    db.start_action_log(game_id, game_type, seed, players, game.RULES_VERSION)
+    full_bytes = 0
+
+    for turn in range(turns):
+        player_id = game.current_turn % count
+        actions = game.get_available_actions(player_id)
+        if actions:
+            action = random.choice(actions)
+            db.record_action(game_id, player_id, action)
+            game.execute_action(player_id, action)
+        db.record_advance_turn(game_id)
+        game.advance_turn()
+
+        state = game.get_game_state()
+        full_bytes += len(_dumps(state))
+        db.save_game_state(game_id, game_type, state)
+
+    return full_bytes
+
+
+def measure(turns: int = 200, keyframe_interval: int = 20, seed: int = 0) -> Dict[str, Dict]:
+    random.seed(seed)
+    db = GameStateDatabase(keyframe_interval=keyframe_interval)
+    report = {}
+
+    for game_type in GAME_TYPES:
+        full_bytes = _play(game_type, turns, db, seed)
+        stats = db.history_storage_stats(f"stats_{game_type}")
+        log_stats = db.action_log_stats(f"stats_{game_type}")
+        report[game_type] = {
+            "snapshot_bytes_per_turn": full_bytes / turns,
+            "delta_bytes_per_turn": stats["bytes_per_entry"],
+            "log_bytes_per_turn": log_stats["total_bytes"] / turns,
+            "ratio": full_bytes / stats["total_bytes"] if stats["total_bytes"] else 0
+        }
+
+    db.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare full-snapshot, delta-encoded and action-log history size per turn'
+    )
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--keyframe-interval', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    report = measure(args.turns, args.keyframe_interval, args.seed)
+    print(f"{'game':<20}{'snapshot B/turn':>18}{'delta B/turn':>15}{'ratio':>8}{'log B/turn':>13}")
+    for game_type, row in report.items():
+        print(f"{game_type:<20}{row['snapshot_bytes_per_turn']:>18.0f}"
+              f"{row['delta_bytes_per_turn']:>15.0f}{row['ratio']:>7.1f}x"
+              f"{row['log_bytes_per_turn']:>13.0f}")
+
+
+if __name__ == '__main__':
+    main()
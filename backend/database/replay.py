@@ -0,0 +1,29 @@
+from typing import Optional
+
+from database.game_state import GameStateDatabase
+from utils.game_factory import GameFactory
+
+
+def replay_game(db: GameStateDatabase, game_id: str, upto: Optional[int] = None):
+    # Rebuilds the engine from its seed and setup config, then re-executes the
+    # first `upto` logged actions (all of them by default). Raises ValueError
+    # if the engine's rules changed since the log was recorded.
+    log = db.load_action_log(game_id)
+    if log is None:
+        return None
+
+    game = GameFactory.create_game(log["game_type"], seed=log["seed"])
+    if log["rules_version"] != game.RULES_VERSION:
+        raise ValueError(
+            f"Game was recorded under {log['game_type']} rules version {log['rules_version']}; "
+            f"the engine is at version {game.RULES_VERSION}"
+        )
+    game.setup_game(log["players"])
+
+    for _, player_id, action in db.iter_actions(game_id, upto):
+        if player_id is None:
+            game.advance_turn()
+        else:
+            game.execute_action(player_id, action)
+
+    return game
@@ -0,0 +1,82 @@
+import copy
+from typing import Any, List
+
+# Ops are compact lists so they serialize small:
+#   ["s", path, value]   set path to value
+#   ["d", path]          delete dict key at path
+#   ["x", path, items]   extend list at path with items
+#   ["t", path, length]  truncate list at path to length
+
+
+def diff_states(old: Any, new: Any) -> List:
+    ops = []
+    _diff(old, new, [], ops)
+    return ops
+
+
+def _diff(old: Any, new: Any, path: List, ops: List):
+    if type(old) is not type(new):
+        ops.append(["s", path, new])
+        return
+
+    if isinstance(new, dict):
+        for key, value in new.items():
+            if key not in old:
+                ops.append(["s", path + [key], value])
+            elif old[key] != value:
+                _diff(old[key], value, path + [key], ops)
+        for key in old:
+            if key not in new:
+                ops.append(["d", path + [key]])
+        return
+
+    if isinstance(new, list):
+        common = min(len(old), len(new))
+        changed = [i for i in range(common) if old[i] != new[i]]
+
+        # Rewriting most of a list element by element costs more than
+        # sending it whole (e.g. after a shuffle).
+        if len(changed) > max(4, common // 2):
+            ops.append(["s", path, new])
+            return
+
+        for i in changed:
+            _diff(old[i], new[i], path + [i], ops)
+        if len(new) > len(old):
+            ops.append(["x", path, new[common:]])
+        elif len(new) < len(old):
+            ops.append(["t", path, len(new)])
+        return
+
+    if old != new:
+        ops.append(["s", path, new])
+
+
+def apply_diff(state: Any, ops: List) -> Any:
+    for op in ops:
+        kind, path = op[0], op[1]
+
+        if kind == "s" and not path:
+            state = copy.deepcopy(op[2])
+            continue
+
+        if kind in ("x", "t"):
+            target = state
+            for key in path:
+                target = target[key]
+            if kind == "x":
+                target.extend(copy.deepcopy(op[2]))
+            else:
+                del target[op[2]:]
+            continue
+
+        parent = state
+        for key in path[:-1]:
+            parent = parent[key]
+
+        if kind == "s":
+            parent[path[-1]] = copy.deepcopy(op[2])
+        elif kind == "d":
+            del parent[path[-1]]
+
+    return state
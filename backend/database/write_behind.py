@@ -0,0 +1,135 @@
+import json
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional
+
+from database.game_state import GameStateDatabase, _dumps
+from utils.logger import setup_logger
+
+logger = setup_logger('write_behind')
+
+_STOP = object()
+
+
+# Moves GameStateDatabase writes off the request path.
+#
+# State saves are coalesced: a game saved several times within `window`
+# seconds gets one history row per batch, holding its latest state. Each
+# state is copied when it is queued, so the row is the game as it was then,
+# whatever happens to the engine object afterwards (hibernation included).
+# Action-log writes keep their order, and an AI seat's decision is stored on
+# the action it chose. Requests hold game_lock(game_id) while mutating an
+# engine, and queue its state before releasing it.
+class WriteBehindQueue:
+    def __init__(self, db: GameStateDatabase, window: float = 0.2, batch_size: int = 200):
+        self.db = db
+        self.window = window
+        self.batch_size = batch_size
+
+        self._queue = queue.Queue()
+        self._game_locks = defaultdict(threading.RLock)
+        self._locks_guard = threading.Lock()
+        self._idle = threading.Condition()
+        # Items are numbered as they are queued; the worker writes them in
+        # that order, so everything up to `_written` is on disk.
+        self._queued = 0
+        self._written = 0
+        self._closed = False
+
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def game_lock(self, game_id: str) -> threading.RLock:
+        with self._locks_guard:
+            return self._game_locks[game_id]
+
+    def _put(self, item):
+        with self._idle:
+            self._queued += 1
+            self._queue.put(item)
+
+    def save(self, game_id: str, game_name: str, state: Dict):
+        self._put(("state", game_id, game_name, _copy(state)))
+
+    def start_action_log(self, game_id: str, game_type: str, seed: int, players, rules_version: int):
+        self._put(("call", self.db.start_action_log, (game_id, game_type, seed, _copy(players), rules_version)))
+
+    def record_action(self, game_id: str, player_id: Optional[int], action: Optional[Dict] = None,
+                      decision: Optional[Dict] = None):
+        # Engines may mutate the action they execute, so it is copied now.
+        self._put(("call", self.db.record_action, (game_id, player_id, _copy(action), _copy(decision))))
+
+    def submit(self, fn: Callable, *args):
+        # Another store's write, run on the worker in queue order. Arguments
+        # are copied now for the same reason as actions.
+        self._put(("call", fn, tuple(_copy(arg) for arg in args)))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.put(_STOP)
+                    break
+                batch.append(item)
+
+            try:
+                self._write(batch)
+            except Exception:
+                logger.exception("Write-behind batch of %d items failed", len(batch))
+            finally:
+                with self._idle:
+                    self._written += len(batch)
+                    self._idle.notify_all()
+
+    def _write(self, batch):
+        saves = {}
+        for item in batch:
+            if item[0] == "call":
+                _, fn, args = item
+                fn(*args)
+                continue
+
+            _, game_id, game_name, state = item
+            saves[game_id] = (game_name, state)
+
+        for game_id, (game_name, state) in saves.items():
+            self.db.save_game_state(game_id, game_name, state)
+
+        self.db.flush()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        # Blocks until everything queued before the call has been written;
+        # writes queued meanwhile are not waited for. False on timeout.
+        with self._idle:
+            watermark = self._queued
+            return self._idle.wait_for(lambda: self._written >= watermark, timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join()
+
+    def pending(self) -> int:
+        with self._idle:
+            return self._queued - self._written
+
+
+def _copy(data):
+    return json.loads(_dumps(data)) if data is not None else None
@@ -0,0 +1,68 @@
+from itertools import islice, product
+from typing import Callable, Dict, Iterator, Sequence
+
+
+# A group of actions of one type that differ only in their parameters, e.g.
+# "bid, amount in 0..N" or "ship, territory x forces". Parameters are
+# sequences of plain labels (numbers, ids, names); build(*labels), called with
+# one label per parameter in declaration order, turns a combination into the
+# concrete action dict. Combinations are expanded in nested-loop order, first
+# parameter outermost.
+class ActionFamily:
+    def __init__(self, action_type: str, build: Callable[..., Dict], description: str = "",
+                 **params: Sequence):
+        self.action_type = action_type
+        self.build = build
+        self.description = description
+        self.params = params
+
+    @staticmethod
+    def single(action: Dict) -> 'ActionFamily':
+        return SingleAction(action)
+
+    def __len__(self) -> int:
+        size = 1
+        for values in self.params.values():
+            size *= len(values)
+        return size
+
+    def expand(self, start: int = 0) -> Iterator[Dict]:
+        build = self.build
+        params = list(self.params.values())
+
+        if len(params) == 1:
+            for value in islice(params[0], start, None):
+                yield build(value)
+        else:
+            for values in islice(product(*params), start, None):
+                yield build(*values)
+
+    def describe(self) -> Dict:
+        return {
+            "type": self.action_type,
+            "description": self.description,
+            "count": len(self),
+            "params": {name: _describe_param(values) for name, values in self.params.items()}
+        }
+
+
+class SingleAction(ActionFamily):
+    # A family of exactly one, already built action.
+    def __init__(self, action: Dict):
+        self.action_type = action.get("type")
+        self.build = None
+        self.description = action.get("description", "")
+        self.params = {}
+        self.action = action
+
+    def __len__(self) -> int:
+        return 1
+
+    def expand(self, start: int = 0) -> Iterator[Dict]:
+        return iter((self.action,) if start == 0 else ())
+
+
+def _describe_param(values: Sequence) -> Dict:
+    if isinstance(values, range) and values.step == 1:
+        return {"min": values.start, "max": values.stop - 1}
+    return {"choices": list(values)}
@@ -1,46 +1,153 @@
+from collections import Counter
 from typing import Dict, List, Optional
 import json
+import random
 
-class BrassBirmingham:
-    def __init__(self):
+from .random_state import RandomStateMixin
+from .versioned_state import VersionedStateMixin
+
+CONNECTIONS = {
+    "birmingham": ["coventry", "walsall", "wolverhampton"],
+    "coventry": ["birmingham", "nuneaton"],
+    "wolverhampton": ["birmingham", "walsall", "kidderminster"],
+    "walsall": ["birmingham", "wolverhampton", "cannock"],
+    "kidderminster": ["wolverhampton", "worcester"],
+    "worcester": ["kidderminster", "gloucester"],
+    "gloucester": ["worcester"],
+    "nuneaton": ["coventry", "tamworth"],
+    "tamworth": ["nuneaton", "burton"],
+    "burton": ["tamworth", "derby"],
+    "derby": ["burton", "belper"],
+    "belper": ["derby"],
+    "cannock": ["walsall", "stafford"],
+    "stafford": ["cannock", "stone"],
+    "stone": ["stafford", "uttoxeter"],
+    "uttoxeter": ["stone", "burton"]
+}
+CITIES = list(CONNECTIONS)
+CITY_INDEX = {city: idx for idx, city in enumerate(CITIES)}
+
+
+def _build_routes():
+    # Each route once, oriented the way the board first lists it.
+    edges, index = [], {}
+    for city, neighbours in CONNECTIONS.items():
+        for other in neighbours:
+            if (city, other) not in index:
+                index[(city, other)] = index[(other, city)] = len(edges)
+                edges.append((city, other))
+    return tuple(edges), index
+
+
+# Networks and built links are bitmasks: bit i of a city mask is CITIES[i],
+# bit i of a link mask is ROUTES[i].
+ROUTES, ROUTE_INDEX = _build_routes()
+ROUTE_CITIES = tuple(1 << CITY_INDEX[a] | 1 << CITY_INDEX[b] for a, b in ROUTES)
+CITY_ROUTES = tuple(
+    sum(1 << route for route, ends in enumerate(ROUTE_CITIES) if ends >> city & 1)
+    for city in range(len(CITIES))
+)
+
+
+INDUSTRIES = ["cotton", "coal", "iron", "pottery", "brewery", "manufacturer"]
+BASE_COSTS = {
+    "cotton": [12, 16, 20],
+    "coal": [8, 10, 12],
+    "iron": [8, 10, 12],
+    "pottery": [10, 14],
+    "brewery": [6, 8, 10, 12],
+    "manufacturer": [10, 14, 18, 22]
+}
+MAX_LEVEL = 4
+LINK_COSTS = {"canal": 3, "rail": 5}
+
+
+def _build_cost(industry: str, level: int, city: str) -> int:
+    costs = BASE_COSTS.get(industry, [10])
+    base_cost = costs[min(level - 1, len(costs) - 1)]
+    
+    if city == "birmingham":
+        base_cost += 2
+    
+    return base_cost
+
+
+def _build_action(industry: str, level: int, city: str) -> Dict:
+    cost = _build_cost(industry, level, city)
+    return {
+        "id": f"build_{industry}_{city}",
+        "type": "build",
+        "industry": industry,
+        "location": city,
+        "level": level,
+        "cost": cost,
+        "description": f"Build level {level} {industry} in {city} for £{cost}"
+    }
+
+
+def _link_action(route: int, cost: int) -> Dict:
+    city1, city2 = ROUTES[route]
+    return {
+        "id": f"link_{city1}_{city2}",
+        "type": "link",
+        "from": city1,
+        "to": city2,
+        "cost": cost,
+        "description": f"Build link from {city1} to {city2} for £{cost}"
+    }
+
+
+# Every build and link option is built once and shared between calls.
+BUILD_ACTIONS = {
+    (industry, level, city): _build_action(industry, level, city)
+    for industry in INDUSTRIES for level in range(1, MAX_LEVEL + 1) for city in CITIES
+}
+LINK_ACTIONS = {
+    (route, cost): _link_action(route, cost)
+    for route in range(len(ROUTES)) for cost in LINK_COSTS.values()
+}
+LOAN_ACTION = {
+    "id": "take_loan",
+    "type": "loan",
+    "amount": 30,
+    "income_penalty": -3,
+    "description": "Take £30 loan (reduce income by 3)"
+}
+PASS_ACTION = {
+    "id": "pass",
+    "type": "pass",
+    "description": "Pass turn"
+}
+
+
+def _bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BrassBirmingham(RandomStateMixin, VersionedStateMixin):
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.players = []
         self.current_turn = 0
         self.current_phase = "canal"
         self.board = self._initialize_board()
         self.deck = self._initialize_deck()
         self.discarded = []
+        # Links built this era, and per player the cities in their network,
+        # the routes touching it and how many tiles they have on the board.
+        self.built_links = 0
+        self.networks = []
+        self.reachable_routes = []
+        self.tiles_placed = []
         
     def _initialize_board(self) -> Dict:
         cities = {
-            "birmingham": {"connections": ["coventry", "walsall", "wolverhampton"], 
-                          "industries": [], "beer": 0},
-            "coventry": {"connections": ["birmingham", "nuneaton"], 
-                        "industries": [], "beer": 0},
-            "wolverhampton": {"connections": ["birmingham", "walsall", "kidderminster"], 
-                             "industries": [], "beer": 0},
-            "walsall": {"connections": ["birmingham", "wolverhampton", "cannock"], 
-                       "industries": [], "beer": 0},
-            "kidderminster": {"connections": ["wolverhampton", "worcester"], 
-                             "industries": [], "beer": 0},
-            "worcester": {"connections": ["kidderminster", "gloucester"], 
-                         "industries": [], "beer": 0},
-            "gloucester": {"connections": ["worcester"], "industries": [], "beer": 0},
-            "nuneaton": {"connections": ["coventry", "tamworth"], 
-                        "industries": [], "beer": 0},
-            "tamworth": {"connections": ["nuneaton", "burton"], 
-                        "industries": [], "beer": 0},
-            "burton": {"connections": ["tamworth", "derby"], 
-                      "industries": [], "beer": 0},
-            "derby": {"connections": ["burton", "belper"], "industries": [], "beer": 0},
-            "belper": {"connections": ["derby"], "industries": [], "beer": 0},
-            "cannock": {"connections": ["walsall", "stafford"], 
-                       "industries": [], "beer": 0},
-            "stafford": {"connections": ["cannock", "stone"], 
-                        "industries": [], "beer": 0},
-            "stone": {"connections": ["stafford", "uttoxeter"], 
-                     "industries": [], "beer": 0},
-            "uttoxeter": {"connections": ["stone", "burton"], 
-                         "industries": [], "beer": 0}
+            city: {"connections": list(connections), "industries": [], "beer": 0}
+            for city, connections in CONNECTIONS.items()
         }
         
         return {
@@ -58,12 +165,10 @@ class BrassBirmingham:
         for city in cities:
             cards.extend([{"type": "location", "value": city}] * 2)
         
-        industries = ["cotton", "coal", "iron", "pottery", "brewery", "manufacturer"]
-        for industry in industries:
+        for industry in INDUSTRIES:
             cards.extend([{"type": "industry", "value": industry}] * 3)
         
-        import random
-        random.shuffle(cards)
+        self.rng.shuffle(cards)
         return cards
     
     def setup_game(self, player_names: List[str]) -> Dict:
@@ -97,6 +202,11 @@ class BrassBirmingham:
             
             self.players.append(player)
         
+        self.built_links = 0
+        self.networks = [0] * len(self.players)
+        self.reachable_routes = [0] * len(self.players)
+        self.tiles_placed = [0] * len(self.players)
+        
         return self.get_game_state()
     
     def get_game_state(self) -> Dict:
@@ -114,93 +224,72 @@ class BrassBirmingham:
             return []
         
         player = self.players[player_id]
+        money = player["money"]
+        tiles = player["industries"]
         actions = []
-        
-        for card in player["hand"]:
-            if card["type"] == "location":
-                city = card["value"]
-                
-                for industry_type in player["industries"]:
-                    if player["industries"][industry_type]:
-                        level = player["industries"][industry_type][0]
-                        cost = self._calculate_build_cost(industry_type, level, city)
-                        
-                        if player["money"] >= cost:
-                            actions.append({
-                                "id": f"build_{industry_type}_{city}",
-                                "type": "build",
-                                "industry": industry_type,
-                                "location": city,
-                                "level": level,
-                                "cost": cost,
-                                "description": f"Build level {level} {industry_type} in {city} for £{cost}"
-                            })
+        seen = set()
+        
+        # Each distinct card once: duplicates in hand offer the same builds.
+        for card_type, value in self._hand_counts(player):
+            if card_type == "location":
+                options = [(industry, value) for industry in tiles]
+            elif card_type == "industry":
+                options = [(value, city) for city in self._network_cities(player_id)]
+            else:
+                continue
             
-            elif card["type"] == "industry":
-                industry_type = card["value"]
-                for city in self.board["cities"]:
-                    if player["industries"][industry_type]:
-                        level = player["industries"][industry_type][0]
-                        cost = self._calculate_build_cost(industry_type, level, city)
-                        
-                        if player["money"] >= cost:
-                            actions.append({
-                                "id": f"build_{industry_type}_{city}",
-                                "type": "build",
-                                "industry": industry_type,
-                                "location": city,
-                                "level": level,
-                                "cost": cost,
-                                "description": f"Build level {level} {industry_type} in {city} for £{cost}"
-                            })
-        
-        for city1 in self.board["cities"]:
-            for city2 in self.board["cities"][city1]["connections"]:
-                link_cost = 3 if self.current_phase == "canal" else 5
+            for industry, city in options:
+                if not tiles[industry] or (industry, city) in seen:
+                    continue
+                seen.add((industry, city))
                 
-                if player["money"] >= link_cost and player["links"] > 0:
-                    actions.append({
-                        "id": f"link_{city1}_{city2}",
-                        "type": "link",
-                        "from": city1,
-                        "to": city2,
-                        "cost": link_cost,
-                        "description": f"Build link from {city1} to {city2} for £{link_cost}"
-                    })
-        
-        actions.append({
-            "id": "take_loan",
-            "type": "loan",
-            "amount": 30,
-            "income_penalty": -3,
-            "description": "Take £30 loan (reduce income by 3)"
-        })
+                action = self._build_option(industry, tiles[industry][0], city)
+                if money >= action["cost"]:
+                    actions.append(action)
         
-        actions.append({
-            "id": "pass",
-            "type": "pass",
-            "description": "Pass turn"
-        })
+        link_cost = LINK_COSTS[self.current_phase]
+        if money >= link_cost and player["links"] > 0:
+            actions.extend(LINK_ACTIONS[(route, link_cost)] for route in _bits(self._open_routes(player_id)))
+        
+        actions.append(LOAN_ACTION)
+        actions.append(PASS_ACTION)
         
         return actions
     
+    def _hand_counts(self, player: Dict) -> Counter:
+        return Counter((card["type"], card["value"]) for card in player["hand"])
+    
+    def _build_option(self, industry: str, level: int, city: str) -> Dict:
+        action = BUILD_ACTIONS.get((industry, level, city))
+        return action if action is not None else _build_action(industry, level, city)
+    
+    def _network_cities(self, player_id: int) -> List[str]:
+        if not self.tiles_placed[player_id]:
+            return CITIES
+        return [CITIES[city] for city in _bits(self.networks[player_id])]
+    
+    def _in_network(self, player_id: int, city: str) -> bool:
+        # With nothing on the board yet, a player may start anywhere.
+        return not self.tiles_placed[player_id] or bool(self.networks[player_id] >> CITY_INDEX[city] & 1)
+    
+    def _open_routes(self, player_id: int) -> int:
+        reachable = self.reachable_routes[player_id] if self.tiles_placed[player_id] else (1 << len(ROUTES)) - 1
+        return reachable & ~self.built_links
+    
+    def _extend_network(self, player_id: int, cities: int):
+        added = cities & ~self.networks[player_id]
+        self.networks[player_id] |= added
+        for city in _bits(added):
+            self.reachable_routes[player_id] |= CITY_ROUTES[city]
+    
+    def _can_build(self, player: Dict, industry: str, city: str) -> bool:
+        # A location card builds there regardless of network; an industry
+        # card builds that industry anywhere in the player's network.
+        hand = self._hand_counts(player)
+        return bool(hand[("location", city)]) or bool(hand[("industry", industry)] and self._in_network(player["id"], city))
+    
     def _calculate_build_cost(self, industry: str, level: int, city: str) -> int:
-        base_costs = {
-            "cotton": [12, 16, 20],
-            "coal": [8, 10, 12],
-            "iron": [8, 10, 12],
-            "pottery": [10, 14],
-            "brewery": [6, 8, 10, 12],
-            "manufacturer": [10, 14, 18, 22]
-        }
-        
-        costs = base_costs.get(industry, [10])
-        base_cost = costs[min(level - 1, len(costs) - 1)]
-        
-        if city == "birmingham":
-            base_cost += 2
-        
-        return base_cost
+        return self._build_option(industry, level, city)["cost"]
     
     def execute_action(self, player_id: int, action: Dict) -> Dict:
         if not self.players or player_id >= len(self.players):
@@ -232,6 +321,9 @@ class BrassBirmingham:
         if not player["industries"][industry]:
             return {"success": False, "error": "No industries available"}
         
+        if location not in CITY_INDEX or not self._can_build(player, industry, location):
+            return {"success": False, "error": "Location not reachable with cards in hand"}
+        
         player["money"] -= cost
         player["industries"][industry].pop(0)
         
@@ -245,6 +337,9 @@ class BrassBirmingham:
         if industry == "brewery":
             self.board["cities"][location]["beer"] += level
         
+        self.tiles_placed[player["id"]] += 1
+        self._extend_network(player["id"], 1 << CITY_INDEX[location])
+        
         return {
             "success": True,
             "action": "build",
@@ -263,8 +358,18 @@ class BrassBirmingham:
         if player["links"] <= 0:
             return {"success": False, "error": "No links available"}
         
+        route = ROUTE_INDEX.get((from_city, to_city))
+        if route is None:
+            return {"success": False, "error": "No route between those locations"}
+        
+        if not self._open_routes(player["id"]) >> route & 1:
+            return {"success": False, "error": "Route already built or not connected to your network"}
+        
         player["money"] -= cost
         player["links"] -= 1
+        self.built_links |= 1 << route
+        self.tiles_placed[player["id"]] += 1
+        self._extend_network(player["id"], ROUTE_CITIES[route])
         
         link_type = "canals" if self.current_phase == "canal" else "rails"
         self.board[link_type].append({
@@ -328,6 +433,26 @@ class BrassBirmingham:
             player["income_collected"] = False
         
         self.board["canals"] = []
+        self._rebuild_networks()
+    
+    def _rebuild_networks(self):
+        # Canals leave the board between eras, so networks are recomputed
+        # from what is still there.
+        self.built_links = 0
+        self.networks = [0] * len(self.players)
+        self.reachable_routes = [0] * len(self.players)
+        self.tiles_placed = [0] * len(self.players)
+        
+        for city, data in self.board["cities"].items():
+            for industry in data["industries"]:
+                self.tiles_placed[industry["player"]] += 1
+                self._extend_network(industry["player"], 1 << CITY_INDEX[city])
+        
+        for link in self.board["rails"]:
+            route = ROUTE_INDEX[(link["from"], link["to"])]
+            self.built_links |= 1 << route
+            self.tiles_placed[link["player"]] += 1
+            self._extend_network(link["player"], ROUTE_CITIES[route])
     
     def _game_end(self):
         for player in self.players:
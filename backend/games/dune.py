@@ -1,8 +1,74 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
+import functools
 import random
 
-class Dune:
-    def __init__(self):
+from .action_families import ActionFamily
+from .random_state import RandomStateMixin
+from .versioned_state import VersionedStateMixin
+
+# Actual Dune board territories with their connections and storm sectors
+TERRITORIES = {
+    "arrakeen": {"type": "stronghold", "sectors": [0, 1],
+        "connections": ["carthag", "funeral_plain", "habbanya_ridge"]},
+    "carthag": {"type": "stronghold", "sectors": [2, 3],
+        "connections": ["arrakeen", "imperial_basin", "harg_pass"]},
+    "tueks_sietch": {"type": "stronghold", "sectors": [4, 5],
+        "connections": ["habbanya_ridge", "sietch_tabr", "false_wall_south"]},
+    "sietch_tabr": {"type": "stronghold", "sectors": [6, 7],
+        "connections": ["tueks_sietch", "red_chasm", "habbanya_ridge"]},
+    "habbanya_ridge": {"type": "territory", "sectors": [8, 9],
+        "connections": ["arrakeen", "tueks_sietch", "sietch_tabr", "funeral_plain"]},
+    "funeral_plain": {"type": "territory", "sectors": [10, 11],
+        "connections": ["arrakeen", "habbanya_ridge", "the_greater_flat"]},
+    "imperial_basin": {"type": "territory", "sectors": [12, 13],
+        "connections": ["carthag", "harg_pass", "cielago_depression"]},
+    "harg_pass": {"type": "territory", "sectors": [14, 15],
+        "connections": ["carthag", "imperial_basin", "false_wall_west"]},
+    "false_wall_south": {"type": "territory", "sectors": [16, 17],
+        "connections": ["tueks_sietch", "the_minor_erg", "pasty_mesa"]},
+    "false_wall_west": {"type": "territory", "sectors": [18, 19],
+        "connections": ["harg_pass", "pasty_mesa", "false_wall_south"]},
+    "red_chasm": {"type": "territory", "sectors": [20, 21],
+        "connections": ["sietch_tabr", "south_mesa", "rimwall_west"]},
+    "the_greater_flat": {"type": "territory", "sectors": [22, 23],
+        "connections": ["funeral_plain", "habbanya_ridge", "cielago_depression"]},
+    "cielago_depression": {"type": "territory", "sectors": [24, 25],
+        "connections": ["imperial_basin", "the_greater_flat", "south_mesa"]},
+    "south_mesa": {"type": "territory", "sectors": [26, 27],
+        "connections": ["red_chasm", "cielago_depression", "the_minor_erg"]},
+    "the_minor_erg": {"type": "territory", "sectors": [28, 29],
+        "connections": ["false_wall_south", "south_mesa", "pasty_mesa"]},
+    "pasty_mesa": {"type": "territory", "sectors": [30, 31],
+        "connections": ["false_wall_south", "false_wall_west", "the_minor_erg"]},
+    "rimwall_west": {"type": "territory", "sectors": [32, 33],
+        "connections": ["red_chasm"]},
+    "polar_sink": {"type": "special", "sectors": [34, 35],
+        "connections": []}
+}
+TERRITORY_ORDER = {name: idx for idx, name in enumerate(TERRITORIES)}
+
+
+def _territories_by_sector() -> Dict[int, List[str]]:
+    sectors = {}
+    for name, data in TERRITORIES.items():
+        for sector in data["sectors"]:
+            sectors.setdefault(sector, []).append(name)
+    return sectors
+
+
+SECTOR_TERRITORIES = _territories_by_sector()
+REVIVAL_COSTS = [2, 2, 2, 3, 3, 3, 4, 4, 4, 5]
+PASS_ACTION = {
+    "id": "pass",
+    "type": "pass",
+    "description": "Pass current phase"
+}
+
+
+class Dune(RandomStateMixin, VersionedStateMixin):
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.players = []
         self.current_turn = 0
         self.current_phase = "bidding"
@@ -11,136 +77,19 @@ class Dune:
         self.spice_deck = []
         self.treachery_deck = []
         self.board = self._initialize_board()
+        # Per player, territory -> their occupant entry on the board
+        self.stacks = []
         
     def _initialize_board(self) -> Dict:
-        # Implementing actual Dune board with territories and connections
         territories = {
-            "arrakeen": {
-                "type": "stronghold",
-                "connections": ["carthag", "funeral_plain", "habbanya_ridge"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [0, 1]
-            },
-            "carthag": {
-                "type": "stronghold",
-                "connections": ["arrakeen", "imperial_basin", "harg_pass"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [2, 3]
-            },
-            "tueks_sietch": {
-                "type": "stronghold",
-                "connections": ["habbanya_ridge", "sietch_tabr", "false_wall_south"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [4, 5]
-            },
-            "sietch_tabr": {
-                "type": "stronghold",
-                "connections": ["tueks_sietch", "red_chasm", "habbanya_ridge"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [6, 7]
-            },
-            "habbanya_ridge": {
-                "type": "territory",
-                "connections": ["arrakeen", "tueks_sietch", "sietch_tabr", "funeral_plain"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [8, 9]
-            },
-            "funeral_plain": {
-                "type": "territory",
-                "connections": ["arrakeen", "habbanya_ridge", "the_greater_flat"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [10, 11]
-            },
-            "imperial_basin": {
-                "type": "territory",
-                "connections": ["carthag", "harg_pass", "cielago_depression"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [12, 13]
-            },
-            "harg_pass": {
-                "type": "territory",
-                "connections": ["carthag", "imperial_basin", "false_wall_west"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [14, 15]
-            },
-            "false_wall_south": {
-                "type": "territory",
-                "connections": ["tueks_sietch", "the_minor_erg", "pasty_mesa"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [16, 17]
-            },
-            "false_wall_west": {
-                "type": "territory",
-                "connections": ["harg_pass", "pasty_mesa", "false_wall_south"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [18, 19]
-            },
-            "red_chasm": {
-                "type": "territory",
-                "connections": ["sietch_tabr", "south_mesa", "rimwall_west"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [20, 21]
-            },
-            "the_greater_flat": {
-                "type": "territory",
-                "connections": ["funeral_plain", "habbanya_ridge", "cielago_depression"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [22, 23]
-            },
-            "cielago_depression": {
-                "type": "territory",
-                "connections": ["imperial_basin", "the_greater_flat", "south_mesa"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [24, 25]
-            },
-            "south_mesa": {
-                "type": "territory",
-                "connections": ["red_chasm", "cielago_depression", "the_minor_erg"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [26, 27]
-            },
-            "the_minor_erg": {
-                "type": "territory",
-                "connections": ["false_wall_south", "south_mesa", "pasty_mesa"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [28, 29]
-            },
-            "pasty_mesa": {
-                "type": "territory",
-                "connections": ["false_wall_south", "false_wall_west", "the_minor_erg"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [30, 31]
-            },
-            "rimwall_west": {
-                "type": "territory",
-                "connections": ["red_chasm"],
-                "occupants": [],
-                "spice": 0,
-                "sectors": [32, 33]
-            },
-            "polar_sink": {
-                "type": "special",
-                "connections": [],
+            name: {
+                "type": data["type"],
+                "connections": list(data["connections"]),
                 "occupants": [],
                 "spice": 0,
-                "sectors": [34, 35]
+                "sectors": list(data["sectors"])
             }
+            for name, data in TERRITORIES.items()
         }
         
         return {
@@ -172,15 +121,15 @@ class Dune:
             {"id": "worthless_3", "type": "worthless", "name": "Worthless Card"}
         ]
         
-        random.shuffle(self.treachery_deck)
+        self.rng.shuffle(self.treachery_deck)
         
         # Creating spice blow cards
         self.spice_deck = []
         for i in range(20):
             self.spice_deck.append({
-                "territory": random.choice(list(self.board["territories"].keys())),
-                "amount": random.randint(2, 5),
-                "sandworm": random.random() < 0.3
+                "territory": self.rng.choice(list(self.board["territories"].keys())),
+                "amount": self.rng.randint(2, 5),
+                "sandworm": self.rng.random() < 0.3
             })
     
     def setup_game(self, player_configs: List[Dict]) -> Dict:
@@ -270,13 +219,11 @@ class Dune:
         self._initialize_decks()
         
         # Place initial forces
+        self.stacks = [{} for _ in self.players]
         for player in self.players:
             for stronghold in player["faction_data"]["strongholds"]:
                 if stronghold in self.board["territories"]:
-                    self.board["territories"][stronghold]["occupants"].append({
-                        "player_id": player["id"],
-                        "forces": player["forces"]
-                    })
+                    self._add_forces(player["id"], stronghold, player["forces"])
         
         return self.get_game_state()
     
@@ -341,110 +288,154 @@ class Dune:
         }
     
     def get_available_actions(self, player_id: int) -> List[Dict]:
+        actions = []
+        for family in self.action_families(player_id):
+            actions.extend(family.expand())
+        return actions
+    
+    def action_families(self, player_id: int) -> List[ActionFamily]:
         if not self.players or player_id >= len(self.players):
             return []
         
         player = self.players[player_id]
-        actions = []
+        families = []
         
         if self.current_phase == "bidding":
             # Bidding on treachery cards
-            for amount in range(0, min(player["spice"] + 1, 20)):
-                actions.append({
-                    "id": f"bid_{amount}",
-                    "type": "bid",
-                    "amount": amount,
-                    "description": f"Bid {amount} spice for treachery card"
-                })
+            families.append(ActionFamily(
+                "bid", self._bid_action, "Bid spice for treachery card",
+                amount=range(0, min(player["spice"] + 1, 20))
+            ))
         
         elif self.current_phase == "revival":
-            # Revive forces from Tleilaxu tanks
-            revival_costs = [2, 2, 2, 3, 3, 3, 4, 4, 4, 5]
-            for i in range(min(len(revival_costs), player["forces_reserve"])):
-                cost = revival_costs[i]
-                if player["spice"] >= cost:
-                    actions.append({
-                        "id": f"revive_{i+1}",
-                        "type": "revive",
-                        "forces": i + 1,
-                        "cost": sum(revival_costs[:i+1]),
-                        "description": f"Revive {i+1} forces for {sum(revival_costs[:i+1])} spice"
-                    })
+            # Revive forces from Tleilaxu tanks; costs only rise, so the
+            # affordable counts are a prefix
+            affordable = 0
+            for cost in REVIVAL_COSTS[:player["forces_reserve"]]:
+                if player["spice"] < cost:
+                    break
+                affordable += 1
+            families.append(ActionFamily(
+                "revive", self._revive_action, "Revive forces from the tanks",
+                forces=range(1, affordable + 1)
+            ))
         
         elif self.current_phase == "shipment":
             # Ship forces from reserves
-            for territory in player["controlled_territories"]:
-                for forces in range(1, min(player["forces_reserve"] + 1, 8)):
-                    cost = 1 if player["faction"] == "guild" else forces
-                    if player["spice"] >= cost:
-                        actions.append({
-                            "id": f"ship_{territory}_{forces}",
-                            "type": "shipment",
-                            "territory": territory,
-                            "forces": forces,
-                            "cost": cost,
-                            "description": f"Ship {forces} forces to {territory} for {cost} spice"
-                        })
+            max_forces = min(player["forces_reserve"], 7)
+            if player["faction"] == "guild":
+                max_forces = max_forces if player["spice"] >= 1 else 0
+            else:
+                max_forces = min(max_forces, player["spice"])
+            families.append(ActionFamily(
+                "shipment", functools.partial(self._shipment_action, player), "Ship forces to a territory",
+                territory=player["controlled_territories"], forces=range(1, max_forces + 1)
+            ))
         
         elif self.current_phase == "movement":
             # Movement actions
-            for territory, data in self.board["territories"].items():
-                for occupant in data["occupants"]:
-                    if occupant["player_id"] == player_id:
-                        for connected in data["connections"]:
-                            movement_cost = self._calculate_movement_cost(
-                                player, territory, connected, occupant["forces"]
-                            )
-                            
-                            if player["spice"] >= movement_cost:
-                                actions.append({
-                                    "id": f"move_{territory}_{connected}",
-                                    "type": "movement",
-                                    "from": territory,
-                                    "to": connected,
-                                    "forces": occupant["forces"],
-                                    "cost": movement_cost,
-                                    "description": f"Move {occupant['forces']} from {territory} to {connected}"
-                                })
+            for territory, occupant in self._player_stacks(player_id):
+                for connected in TERRITORIES[territory]["connections"]:
+                    movement_cost = self._calculate_movement_cost(
+                        player, territory, connected, occupant["forces"]
+                    )
+                    
+                    if player["spice"] >= movement_cost:
+                        families.append(ActionFamily.single({
+                            "id": f"move_{territory}_{connected}",
+                            "type": "movement",
+                            "from": territory,
+                            "to": connected,
+                            "forces": occupant["forces"],
+                            "cost": movement_cost,
+                            "description": f"Move {occupant['forces']} from {territory} to {connected}"
+                        }))
         
         elif self.current_phase == "battle":
             # Battle actions - select leader and treachery cards
-            for leader in player["leaders"]:
-                if leader["alive"]:
-                    for weapon in [None] + [c for c in player["treachery_cards"] if c.get("type") == "weapon"]:
-                        for defense in [None] + [c for c in player["treachery_cards"] if c.get("type") == "defense"]:
-                            actions.append({
-                                "id": f"battle_{leader['name']}_{weapon['id'] if weapon else 'none'}_{defense['id'] if defense else 'none'}",
-                                "type": "battle_plan",
-                                "leader": leader,
-                                "weapon": weapon,
-                                "defense": defense,
-                                "description": f"Fight with {leader['name']}" + 
-                                             (f" using {weapon['name']}" if weapon else "") +
-                                             (f" and {defense['name']}" if defense else "")
-                            })
+            leaders = {leader["name"]: leader for leader in reversed(player["leaders"]) if leader["alive"]}
+            cards = {card["id"]: card for card in reversed(player["treachery_cards"])}
+            families.append(ActionFamily(
+                "battle_plan", functools.partial(self._battle_action, leaders, cards), "Choose a battle plan",
+                leader=[leader["name"] for leader in player["leaders"] if leader["alive"]],
+                weapon=[None] + [c["id"] for c in player["treachery_cards"] if c.get("type") == "weapon"],
+                defense=[None] + [c["id"] for c in player["treachery_cards"] if c.get("type") == "defense"]
+            ))
         
         elif self.current_phase == "spice_collection":
             # Collect spice from occupied territories
-            for territory, data in self.board["territories"].items():
-                if data["spice"] > 0:
-                    for occupant in data["occupants"]:
-                        if occupant["player_id"] == player_id:
-                            actions.append({
-                                "id": f"collect_{territory}",
-                                "type": "collect_spice",
-                                "territory": territory,
-                                "amount": data["spice"],
-                                "description": f"Collect {data['spice']} spice from {territory}"
-                            })
-        
-        actions.append({
-            "id": "pass",
-            "type": "pass",
-            "description": "Pass current phase"
-        })
+            for territory, _ in self._player_stacks(player_id):
+                spice = self.board["territories"][territory]["spice"]
+                if spice > 0:
+                    families.append(ActionFamily.single({
+                        "id": f"collect_{territory}",
+                        "type": "collect_spice",
+                        "territory": territory,
+                        "amount": spice,
+                        "description": f"Collect {spice} spice from {territory}"
+                    }))
+        
+        families.append(ActionFamily.single(PASS_ACTION))
+        
+        return families
+    
+    def _player_stacks(self, player_id: int):
+        # The player's stacks in board order
+        stacks = self.stacks[player_id]
+        return [(territory, stacks[territory]) for territory in sorted(stacks, key=TERRITORY_ORDER.__getitem__)]
+    
+    def _add_forces(self, player_id: int, territory: str, forces: int):
+        existing = self.stacks[player_id].get(territory)
         
-        return actions
+        if existing:
+            existing["forces"] += forces
+        else:
+            occupant = {"player_id": player_id, "forces": forces}
+            self.board["territories"][territory]["occupants"].append(occupant)
+            self.stacks[player_id][territory] = occupant
+    
+    def _bid_action(self, amount: int) -> Dict:
+        return {
+            "id": f"bid_{amount}",
+            "type": "bid",
+            "amount": amount,
+            "description": f"Bid {amount} spice for treachery card"
+        }
+    
+    def _revive_action(self, forces: int) -> Dict:
+        cost = sum(REVIVAL_COSTS[:forces])
+        return {
+            "id": f"revive_{forces}",
+            "type": "revive",
+            "forces": forces,
+            "cost": cost,
+            "description": f"Revive {forces} forces for {cost} spice"
+        }
+    
+    def _shipment_action(self, player: Dict, territory: str, forces: int) -> Dict:
+        cost = 1 if player["faction"] == "guild" else forces
+        return {
+            "id": f"ship_{territory}_{forces}",
+            "type": "shipment",
+            "territory": territory,
+            "forces": forces,
+            "cost": cost,
+            "description": f"Ship {forces} forces to {territory} for {cost} spice"
+        }
+    
+    def _battle_action(self, leaders: Dict, cards: Dict, leader: str,
+                       weapon: Optional[str], defense: Optional[str]) -> Dict:
+        leader, weapon, defense = leaders[leader], cards.get(weapon), cards.get(defense)
+        return {
+            "id": f"battle_{leader['name']}_{weapon['id'] if weapon else 'none'}_{defense['id'] if defense else 'none'}",
+            "type": "battle_plan",
+            "leader": leader,
+            "weapon": weapon,
+            "defense": defense,
+            "description": f"Fight with {leader['name']}" + 
+                         (f" using {weapon['name']}" if weapon else "") +
+                         (f" and {defense['name']}" if defense else "")
+        }
     
     def _calculate_movement_cost(self, player: Dict, from_territory: str, 
                                  to_territory: str, forces: int) -> int:
@@ -540,16 +531,7 @@ class Dune:
         player["forces_reserve"] -= forces
         
         # Add forces to territory
-        territory_data = self.board["territories"][territory]
-        existing = next((o for o in territory_data["occupants"] if o["player_id"] == player["id"]), None)
-        
-        if existing:
-            existing["forces"] += forces
-        else:
-            territory_data["occupants"].append({
-                "player_id": player["id"],
-                "forces": forces
-            })
+        self._add_forces(player["id"], territory, forces)
         
         return {
             "success": True,
@@ -571,27 +553,18 @@ class Dune:
         player["spice"] -= cost
         
         # Remove from source
-        from_data = self.board["territories"][from_territory]
-        occupant = next((o for o in from_data["occupants"] if o["player_id"] == player["id"]), None)
+        occupant = self.stacks[player["id"]].get(from_territory)
         
         if not occupant or occupant["forces"] < forces:
             return {"success": False, "error": "Not enough forces"}
         
         occupant["forces"] -= forces
         if occupant["forces"] == 0:
-            from_data["occupants"].remove(occupant)
+            self.board["territories"][from_territory]["occupants"].remove(occupant)
+            del self.stacks[player["id"]][from_territory]
         
         # Add to destination
-        to_data = self.board["territories"][to_territory]
-        existing = next((o for o in to_data["occupants"] if o["player_id"] == player["id"]), None)
-        
-        if existing:
-            existing["forces"] += forces
-        else:
-            to_data["occupants"].append({
-                "player_id": player["id"],
-                "forces": forces
-            })
+        self._add_forces(player["id"], to_territory, forces)
         
         return {
             "success": True,
@@ -643,17 +616,18 @@ class Dune:
     
     def advance_storm(self):
         # Storm moves 1-6 sectors clockwise
-        movement = random.randint(1, 6)
+        movement = self.rng.randint(1, 6)
         self.storm_position = (self.storm_position + movement) % 18
         
         # Remove forces caught in storm
-        for territory, data in self.board["territories"].items():
-            if self.storm_position in data["sectors"]:
-                for occupant in data["occupants"]:
-                    player = self.players[occupant["player_id"]]
-                    player["forces_reserve"] += occupant["forces"]
-                
-                data["occupants"] = []
+        for territory in SECTOR_TERRITORIES.get(self.storm_position, []):
+            data = self.board["territories"][territory]
+            for occupant in data["occupants"]:
+                player = self.players[occupant["player_id"]]
+                player["forces_reserve"] += occupant["forces"]
+                self.stacks[occupant["player_id"]].pop(territory, None)
+            
+            data["occupants"] = []
 
     def advance_turn(self):
         self.current_turn += 1
@@ -0,0 +1,251 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+TERRAIN = ["empty", "stone_floor", "door", "wall", "rubble"]
+TERRAIN_CODE = {name: code for code, name in enumerate(TERRAIN)}
+WALL = TERRAIN_CODE["wall"]
+NO_OCCUPANT = -1
+UNREACHABLE = 1 << 20
+
+# Squares of movement spent entering a cell, by terrain code; 0 = impassable.
+MOVE_COST = np.array([1, 1, 1, 0, 2], dtype=np.int8)
+
+KING_MOVES = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+# D&D cones are as wide as they are long at the far end.
+CONE_HALF_ANGLE = np.arctan(0.5)
+
+Window = Tuple[int, int, int, int]
+
+
+# A square dungeon grid stored as typed arrays indexed [x, y]: terrain codes,
+# occupant player ids and item-list references (0 = no items). Spatial
+# queries work on the window around their origin, so their cost follows the
+# query radius rather than the dungeon size, and cell dicts are only built
+# for the region a client asks to see. The most recent live_view is kept in
+# sync by every write, copying only the cells (and their column lists) that
+# changed, so polling the same viewport costs nothing and views already
+# handed out never change underneath their holders.
+class DungeonGrid:
+    def __init__(self, width: int = 20, height: int = 20):
+        self.width = width
+        self.height = height
+        self.terrain = np.zeros((width, height), dtype=np.uint8)
+        self.occupant = np.full((width, height), NO_OCCUPANT, dtype=np.int16)
+        self.items = np.zeros((width, height), dtype=np.int32)
+        self.item_lists = [[]]
+        self._live = None
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def terrain_at(self, x: int, y: int) -> str:
+        return TERRAIN[self.terrain[x, y]]
+
+    def set_terrain(self, x: int, y: int, terrain: str):
+        self.terrain[x, y] = TERRAIN_CODE[terrain]
+        self._patch_live(x, y, x + 1, y + 1, terrain=terrain)
+
+    def fill_terrain(self, x0: int, y0: int, x1: int, y1: int, terrain: str):
+        self.terrain[x0:x1, y0:y1] = TERRAIN_CODE[terrain]
+        self._patch_live(x0, y0, x1, y1, terrain=terrain)
+
+    def occupant_at(self, x: int, y: int) -> Optional[int]:
+        occupant = int(self.occupant[x, y])
+        return None if occupant == NO_OCCUPANT else occupant
+
+    def set_occupant(self, x: int, y: int, occupant: Optional[int]):
+        self.occupant[x, y] = NO_OCCUPANT if occupant is None else occupant
+        self._patch_live(x, y, x + 1, y + 1, occupant=occupant)
+
+    def is_free(self, x: int, y: int) -> bool:
+        return self.terrain[x, y] != WALL and self.occupant[x, y] == NO_OCCUPANT
+
+    def add_item(self, x: int, y: int, item: Dict):
+        if not self.items[x, y]:
+            self.items[x, y] = len(self.item_lists)
+            self.item_lists.append([])
+        self.item_lists[self.items[x, y]].append(item)
+        self._patch_live(x, y, x + 1, y + 1, items=list(self.item_lists[self.items[x, y]]))
+
+    def items_at(self, x: int, y: int) -> List[Dict]:
+        return self.item_lists[self.items[x, y]]
+
+    def window(self, origin: Tuple[int, int], radius: int) -> Window:
+        x, y = origin
+        return (max(0, x - radius), max(0, y - radius),
+                min(self.width, x + radius + 1), min(self.height, y + radius + 1))
+
+    def view(self, x: int, y: int, width: int, height: int) -> List[List[Dict]]:
+        # A snapshot of cell dicts for the region, clipped to the grid.
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.width, x + width), min(self.height, y + height)
+
+        terrain = self.terrain[x0:x1, y0:y1].tolist()
+        occupants = self.occupant[x0:x1, y0:y1].tolist()
+        items = self.items[x0:x1, y0:y1].tolist()
+        return [
+            [
+                {
+                    "terrain": TERRAIN[t],
+                    "occupant": None if o == NO_OCCUPANT else o,
+                    "items": list(self.item_lists[i])
+                }
+                for t, o, i in zip(terrain_row, occupant_row, item_row)
+            ]
+            for terrain_row, occupant_row, item_row in zip(terrain, occupants, items)
+        ]
+
+    def live_view(self, x: int, y: int, width: int, height: int) -> List[List[Dict]]:
+        # Like view, but repeated calls for the same region return the same
+        # lists until a write touches the region. Callers must not mutate them.
+        if self._live is None or self._live[0] != (x, y, width, height):
+            self._live = ((x, y, width, height), (max(0, x), max(0, y)), self.view(x, y, width, height))
+        return self._live[2]
+
+    def _patch_live(self, x0: int, y0: int, x1: int, y1: int, **changes):
+        # Copy-on-write of the cells of the live view inside [x0, x1) x [y0, y1).
+        if self._live is None:
+            return
+        region, (ox, oy), rows = self._live
+        i0, i1 = max(x0 - ox, 0), min(x1 - ox, len(rows))
+        j0, j1 = max(y0 - oy, 0), min(y1 - oy, len(rows[0]) if rows else 0)
+        if i0 >= i1 or j0 >= j1:
+            return
+
+        rows = list(rows)
+        for i in range(i0, i1):
+            column = rows[i] = list(rows[i])
+            for j in range(j0, j1):
+                column[j] = {**column[j], **changes}
+        self._live = (region, (ox, oy), rows)
+
+    def _step_costs(self, window: Window, pass_occupied: bool) -> np.ndarray:
+        # Cost of entering each cell of the window, UNREACHABLE if impassable.
+        # Occupied cells block unless pass_occupied; callers still must not
+        # stop on them.
+        x0, y0, x1, y1 = window
+        costs = MOVE_COST[self.terrain[x0:x1, y0:y1]].astype(np.int32)
+        if not pass_occupied:
+            costs[self.occupant[x0:x1, y0:y1] != NO_OCCUPANT] = 0
+        costs[costs == 0] = UNREACHABLE
+        return costs
+
+    def distance_map(self, origin: Tuple[int, int], budget: int,
+                     pass_occupied: bool = False) -> Tuple[Window, np.ndarray]:
+        # Cheapest cost from origin to every cell of the window around it,
+        # 8-connected and paying MOVE_COST for each cell entered, -1 where it
+        # exceeds budget. Relaxes the whole window once per step; any route
+        # within budget has at most budget steps.
+        window = x0, y0, x1, y1 = self.window(origin, budget)
+        costs = self._step_costs(window, pass_occupied)
+        width, height = costs.shape
+
+        distance = np.full(costs.shape, UNREACHABLE, dtype=np.int32)
+        distance[origin[0] - x0, origin[1] - y0] = 0
+        padded = np.full((width + 2, height + 2), UNREACHABLE, dtype=np.int32)
+
+        for _ in range(budget):
+            padded[1:-1, 1:-1] = distance
+            nearest = np.minimum.reduce([
+                padded[1 + dx:1 + dx + width, 1 + dy:1 + dy + height] for dx, dy in KING_MOVES
+            ])
+            relaxed = np.minimum(distance, nearest + costs)
+            if np.array_equal(relaxed, distance):
+                break
+            distance = relaxed
+
+        distance[distance > budget] = -1
+        return window, distance
+
+    def stops(self, window: Window, distance: np.ndarray) -> Dict[Tuple[int, int], int]:
+        # Free cells of a distance map, mapped to their cost, in (x, y) order.
+        x0, y0, x1, y1 = window
+        free = (distance > 0) & (self.occupant[x0:x1, y0:y1] == NO_OCCUPANT)
+        cells = np.argwhere(free) + (x0, y0)
+        return dict(zip(map(tuple, cells.tolist()), distance[free].tolist()))
+
+    def trace_path(self, window: Window, distance: np.ndarray,
+                   goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        # A cheapest route from the origin of a distance map to goal, both
+        # included, found by walking back downhill; [] if goal is unreached.
+        x0, y0, x1, y1 = window
+        x, y = goal[0] - x0, goal[1] - y0
+        if not (0 <= x < x1 - x0 and 0 <= y < y1 - y0) or distance[x, y] < 0:
+            return []
+
+        path = [(goal[0], goal[1])]
+        while distance[x, y] > 0:
+            before = distance[x, y] - MOVE_COST[self.terrain[x + x0, y + y0]]
+            for dx, dy in KING_MOVES:
+                i, j = x + dx, y + dy
+                if 0 <= i < x1 - x0 and 0 <= j < y1 - y0 and distance[i, j] == before:
+                    x, y = i, j
+                    break
+            path.append((x + x0, y + y0))
+        path.reverse()
+        return path
+
+    def movement_costs(self, origin: Tuple[int, int], budget: int,
+                       pass_occupied: bool = False) -> Dict[Tuple[int, int], int]:
+        return self.stops(*self.distance_map(origin, budget, pass_occupied))
+
+    def line_of_sight(self, origin: Tuple[int, int], radius: int) -> Tuple[Window, np.ndarray]:
+        # Cells within radius whose straight line from origin crosses no wall
+        # (the target cell itself may be a wall), for the window around origin.
+        window = x0, y0, x1, y1 = self.window(origin, radius)
+        opaque = self.terrain[x0:x1, y0:y1] == WALL
+        ox, oy = origin[0] - x0, origin[1] - y0
+
+        tx, ty = np.indices(opaque.shape)
+        samples = np.linspace(0.0, 1.0, 2 * max(radius, 1) + 1)[1:-1]
+        px = np.rint(ox + (tx - ox)[..., None] * samples).astype(np.intp)
+        py = np.rint(oy + (ty - oy)[..., None] * samples).astype(np.intp)
+
+        interior = ~(((px == tx[..., None]) & (py == ty[..., None])) | ((px == ox) & (py == oy)))
+        visible = ~(opaque[px, py] & interior).any(axis=-1)
+        return window, visible & (np.maximum(abs(tx - ox), abs(ty - oy)) <= radius)
+
+    def area_of_effect(self, shape: str, origin: Tuple[int, int], size: int,
+                       direction: Tuple[int, int] = (0, 1)) -> Tuple[Window, np.ndarray]:
+        # sphere: within size cells of origin; cube: the square of side
+        # 2*size+1 around origin; cone and line: from origin towards
+        # direction, size cells long, origin excluded.
+        window = x0, y0, x1, y1 = self.window(origin, size)
+        dx, dy = np.indices((x1 - x0, y1 - y0))
+        dx, dy = dx - (origin[0] - x0), dy - (origin[1] - y0)
+        distance = np.hypot(dx, dy)
+
+        if shape == "sphere":
+            mask = distance <= size + 0.5
+        elif shape == "cube":
+            mask = np.ones(distance.shape, dtype=bool)
+        elif shape in ("cone", "line"):
+            ux, uy = np.asarray(direction, dtype=float) / np.hypot(*direction)
+            along = dx * ux + dy * uy
+            across = np.abs(dx * uy - dy * ux)
+            mask = (along > 0) & (along <= size + 0.5)
+            if shape == "cone":
+                mask &= np.arctan2(across, along) <= CONE_HALF_ANGLE + 1e-9
+            else:
+                mask &= across <= 0.5
+        else:
+            raise ValueError(f"Unknown area shape: {shape}")
+
+        return window, mask
+
+    def cells(self, window: Window, mask: np.ndarray) -> List[Tuple[int, int]]:
+        x0, y0 = window[0], window[1]
+        return [(int(x) + x0, int(y) + y0) for x, y in np.argwhere(mask)]
+
+    def occupants_in(self, window: Window, mask: np.ndarray) -> List[int]:
+        x0, y0, x1, y1 = window
+        found = self.occupant[x0:x1, y0:y1][mask]
+        return sorted(int(occupant) for occupant in found[found != NO_OCCUPANT])
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_live"] = None
+        return state
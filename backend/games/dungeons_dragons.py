@@ -1,21 +1,34 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+import functools
 import random
 
-class DungeonsAndDragons:
-    def __init__(self):
+from .action_families import ActionFamily
+from .dungeon_grid import DungeonGrid
+from .random_state import RandomStateMixin
+from .versioned_state import VersionedStateMixin
+
+# Largest region of the dungeon sent with every game state; bigger dungeons
+# are windowed around the party and the rest is fetched with get_region.
+VIEWPORT_SIZE = 32
+
+FEET_PER_SQUARE = 5
+
+class DungeonsAndDragons(RandomStateMixin, VersionedStateMixin):
+    def __init__(self, seed: Optional[int] = None, width: int = 20, height: int = 20):
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.players = []
         self.current_turn = 0
         self.dungeon_master_id = None
         self.current_encounter = None
         self.initiative_order = []
         self.combat_active = False
+        self.grid = DungeonGrid(width, height)
         self.board = self._initialize_board()
         
     def _initialize_board(self) -> Dict:
-        # Creating actual D&D dungeon grid
+        # The cells themselves live in self.grid
         return {
-            "grid": [[{"terrain": "empty", "occupant": None, "items": []} 
-                     for _ in range(20)] for _ in range(20)],
             "dungeon_level": 1,
             "rooms_discovered": 0,
             "traps": [],
@@ -89,7 +102,7 @@ class DungeonsAndDragons:
         for i, player in enumerate(self.players[1:]):
             pos = start_positions[i]
             player["position"] = pos
-            self.board["grid"][pos[0]][pos[1]]["occupant"] = player["id"]
+            self.grid.set_occupant(pos[0], pos[1], player["id"])
         
         # Generate initial room
         self._generate_starting_area()
@@ -114,6 +127,7 @@ class DungeonsAndDragons:
                     "wisdom": 10,
                     "charisma": 8
                 },
+                "speed": 30,
                 "position": (0, 0),
                 "inventory": [
                     {"name": "Longsword", "damage": "1d8", "type": "weapon"},
@@ -139,6 +153,7 @@ class DungeonsAndDragons:
                     "wisdom": 12,
                     "charisma": 10
                 },
+                "speed": 30,
                 "position": (0, 0),
                 "inventory": [
                     {"name": "Quarterstaff", "damage": "1d6", "type": "weapon"},
@@ -169,6 +184,7 @@ class DungeonsAndDragons:
                     "wisdom": 10,
                     "charisma": 14
                 },
+                "speed": 30,
                 "position": (0, 0),
                 "inventory": [
                     {"name": "Shortsword", "damage": "1d6", "type": "weapon"},
@@ -194,6 +210,7 @@ class DungeonsAndDragons:
                     "wisdom": 16,
                     "charisma": 12
                 },
+                "speed": 30,
                 "position": (0, 0),
                 "inventory": [
                     {"name": "Mace", "damage": "1d6", "type": "weapon"},
@@ -225,6 +242,7 @@ class DungeonsAndDragons:
                     "wisdom": 14,
                     "charisma": 10
                 },
+                "speed": 30,
                 "position": (0, 0),
                 "inventory": [
                     {"name": "Longbow", "damage": "1d8", "type": "weapon", "range": 150},
@@ -236,21 +254,58 @@ class DungeonsAndDragons:
             }
         }
         
-        return characters.get(char_class, characters["fighter"])
+        character = characters.get(char_class, characters["fighter"])
+        character["role"] = "adventurer"
+        return character
     
     def _generate_starting_area(self):
         # Create a starting chamber
-        for i in range(5):
-            for j in range(5):
-                self.board["grid"][i][j]["terrain"] = "stone_floor"
+        self.grid.fill_terrain(0, 0, 5, 5, "stone_floor")
         
         # Add exit
-        self.board["grid"][2][4]["terrain"] = "door"
+        self.grid.set_terrain(2, 4, "door")
+    
+    def _viewport(self) -> Tuple[int, int, int, int]:
+        width = min(self.grid.width, VIEWPORT_SIZE)
+        height = min(self.grid.height, VIEWPORT_SIZE)
+        
+        if (width, height) == (self.grid.width, self.grid.height):
+            return 0, 0, width, height
+        
+        # Centre on the party when the dungeon doesn't fit
+        positions = [p["position"] for p in self.players if p["role"] == "adventurer"]
+        if not positions:
+            return 0, 0, width, height
+        
+        cx = sum(pos[0] for pos in positions) // len(positions)
+        cy = sum(pos[1] for pos in positions) // len(positions)
+        x = min(max(cx - width // 2, 0), self.grid.width - width)
+        y = min(max(cy - height // 2, 0), self.grid.height - height)
+        return x, y, width, height
+    
+    def get_region(self, x: int, y: int, width: int, height: int) -> Dict:
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.grid.width, x + width), min(self.grid.height, y + height)
+        return {
+            "x": x0,
+            "y": y0,
+            "width": max(0, x1 - x0),
+            "height": max(0, y1 - y0),
+            "grid": self.grid.view(x0, y0, x1 - x0, y1 - y0)
+        }
+    
+    def _board_view(self) -> Dict:
+        x, y, width, height = self._viewport()
+        board = dict(self.board)
+        board["grid"] = self.grid.live_view(x, y, width, height)
+        board["grid_size"] = [self.grid.width, self.grid.height]
+        board["viewport"] = {"x": x, "y": y, "width": width, "height": height}
+        return board
     
     def get_game_state(self) -> Dict:
         return {
             "turn": self.current_turn,
-            "board": self.board,
+            "board": self._board_view(),
             "players": self.players,
             "current_player": self.players[self.current_turn % len(self.players)] if self.players else None,
             "combat_active": self.combat_active,
@@ -259,52 +314,58 @@ class DungeonsAndDragons:
         }
     
     def get_available_actions(self, player_id: int) -> List[Dict]:
+        actions = []
+        for family in self.action_families(player_id):
+            actions.extend(family.expand())
+        return actions
+    
+    def action_families(self, player_id: int) -> List[ActionFamily]:
         if not self.players or player_id >= len(self.players):
             return []
         
         player = self.players[player_id]
-        actions = []
+        single = ActionFamily.single
+        families = []
         
         if player["role"] == "dungeon_master":
             # DM actions
-            actions.extend([
-                {
+            return [
+                single({
                     "id": "spawn_monster",
                     "type": "dm_action",
                     "monster_type": "goblin",
                     "description": "Spawn a goblin"
-                },
-                {
+                }),
+                single({
                     "id": "add_trap",
                     "type": "dm_action",
                     "trap_type": "spike_trap",
                     "description": "Place a spike trap"
-                },
-                {
+                }),
+                single({
                     "id": "generate_room",
                     "type": "dm_action",
                     "room_type": "chamber",
                     "description": "Generate new room"
-                }
-            ])
-            return actions
+                })
+            ]
         
         # Player character actions
         if self.combat_active:
             # Combat actions
-            actions.extend([
-                {
+            families.extend([
+                single({
                     "id": "attack_melee",
                     "type": "attack",
                     "attack_type": "melee",
                     "description": "Make a melee attack"
-                },
-                {
+                }),
+                single({
                     "id": "attack_ranged",
                     "type": "attack",
                     "attack_type": "ranged",
                     "description": "Make a ranged attack"
-                }
+                })
             ])
             
             # Spell actions for casters
@@ -312,84 +373,97 @@ class DungeonsAndDragons:
                 for spell in player["spells"]:
                     spell_level = spell["level"]
                     if player["spell_slots"].get(str(spell_level), 0) > 0:
-                        actions.append({
+                        families.append(single({
                             "id": f"cast_{spell['name'].lower().replace(' ', '_')}",
                             "type": "cast_spell",
                             "spell": spell,
                             "description": f"Cast {spell['name']}"
-                        })
+                        }))
             
             # Class abilities
             for ability in player.get("abilities", []):
-                actions.append({
+                families.append(single({
                     "id": f"use_{ability.lower().replace(' ', '_')}",
                     "type": "ability",
                     "ability_name": ability,
                     "description": f"Use {ability}"
-                })
+                }))
             
-            actions.append({
+            families.append(single({
                 "id": "dodge",
                 "type": "combat_action",
                 "description": "Dodge (disadvantage to attackers)"
-            })
+            }))
             
         else:
             # Exploration actions
-            position = player["position"]
-            x, y = position
+            x, y = player["position"]
             
-            # Movement in 8 directions
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    if dx == 0 and dy == 0:
-                        continue
-                    
-                    new_x, new_y = x + dx, y + dy
-                    
-                    if 0 <= new_x < 20 and 0 <= new_y < 20:
-                        cell = self.board["grid"][new_x][new_y]
-                        if cell["terrain"] != "wall" and cell["occupant"] is None:
-                            actions.append({
-                                "id": f"move_{new_x}_{new_y}",
-                                "type": "movement",
-                                "destination": (new_x, new_y),
-                                "description": f"Move to ({new_x}, {new_y})"
-                            })
+            # Move anywhere within speed in one action
+            reachable = self._reachable(player)
+            families.append(ActionFamily(
+                "movement", functools.partial(self._movement_action, reachable), "Move up to your speed",
+                destination=list(reachable)
+            ))
             
             # Search action
-            actions.append({
+            families.append(single({
                 "id": "search",
                 "type": "search",
                 "description": "Search the area (Perception check)"
-            })
+            }))
             
             # Check for doors
-            if self.board["grid"][x][y]["terrain"] == "door":
-                actions.append({
+            if self.grid.terrain_at(x, y) == "door":
+                families.append(single({
                     "id": "open_door",
                     "type": "interact",
                     "interaction": "door",
                     "description": "Open the door"
-                })
+                }))
             
             # Use items
             for item in player["inventory"]:
                 if item.get("type") == "consumable":
-                    actions.append({
+                    families.append(single({
                         "id": f"use_{item['name'].lower().replace(' ', '_')}",
                         "type": "use_item",
                         "item": item,
                         "description": f"Use {item['name']}"
-                    })
+                    }))
         
-        actions.append({
+        families.append(single({
             "id": "pass",
             "type": "pass",
             "description": "End turn"
-        })
+        }))
         
-        return actions
+        return families
+    
+    def _movement_map(self, player: Dict):
+        # Only the party stands on the grid, and allies can be moved through
+        x, y = player["position"]
+        squares = player.get("speed", 30) // FEET_PER_SQUARE
+        return self.cached_for_version(
+            ("movement", player["id"]),
+            lambda: self.grid.distance_map((x, y), squares, pass_occupied=True)
+        )
+    
+    def _reachable(self, player: Dict) -> Dict[Tuple[int, int], int]:
+        # Cells the player can stop on this turn and the squares it costs
+        return self.cached_for_version(
+            ("reachable", player["id"]), lambda: self.grid.stops(*self._movement_map(player))
+        )
+    
+    def _movement_action(self, reachable: Dict[Tuple[int, int], int], destination: Tuple[int, int]) -> Dict:
+        x, y = destination
+        return {
+            "id": f"move_{x}_{y}",
+            "type": "movement",
+            "destination": destination,
+            "squares": reachable[destination],
+            "description": f"Move to ({x}, {y})"
+        }
     
     def execute_action(self, player_id: int, action: Dict) -> Dict:
         if not self.players or player_id >= len(self.players):
@@ -477,26 +551,32 @@ class DungeonsAndDragons:
         return monsters.get(monster_type, monsters["goblin"])
     
     def _execute_movement(self, player: Dict, action: Dict) -> Dict:
-        destination = action.get("destination")
+        destination = tuple(action.get("destination") or ())
+        reachable = self._reachable(player)
+        if destination not in reachable:
+            return {"success": False, "error": "Destination out of reach"}
         
         old_pos = player["position"]
-        self.board["grid"][old_pos[0]][old_pos[1]]["occupant"] = None
+        path = self.grid.trace_path(*self._movement_map(player), destination)
+        self.grid.set_occupant(old_pos[0], old_pos[1], None)
         
         player["position"] = destination
-        self.board["grid"][destination[0]][destination[1]]["occupant"] = player["id"]
+        self.grid.set_occupant(destination[0], destination[1], player["id"])
         
         return {
             "success": True,
             "action": "movement",
             "from": old_pos,
-            "to": destination
+            "to": destination,
+            "path": path,
+            "squares": reachable[destination]
         }
     
     def _execute_attack(self, player: Dict, action: Dict) -> Dict:
         attack_type = action.get("attack_type")
         
         # Roll d20 for attack
-        attack_roll = random.randint(1, 20)
+        attack_roll = self.rng.randint(1, 20)
         
         # Add modifiers
         if attack_type == "melee":
@@ -511,7 +591,7 @@ class DungeonsAndDragons:
         
         if total_attack >= target_ac:
             # Roll damage
-            damage_roll = random.randint(1, 8) + modifier
+            damage_roll = self.rng.randint(1, 8) + modifier
             
             return {
                 "success": True,
@@ -556,7 +636,7 @@ class DungeonsAndDragons:
                 die_size = int(die_size_parts[0])
                 bonus = int(die_size_parts[1]) if len(die_size_parts) > 1 else 0
                 
-                total_damage = sum(random.randint(1, die_size) for _ in range(num_dice)) + bonus
+                total_damage = sum(self.rng.randint(1, die_size) for _ in range(num_dice)) + bonus
                 result["damage"] = total_damage
         
         if "heal" in spell:
@@ -568,7 +648,7 @@ class DungeonsAndDragons:
                 die_size = int(die_size_parts[0])
                 bonus = int(die_size_parts[1]) if len(die_size_parts) > 1 else 0
                 
-                total_healing = sum(random.randint(1, die_size) for _ in range(num_dice)) + bonus
+                total_healing = sum(self.rng.randint(1, die_size) for _ in range(num_dice)) + bonus
                 player["hp"] = min(player["hp"] + total_healing, player["max_hp"])
                 result["healing"] = total_healing
                 result["new_hp"] = player["hp"]
@@ -577,7 +657,7 @@ class DungeonsAndDragons:
     
     def _execute_search(self, player: Dict) -> Dict:
         # Roll perception check
-        perception_roll = random.randint(1, 20)
+        perception_roll = self.rng.randint(1, 20)
         wisdom_mod = (player["stats"]["wisdom"] - 10) // 2
         total = perception_roll + wisdom_mod
         
@@ -601,7 +681,7 @@ class DungeonsAndDragons:
         
         if interaction == "door":
             pos = player["position"]
-            self.board["grid"][pos[0]][pos[1]]["terrain"] = "stone_floor"
+            self.grid.set_terrain(pos[0], pos[1], "stone_floor")
             
             # Generate new room beyond door
             room = self._generate_dungeon_room("chamber")
@@ -629,7 +709,7 @@ class DungeonsAndDragons:
                     die_size = int(die_size_parts[0])
                     bonus = int(die_size_parts[1]) if len(die_size_parts) > 1 else 0
                     
-                    total_healing = sum(random.randint(1, die_size) for _ in range(num_dice)) + bonus
+                    total_healing = sum(self.rng.randint(1, die_size) for _ in range(num_dice)) + bonus
                     player["hp"] = min(player["hp"] + total_healing, player["max_hp"])
                     
                     return {
@@ -1,376 +1,437 @@
-from typing import Dict, List
+from array import array
+from typing import Dict, List, Optional, Tuple
 import random
 
-class ExplodingKittens:
-    def __init__(self):
+from .random_state import RandomStateMixin
+from .versioned_state import VersionedStateMixin
+
+NUM_PLAYERS = 5
+
+# Cards are small integers indexing the catalog below; hands and the deck are
+# byte arrays of card codes and each player keeps a count per card kind.
+# Card dicts are only built for the API (get_game_state, get_available_actions,
+# execute_action results).
+ATTACK, SKIP, FAVOR, SHUFFLE, SEE_FUTURE, NOPE, DEFUSE, EXPLODING = range(8)
+CAT_SUBTYPES = ["tacocat", "rainbow_cat", "beard_cat", "cattermelon", "hairy_potato_cat"]
+FIRST_CAT = 8
+NUM_KINDS = FIRST_CAT + len(CAT_SUBTYPES)
+
+KIND_TYPES = ["attack", "skip", "favor", "shuffle", "see_future", "nope", "defuse", "exploding"] + ["cat"] * len(CAT_SUBTYPES)
+KIND_NAMES = ["Attack", "Skip", "Favor", "Shuffle", "See the Future", "Nope", "Defuse", "Exploding Kitten"] + [
+    cat.replace("_", " ").title() for cat in CAT_SUBTYPES
+]
+
+PLAY_DESCRIPTIONS = {
+    ATTACK: "End turn without drawing, next player takes 2 turns",
+    SKIP: "End turn without drawing",
+    SHUFFLE: "Shuffle the draw pile",
+    SEE_FUTURE: "See the top 3 cards",
+    NOPE: "Nope an action"
+}
+
+# Compact moves: card | target << 8 | op << 12
+MOVE_DRAW, MOVE_PLAY, MOVE_PAIR = 0, 1, 2
+DRAW_MOVE = MOVE_DRAW << 12
+
+
+def _card(kind: int, copy: int) -> Dict:
+    if kind >= FIRST_CAT:
+        subtype = CAT_SUBTYPES[kind - FIRST_CAT]
+        return {"id": f"{subtype}_{copy}", "type": "cat", "subtype": subtype, "name": KIND_NAMES[kind]}
+    return {"id": f"{KIND_TYPES[kind]}_{copy}", "type": KIND_TYPES[kind], "name": KIND_NAMES[kind]}
+
+
+def _build_catalog(num_players: int) -> Tuple[List[Dict], bytes]:
+    # Same order the deck has always been built in, so seeded shuffles deal
+    # exactly the games they did when cards were dicts.
+    counts = [(ATTACK, 4), (SKIP, 4), (FAVOR, 4), (SHUFFLE, 4), (SEE_FUTURE, 5), (NOPE, 5)]
+    counts += [(kind, 4) for kind in range(FIRST_CAT, NUM_KINDS)]
+    counts += [(DEFUSE, num_players + 2), (EXPLODING, num_players - 1)]
+
+    cards, kinds = [], []
+    for kind, count in counts:
+        for copy in range(count):
+            cards.append(_card(kind, copy))
+            kinds.append(kind)
+    return cards, bytes(kinds)
+
+
+CARDS, CARD_KIND = _build_catalog(NUM_PLAYERS)
+CARD_INDEX = {card["id"]: code for code, card in enumerate(CARDS)}
+MAIN_DECK = [code for code in range(len(CARDS)) if CARD_KIND[code] not in (DEFUSE, EXPLODING)]
+DEFUSE_CARDS = [code for code in range(len(CARDS)) if CARD_KIND[code] == DEFUSE]
+EXPLODING_CARDS = [code for code in range(len(CARDS)) if CARD_KIND[code] == EXPLODING]
+
+# Untargeted play actions never change, so they are built once per card.
+PLAY_ACTIONS = {
+    code: {
+        "id": f"play_{card['id']}",
+        "type": "play_card",
+        "card": card,
+        "description": f"Play {card['name']} - {PLAY_DESCRIPTIONS[CARD_KIND[code]]}"
+    }
+    for code, card in enumerate(CARDS)
+    if CARD_KIND[code] in PLAY_DESCRIPTIONS
+}
+DRAW_ACTION = {
+    "id": "draw_card",
+    "type": "draw",
+    "description": "Draw a card from the deck"
+}
+
+
+class ExplodingKittens(RandomStateMixin, VersionedStateMixin):
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.players = []
+        self.hands = []
+        self.kind_counts = []
         self.current_turn = 0
-        self.deck = []
-        self.discard_pile = []
+        self.deck = array('B')
+        self.discard_pile = array('B')
         self.exploded_players = []
+        self.alive_count = 0
         self.turn_count = 0
-        
-    def _initialize_deck(self, num_players: int) -> List[Dict]:
-        deck = []
-        
-        # Core cards
-        deck.extend([
-            {"id": f"attack_{i}", "type": "attack", "name": "Attack"} 
-            for i in range(4)
-        ])
-        deck.extend([
-            {"id": f"skip_{i}", "type": "skip", "name": "Skip"} 
-            for i in range(4)
-        ])
-        deck.extend([
-            {"id": f"favor_{i}", "type": "favor", "name": "Favor"} 
-            for i in range(4)
-        ])
-        deck.extend([
-            {"id": f"shuffle_{i}", "type": "shuffle", "name": "Shuffle"} 
-            for i in range(4)
-        ])
-        deck.extend([
-            {"id": f"see_future_{i}", "type": "see_future", "name": "See the Future"} 
-            for i in range(5)
-        ])
-        deck.extend([
-            {"id": f"nope_{i}", "type": "nope", "name": "Nope"} 
-            for i in range(5)
-        ])
-        
-        # Cat cards (pairs for stealing)
-        cat_types = ["tacocat", "rainbow_cat", "beard_cat", "cattermelon", "hairy_potato_cat"]
-        for cat in cat_types:
-            deck.extend([
-                {"id": f"{cat}_{i}", "type": "cat", "subtype": cat, "name": cat.replace("_", " ").title()} 
-                for i in range(4)
-            ])
-        
-        # Defuse cards (num_players + 2 total, distribute to players + extras)
-        defuse_cards = [
-            {"id": f"defuse_{i}", "type": "defuse", "name": "Defuse"} 
-            for i in range(num_players + 2)
-        ]
-        
-        # Exploding kittens (num_players - 1)
-        exploding_cards = [
-            {"id": f"exploding_{i}", "type": "exploding", "name": "Exploding Kitten"} 
-            for i in range(num_players - 1)
-        ]
-        
-        random.shuffle(deck)
-        
-        return deck, defuse_cards, exploding_cards
-    
+
     def setup_game(self, player_names: List[str]) -> Dict:
-        if len(player_names) != 5:
+        if len(player_names) != NUM_PLAYERS:
             raise ValueError("Exploding Kittens requires exactly 5 players")
-        
-        # Initialize deck
-        main_deck, defuse_cards, exploding_cards = self._initialize_deck(len(player_names))
-        
+
+        main_deck = list(MAIN_DECK)
+        defuse_cards = list(DEFUSE_CARDS)
+        self.rng.shuffle(main_deck)
+
         self.players = []
-        
-        # Deal cards to players
+        self.hands = []
+        self.kind_counts = []
+
+        # Deal 7 cards + 1 defuse
         for idx, name in enumerate(player_names):
-            player = {
+            self.players.append({
                 "name": name,
                 "id": idx,
-                "hand": [],
                 "alive": True,
                 "turns_to_take": 1
-            }
-            
-            # Deal 7 cards + 1 defuse
+            })
+            self.hands.append(array('B'))
+            self.kind_counts.append([0] * NUM_KINDS)
+
             for _ in range(7):
                 if main_deck:
-                    player["hand"].append(main_deck.pop())
-            
-            player["hand"].append(defuse_cards.pop())
-            
-            self.players.append(player)
-        
-        # Add remaining defuse cards to deck
+                    self._add_to_hand(idx, main_deck.pop())
+            self._add_to_hand(idx, defuse_cards.pop())
+
+        # Remaining defuse cards, then exploding kittens, shuffled in
         main_deck.extend(defuse_cards)
-        
-        # Shuffle and add exploding kittens
-        random.shuffle(main_deck)
-        main_deck.extend(exploding_cards)
-        random.shuffle(main_deck)
-        
-        self.deck = main_deck
-        
+        self.rng.shuffle(main_deck)
+        main_deck.extend(EXPLODING_CARDS)
+        self.rng.shuffle(main_deck)
+
+        self.deck = array('B', main_deck)
+        self.alive_count = len(self.players)
+
         return self.get_game_state()
-    
+
+    def _add_to_hand(self, player_id: int, code: int):
+        self.hands[player_id].append(code)
+        self.kind_counts[player_id][CARD_KIND[code]] += 1
+
+    def _remove_from_hand(self, player_id: int, code: int):
+        self.hands[player_id].remove(code)
+        self.kind_counts[player_id][CARD_KIND[code]] -= 1
+
+    def _player_view(self, player_id: int) -> Dict:
+        return {**self.players[player_id], "hand": [CARDS[code] for code in self.hands[player_id]]}
+
+    def is_game_over(self) -> bool:
+        return self.alive_count <= 1
+
     def get_game_state(self) -> Dict:
+        players = [self._player_view(idx) for idx in range(len(self.players))]
         return {
             "turn": self.current_turn,
             "turn_count": self.turn_count,
             "deck_remaining": len(self.deck),
-            "players": self.players,
-            "current_player": self.players[self.current_turn % len([p for p in self.players if p["alive"]])] if any(p["alive"] for p in self.players) else None,
-            "discard_pile": self.discard_pile[-5:] if self.discard_pile else [],
-            "exploded_players": self.exploded_players,
-            "game_over": len([p for p in self.players if p["alive"]]) <= 1
+            "players": players,
+            "current_player": players[self.current_turn % self.alive_count] if self.alive_count else None,
+            "discard_pile": [CARDS[code] for code in self.discard_pile[-5:]],
+            "exploded_players": list(self.exploded_players),
+            "game_over": self.is_game_over()
         }
-    
-    def get_available_actions(self, player_id: int) -> List[Dict]:
-        if not self.players or player_id >= len(self.players):
-            return []
-        
-        player = self.players[player_id]
-        
-        if not player["alive"]:
+
+    def _targets(self, player_id: int) -> List[int]:
+        return [
+            target["id"] for target in self.players
+            if target["id"] != player_id and target["alive"] and self.hands[target["id"]]
+        ]
+
+    def legal_moves(self, player_id: int) -> List[int]:
+        if not self.players or player_id >= len(self.players) or not self.players[player_id]["alive"]:
             return []
-        
-        actions = []
-        
-        # Play cards from hand
-        for card in player["hand"]:
-            card_type = card["type"]
-            
-            if card_type == "attack":
-                actions.append({
-                    "id": f"play_{card['id']}",
-                    "type": "play_card",
-                    "card": card,
-                    "description": f"Play {card['name']} - End turn without drawing, next player takes 2 turns"
-                })
-            
-            elif card_type == "skip":
-                actions.append({
-                    "id": f"play_{card['id']}",
-                    "type": "play_card",
-                    "card": card,
-                    "description": f"Play {card['name']} - End turn without drawing"
-                })
-            
-            elif card_type == "favor":
-                for target in self.players:
-                    if target["id"] != player_id and target["alive"] and target["hand"]:
-                        actions.append({
-                            "id": f"play_{card['id']}_target_{target['id']}",
-                            "type": "play_card",
-                            "card": card,
-                            "target": target["id"],
-                            "description": f"Play {card['name']} on {target['name']} - Take a card from them"
-                        })
-            
-            elif card_type == "shuffle":
-                actions.append({
-                    "id": f"play_{card['id']}",
-                    "type": "play_card",
-                    "card": card,
-                    "description": f"Play {card['name']} - Shuffle the draw pile"
-                })
-            
-            elif card_type == "see_future":
-                actions.append({
-                    "id": f"play_{card['id']}",
-                    "type": "play_card",
-                    "card": card,
-                    "description": f"Play {card['name']} - See the top 3 cards"
-                })
-            
-            elif card_type == "nope":
-                # Nope can be played reactively
-                actions.append({
-                    "id": f"play_{card['id']}",
-                    "type": "play_card",
-                    "card": card,
-                    "description": f"Play {card['name']} - Nope an action"
-                })
-            
-            elif card_type == "cat":
-                # Can play pairs to steal
-                matching_cats = [c for c in player["hand"] 
-                               if c["type"] == "cat" and c["subtype"] == card["subtype"] and c["id"] != card["id"]]
-                
-                if matching_cats:
-                    for target in self.players:
-                        if target["id"] != player_id and target["alive"] and target["hand"]:
-                            actions.append({
-                                "id": f"play_pair_{card['id']}_{matching_cats[0]['id']}_target_{target['id']}",
-                                "type": "play_pair",
-                                "cards": [card, matching_cats[0]],
-                                "target": target["id"],
-                                "description": f"Play pair of {card['name']} on {target['name']} - Steal a random card"
-                            })
-        
-        # Draw card action (ends turn)
-        actions.append({
-            "id": "draw_card",
-            "type": "draw",
-            "description": "Draw a card from the deck"
-        })
-        
-        return actions
-    
+
+        counts = self.kind_counts[player_id]
+        targets = None
+        moves = []
+
+        for code in self.hands[player_id]:
+            kind = CARD_KIND[code]
+
+            if kind == FAVOR or (kind >= FIRST_CAT and counts[kind] >= 2):
+                if targets is None:
+                    targets = self._targets(player_id)
+                op = MOVE_PLAY if kind == FAVOR else MOVE_PAIR
+                moves.extend(code | target << 8 | op << 12 for target in targets)
+            elif kind in PLAY_DESCRIPTIONS:
+                moves.append(code | MOVE_PLAY << 12)
+
+        moves.append(DRAW_MOVE)
+        return moves
+
+    def _pair_partner(self, player_id: int, code: int) -> int:
+        kind = CARD_KIND[code]
+        return next(other for other in self.hands[player_id] if other != code and CARD_KIND[other] == kind)
+
+    def move_to_action(self, player_id: int, move: int) -> Dict:
+        op, target, code = move >> 12, (move >> 8) & 0xF, move & 0xFF
+
+        if op == MOVE_DRAW:
+            return DRAW_ACTION
+        if op == MOVE_PLAY and code in PLAY_ACTIONS:
+            return PLAY_ACTIONS[code]
+
+        card = CARDS[code]
+        target_name = self.players[target]["name"]
+        if op == MOVE_PLAY:
+            return {
+                "id": f"play_{card['id']}_target_{target}",
+                "type": "play_card",
+                "card": card,
+                "target": target,
+                "description": f"Play {card['name']} on {target_name} - Take a card from them"
+            }
+
+        partner = CARDS[self._pair_partner(player_id, code)]
+        return {
+            "id": f"play_pair_{card['id']}_{partner['id']}_target_{target}",
+            "type": "play_pair",
+            "cards": [card, partner],
+            "target": target,
+            "description": f"Play pair of {card['name']} on {target_name} - Steal a random card"
+        }
+
+    def get_available_actions(self, player_id: int) -> List[Dict]:
+        return [self.move_to_action(player_id, move) for move in self.legal_moves(player_id)]
+
+    def apply_move(self, player_id: int, move: int) -> Dict:
+        # Same rules as execute_action for a move from legal_moves, without
+        # building card dicts on the way.
+        op, target, code = move >> 12, (move >> 8) & 0xF, move & 0xFF
+
+        if op == MOVE_DRAW:
+            return self._draw(player_id)
+        if op == MOVE_PAIR:
+            partner = self._pair_partner(player_id, code)
+            for card in (code, partner):
+                self._remove_from_hand(player_id, card)
+                self.discard_pile.append(card)
+            return {"success": True, "stolen": self._steal(player_id, target)}
+
+        self._remove_from_hand(player_id, code)
+        self.discard_pile.append(code)
+        return {"success": True, **self._play_effect(player_id, code, target)}
+
     def execute_action(self, player_id: int, action: Dict) -> Dict:
         if not self.players or player_id >= len(self.players):
             return {"success": False, "error": "Invalid player"}
-        
+
         player = self.players[player_id]
-        
+
         if not player["alive"]:
             return {"success": False, "error": "Player is eliminated"}
-        
+
         action_type = action.get("type")
-        
+
         if action_type == "play_card":
-            return self._execute_play_card(player, action)
+            return self._execute_play_card(player_id, action)
         elif action_type == "play_pair":
-            return self._execute_play_pair(player, action)
+            return self._execute_play_pair(player_id, action)
         elif action_type == "draw":
-            return self._execute_draw(player)
-        
+            return self._execute_draw(player_id)
+
         return {"success": False, "error": "Unknown action"}
-    
-    def _execute_play_card(self, player: Dict, action: Dict) -> Dict:
-        card = action.get("card")
-        
-        if card not in player["hand"]:
+
+    def _card_code(self, card) -> Optional[int]:
+        return CARD_INDEX.get(card.get("id")) if isinstance(card, dict) else None
+
+    def _execute_play_card(self, player_id: int, action: Dict) -> Dict:
+        code = self._card_code(action.get("card"))
+
+        if code is None or code not in self.hands[player_id]:
             return {"success": False, "error": "Card not in hand"}
-        
-        player["hand"].remove(card)
-        self.discard_pile.append(card)
-        
+
+        self._remove_from_hand(player_id, code)
+        self.discard_pile.append(code)
+
         result = {
             "success": True,
             "action": "play_card",
-            "card": card["name"],
+            "card": CARDS[code]["name"],
             "effects": []
         }
-        
-        if card["type"] == "attack":
+
+        effect = self._play_effect(player_id, code, action.get("target"))
+        kind = CARD_KIND[code]
+
+        if kind == ATTACK:
+            result["effects"].append("Next player must take 2 turns")
+        elif kind == SKIP:
+            result["effects"].append("Turn ended without drawing")
+        elif kind == FAVOR and effect.get("stolen") is not None:
+            target = self.players[action.get("target")]
+            result["effects"].append(f"Received {CARDS[effect['stolen']]['name']} from {target['name']}")
+        elif kind == SHUFFLE:
+            result["effects"].append("Deck shuffled")
+        elif kind == SEE_FUTURE:
+            names = [CARDS[c]["name"] for c in effect["revealed"]]
+            result["effects"].append(f"Top cards: {names}")
+            result["revealed_cards"] = names
+
+        return result
+
+    def _play_effect(self, player_id: int, code: int, target: Optional[int]) -> Dict:
+        kind = CARD_KIND[code]
+        player = self.players[player_id]
+
+        if kind == ATTACK:
             # Next player takes 2 turns
-            next_player_idx = (player["id"] + 1) % len(self.players)
+            next_player_idx = (player_id + 1) % len(self.players)
             while not self.players[next_player_idx]["alive"]:
                 next_player_idx = (next_player_idx + 1) % len(self.players)
-            
+
             self.players[next_player_idx]["turns_to_take"] += 2
             player["turns_to_take"] -= 1
-            
-            result["effects"].append("Next player must take 2 turns")
-        
-        elif card["type"] == "skip":
-            # End turn without drawing
+
+        elif kind == SKIP:
             player["turns_to_take"] -= 1
-            result["effects"].append("Turn ended without drawing")
-        
-        elif card["type"] == "favor":
-            target_id = action.get("target")
-            target = self.players[target_id]
-            
-            if target["hand"]:
-                stolen_card = random.choice(target["hand"])
-                target["hand"].remove(stolen_card)
-                player["hand"].append(stolen_card)
-                
-                result["effects"].append(f"Received {stolen_card['name']} from {target['name']}")
-        
-        elif card["type"] == "shuffle":
-            random.shuffle(self.deck)
-            result["effects"].append("Deck shuffled")
-        
-        elif card["type"] == "see_future":
-            top_cards = self.deck[-3:] if len(self.deck) >= 3 else self.deck[:]
-            result["effects"].append(f"Top cards: {[c['name'] for c in reversed(top_cards)]}")
-            result["revealed_cards"] = [c["name"] for c in reversed(top_cards)]
-        
-        return result
-    
-    def _execute_play_pair(self, player: Dict, action: Dict) -> Dict:
-        cards = action.get("cards", [])
-        
-        for card in cards:
-            if card in player["hand"]:
-                player["hand"].remove(card)
-                self.discard_pile.append(card)
-        
+
+        elif kind == FAVOR:
+            return {"stolen": self._steal(player_id, target)}
+
+        elif kind == SHUFFLE:
+            self.rng.shuffle(self.deck)
+
+        elif kind == SEE_FUTURE:
+            return {"revealed": self.deck[-3:][::-1].tolist()}
+
+        return {}
+
+    def _steal(self, player_id: int, target_id: int) -> Optional[int]:
+        target_hand = self.hands[target_id]
+        if not target_hand:
+            return None
+
+        stolen = self.rng.choice(target_hand)
+        self._remove_from_hand(target_id, stolen)
+        self._add_to_hand(player_id, stolen)
+        return stolen
+
+    def _execute_play_pair(self, player_id: int, action: Dict) -> Dict:
+        cards = [self._card_code(card) for card in action.get("cards", [])]
+        hand = self.hands[player_id]
+
+        for code in cards:
+            if code is not None and code in hand:
+                self._remove_from_hand(player_id, code)
+                self.discard_pile.append(code)
+
+        names = [CARDS[code]["name"] for code in cards if code is not None]
         target_id = action.get("target")
-        target = self.players[target_id]
-        
-        if target["hand"]:
-            stolen_card = random.choice(target["hand"])
-            target["hand"].remove(stolen_card)
-            player["hand"].append(stolen_card)
-            
+        stolen = self._steal(player_id, target_id)
+
+        if stolen is not None:
             return {
                 "success": True,
                 "action": "play_pair",
-                "cards_played": [c["name"] for c in cards],
-                "stolen_card": stolen_card["name"],
-                "from_player": target["name"]
+                "cards_played": names,
+                "stolen_card": CARDS[stolen]["name"],
+                "from_player": self.players[target_id]["name"]
             }
-        
+
         return {
             "success": True,
             "action": "play_pair",
-            "cards_played": [c["name"] for c in cards],
+            "cards_played": names,
             "stolen_card": None
         }
-    
-    def _execute_draw(self, player: Dict) -> Dict:
+
+    def _draw(self, player_id: int) -> Dict:
         if not self.deck:
             return {"success": False, "error": "Deck is empty"}
-        
-        drawn_card = self.deck.pop()
-        
-        result = {
-            "success": True,
-            "action": "draw",
-            "card_type": drawn_card["type"]
-        }
-        
-        if drawn_card["type"] == "exploding":
-            # Check for defuse card
-            defuse_cards = [c for c in player["hand"] if c["type"] == "defuse"]
-            
-            if defuse_cards:
-                # Player can defuse
-                result["exploded"] = False
-                result["can_defuse"] = True
-                result["message"] = f"Drew Exploding Kitten! Use defuse card to survive."
-                
-                # Auto-use defuse
-                defuse = defuse_cards[0]
-                player["hand"].remove(defuse)
+
+        player = self.players[player_id]
+        drawn = self.deck.pop()
+        result = {"success": True, "drawn": drawn, "exploded": False, "defused": False}
+
+        if CARD_KIND[drawn] == EXPLODING:
+            if self.kind_counts[player_id][DEFUSE]:
+                # Auto-use the first defuse in hand and put the kitten back
+                defuse = next(code for code in self.hands[player_id] if CARD_KIND[code] == DEFUSE)
+                self._remove_from_hand(player_id, defuse)
                 self.discard_pile.append(defuse)
-                
-                # Put exploding kitten back in deck
-                insert_position = random.randint(0, len(self.deck))
-                self.deck.insert(insert_position, drawn_card)
-                
+
+                # The kitten goes back at a uniformly random depth, as the rules
+                # and recorded seeded games require. The deck is at most 56
+                # bytes, so this memmove costs about as much as an append.
+                self.deck.insert(self.rng.randint(0, len(self.deck)), drawn)
                 result["defused"] = True
-                result["message"] += f" Defused! Exploding Kitten returned to deck."
             else:
-                # Player explodes
                 player["alive"] = False
+                self.alive_count -= 1
                 self.exploded_players.append(player["name"])
-                
                 result["exploded"] = True
-                result["message"] = f"{player['name']} exploded!"
         else:
-            player["hand"].append(drawn_card)
+            self._add_to_hand(player_id, drawn)
+
+        player["turns_to_take"] -= 1
+
+        return result
+
+    def _execute_draw(self, player_id: int) -> Dict:
+        outcome = self._draw(player_id)
+        if not outcome["success"]:
+            return outcome
+
+        drawn_card = CARDS[outcome["drawn"]]
+        result = {
+            "success": True,
+            "action": "draw",
+            "card_type": drawn_card["type"]
+        }
+
+        if outcome["defused"]:
+            result["exploded"] = False
+            result["can_defuse"] = True
+            result["defused"] = True
+            result["message"] = "Drew Exploding Kitten! Use defuse card to survive. Defused! Exploding Kitten returned to deck."
+        elif outcome["exploded"]:
+            result["exploded"] = True
+            result["message"] = f"{self.players[player_id]['name']} exploded!"
+        else:
             result["card_drawn"] = drawn_card["name"]
             result["exploded"] = False
-        
-        # Decrease turns to take
-        player["turns_to_take"] -= 1
-        
+
         return result
-    
+
     def advance_turn(self):
         # Find next alive player
         while True:
             self.current_turn = (self.current_turn + 1) % len(self.players)
             current_player = self.players[self.current_turn]
-            
+
             if current_player["alive"]:
                 if current_player["turns_to_take"] <= 0:
                     current_player["turns_to_take"] = 1
                 break
-        
-        self.turn_count += 1
\ No newline at end of file
+
+        self.turn_count += 1
@@ -1,52 +1,109 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+import functools
 import random
 
-class Gloomhaven:
-    def __init__(self):
+import numpy as np
+
+from .action_families import ActionFamily
+from .hex_board import UNREACHABLE, HexBoard, hex_room
+from .pathfinding import Reached, path_to, reachable
+from .random_state import RandomStateMixin
+from .versioned_state import VersionedStateMixin
+
+# Rooms are blocks of hexes in axial coordinates (q, r). Monsters spawn on
+# their room's spawn hexes in order; doors are hexes joining two rooms.
+SCENARIOS = {
+    1: {
+        "name": "Black Barrow",
+        "start": [(0, 1), (0, 2), (-1, 3), (1, 1)],
+        "rooms": {
+            "room_1": {
+                "hexes": hex_room(0, 0, 6, 5),
+                "monsters": [
+                    {"type": "bandit_guard", "level": 1, "count": 3},
+                    {"type": "living_bones", "level": 1, "count": 2}
+                ],
+                "spawns": [(4, 0), (4, 1), (3, 2), (2, 3), (2, 4)],
+                "doors": [(5, 2)]
+            },
+            "room_2": {
+                "hexes": [(5, 2)] + hex_room(7, 0, 6, 5),
+                "monsters": [
+                    {"type": "bandit_archer", "level": 1, "count": 2}
+                ],
+                "spawns": [(10, 1), (9, 3)],
+                "treasure": True
+            }
+        },
+        "goal": "Kill all enemies"
+    }
+}
+
+# Base monster stats by type and level: the monster phase plays every
+# monster's base move and attack, there is no ability deck
+MONSTER_STATS = {
+    "bandit_guard": {
+        1: {"hp": 5, "move": 2, "attack": 2, "range": 0},
+        2: {"hp": 6, "move": 2, "attack": 3, "range": 0},
+        3: {"hp": 7, "move": 3, "attack": 3, "range": 0}
+    },
+    "living_bones": {
+        1: {"hp": 5, "move": 4, "attack": 1, "range": 0},
+        2: {"hp": 6, "move": 4, "attack": 2, "range": 0},
+        3: {"hp": 7, "move": 4, "attack": 2, "range": 0}
+    },
+    "bandit_archer": {
+        1: {"hp": 4, "move": 2, "attack": 2, "range": 3},
+        2: {"hp": 5, "move": 2, "attack": 2, "range": 4},
+        3: {"hp": 6, "move": 3, "attack": 3, "range": 4}
+    }
+}
+DEFAULT_MONSTER_STATS = {"hp": 5, "move": 2, "attack": 2, "range": 0}
+
+@functools.lru_cache(maxsize=None)
+def scenario_board(scenario_id: int) -> HexBoard:
+    scenario = SCENARIOS.get(scenario_id, SCENARIOS[1])
+    hexes = dict.fromkeys(hex_ for room in scenario["rooms"].values() for hex_ in room["hexes"])
+    return HexBoard(hexes)
+
+def _monster_stats(monster_type: str, level: int) -> Dict:
+    return MONSTER_STATS.get(monster_type, {}).get(level, DEFAULT_MONSTER_STATS)
+
+def _move_value(card_action: Dict) -> int:
+    if card_action.get("type") == "move":
+        return card_action.get("value", 0)
+    return card_action.get("move", 0)
+
+class Gloomhaven(RandomStateMixin, VersionedStateMixin):
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.players = []
         self.monsters = []
         self.current_turn = 0
         self.scenario = None
-        self.board = {}
+        self.scenario_id = 1
         self.round_number = 0
+        self.monster_actions = []
         
     def _initialize_board(self, scenario_id: int) -> Dict:
-        scenarios = {
-            1: {
-                "name": "Black Barrow",
-                "rooms": {
-                    "room_1": {
-                        "tiles": [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)],
-                        "monsters": [
-                            {"type": "bandit_guard", "level": 1, "count": 3},
-                            {"type": "living_bones", "level": 1, "count": 2}
-                        ],
-                        "doors": [(2, 0)]
-                    },
-                    "room_2": {
-                        "tiles": [(3, 0), (3, 1), (4, 0), (4, 1), (5, 0), (5, 1)],
-                        "monsters": [
-                            {"type": "bandit_archer", "level": 1, "count": 2}
-                        ],
-                        "treasure": True
-                    }
-                },
-                "goal": "Kill all enemies"
-            }
-        }
-        
-        return scenarios.get(scenario_id, scenarios[1])
+        return SCENARIOS.get(scenario_id, SCENARIOS[1])
+    
+    def _board(self) -> HexBoard:
+        return scenario_board(self.scenario_id)
     
     def setup_game(self, player_configs: List[Dict], scenario_id: int = 1) -> Dict:
         if len(player_configs) != 4:
             raise ValueError("Gloomhaven requires exactly 4 players")
         
-        self.scenario = self._initialize_board(scenario_id)
+        self.scenario_id = scenario_id if scenario_id in SCENARIOS else 1
+        self.scenario = self._initialize_board(self.scenario_id)
         self.players = []
         
         for idx, config in enumerate(player_configs):
             character_class = config.get("class", "brute")
             player = self._create_character(character_class, idx, config.get("name", f"Player{idx}"))
+            player["position"] = self.scenario["start"][idx]
             self.players.append(player)
         
         self._spawn_monsters()
@@ -205,32 +262,25 @@ class Gloomhaven:
         self.monsters = []
         
         for room_name, room_data in self.scenario["rooms"].items():
+            spawns = room_data.get("spawns", room_data["hexes"])
+            placed = 0
             for monster_group in room_data.get("monsters", []):
                 for i in range(monster_group["count"]):
+                    hp = self._get_monster_hp(monster_group["type"], monster_group["level"])
                     monster = {
                         "type": monster_group["type"],
                         "level": monster_group["level"],
                         "id": len(self.monsters),
-                        "hp": self._get_monster_hp(monster_group["type"], monster_group["level"]),
-                        "current_hp": self._get_monster_hp(monster_group["type"], monster_group["level"]),
-                        "position": self._get_spawn_position(room_name, i),
+                        "hp": hp,
+                        "current_hp": hp,
+                        "position": spawns[min(placed, len(spawns) - 1)],
                         "conditions": []
                     }
                     self.monsters.append(monster)
+                    placed += 1
     
     def _get_monster_hp(self, monster_type: str, level: int) -> int:
-        hp_table = {
-            "bandit_guard": {1: 5, 2: 6, 3: 7},
-            "living_bones": {1: 5, 2: 6, 3: 7},
-            "bandit_archer": {1: 4, 2: 5, 3: 6}
-        }
-        
-        return hp_table.get(monster_type, {1: 5}).get(level, 5)
-    
-    def _get_spawn_position(self, room_name: str, index: int) -> tuple:
-        room = self.scenario["rooms"][room_name]
-        tiles = room["tiles"]
-        return tiles[min(index, len(tiles) - 1)]
+        return _monster_stats(monster_type, level)["hp"]
     
     def get_game_state(self) -> Dict:
         return {
@@ -239,45 +289,97 @@ class Gloomhaven:
             "scenario": self.scenario["name"] if self.scenario else "None",
             "players": self.players,
             "monsters": self.monsters,
+            "monster_actions": self.monster_actions,
             "current_player": self.players[self.current_turn % len(self.players)] if self.players else None
         }
     
     def get_available_actions(self, player_id: int) -> List[Dict]:
+        actions = []
+        for family in self.action_families(player_id):
+            actions.extend(family.expand())
+        return actions
+    
+    def action_families(self, player_id: int) -> List[ActionFamily]:
         if not self.players or player_id >= len(self.players):
             return []
         
         player = self.players[player_id]
-        actions = []
+        families = []
         
         for card in player["hand"]:
-            actions.append({
-                "id": f"play_{card['id']}_top",
-                "type": "play_card",
-                "card_id": card["id"],
-                "half": "top",
-                "action": card["top"],
-                "initiative": card["initiative"],
-                "description": f"Play {card['name']} (top): {self._describe_action(card['top'])}"
-            })
-            
-            actions.append({
-                "id": f"play_{card['id']}_bottom",
-                "type": "play_card",
-                "card_id": card["id"],
-                "half": "bottom",
-                "action": card["bottom"],
-                "initiative": card["initiative"],
-                "description": f"Play {card['name']} (bottom): {self._describe_action(card['bottom'])}"
-            })
+            for half in ("top", "bottom"):
+                action = self._play_card_action(card, half)
+                move = _move_value(card[half])
+                if not move:
+                    families.append(ActionFamily.single(action))
+                    continue
+                
+                # Moving halves resolve to a destination; staying put keeps
+                # the plain card action
+                reached = self._reachable(player)
+                families.append(ActionFamily(
+                    "play_card", functools.partial(self._move_card_action, action, reached),
+                    action["description"], destination=self._destinations(player, reached, move)
+                ))
         
         if len(player["discard"]) > 0:
-            actions.append({
+            families.append(ActionFamily.single({
                 "id": "rest",
                 "type": "rest",
                 "description": "Rest to recover discarded cards"
-            })
+            }))
         
-        return actions
+        return families
+    
+    def _play_card_action(self, card: Dict, half: str) -> Dict:
+        return {
+            "id": f"play_{card['id']}_{half}",
+            "type": "play_card",
+            "card_id": card["id"],
+            "half": half,
+            "action": card[half],
+            "initiative": card["initiative"],
+            "description": f"Play {card['name']} ({half}): {self._describe_action(card[half])}"
+        }
+    
+    def _move_card_action(self, action: Dict, reached: Reached, destination: Tuple[int, int]) -> Dict:
+        if reached[destination][0] == 0:
+            return action
+        
+        q, r = destination
+        return {
+            **action,
+            "id": f"{action['id']}_to_{q}_{r}",
+            "destination": destination,
+            "description": f"{action['description']}, moving to ({q}, {r})"
+        }
+    
+    def _reachable(self, player: Dict) -> Reached:
+        # Hexes within the largest move in hand this turn. Enemies block,
+        # allies can be passed through.
+        def compute():
+            board = self._board()
+            enemies = {tuple(m["position"]) for m in self.monsters if m["current_hp"] > 0}
+            budget = max((_move_value(card[half]) for card in player["hand"] for half in ("top", "bottom")), default=0)
+            
+            def steps(hex_):
+                for neighbour in board.adjacent[board.index[hex_]]:
+                    if neighbour not in enemies:
+                        yield neighbour, 1
+            
+            return reachable(tuple(player["position"]), budget, steps)
+        
+        return self.cached_for_version(("reachable", player["id"]), compute)
+    
+    def _destinations(self, player: Dict, reached: Reached, move: int) -> List[Tuple[int, int]]:
+        start = tuple(player["position"])
+        taken = {tuple(p["position"]) for p in self.players if p is not player}
+        taken.update(tuple(m["position"]) for m in self.monsters if m["current_hp"] > 0)
+        
+        return [start] + sorted(
+            hex_ for hex_, (cost, _) in reached.items()
+            if 0 < cost <= move and hex_ not in taken
+        )
     
     def _describe_action(self, action: Dict) -> str:
         parts = []
@@ -316,12 +418,20 @@ class Gloomhaven:
         if not card:
             return {"success": False, "error": "Card not in hand"}
         
-        player["hand"].remove(card)
-        player["discard"].append(card)
-        
         half = action.get("half")
         card_action = card[half]
         
+        destination = action.get("destination")
+        if destination is not None:
+            destination = tuple(destination)
+            reached = self._reachable(player)
+            move = _move_value(card_action)
+            if destination not in self._destinations(player, reached, move):
+                return {"success": False, "error": "Destination out of reach"}
+        
+        player["hand"].remove(card)
+        player["discard"].append(card)
+        
         result = {
             "success": True,
             "card": card["name"],
@@ -337,6 +447,14 @@ class Gloomhaven:
             movement = card_action["move"]
             result["effects"].append(f"Move {movement} spaces")
         
+        if destination is not None and destination != tuple(player["position"]):
+            result["moved"] = {
+                "from": player["position"],
+                "to": destination,
+                "path": path_to(reached, destination)
+            }
+            player["position"] = destination
+        
         if "heal" in card_action:
             healing = card_action["heal"]
             player["current_hp"] = min(player["current_hp"] + healing, player["max_hp"])
@@ -348,7 +466,7 @@ class Gloomhaven:
         if not player["discard"]:
             return {"success": False, "error": "No cards to recover"}
         
-        lost_card = random.choice(player["discard"])
+        lost_card = self.rng.choice(player["discard"])
         player["discard"].remove(lost_card)
         player["lost"].append(lost_card)
         
@@ -366,9 +484,95 @@ class Gloomhaven:
         
         if self.current_turn % len(self.players) == 0:
             self.round_number += 1
+            self.monster_actions = self._monster_phase()
+    
+    def _monster_phase(self) -> List[Dict]:
+        # Every monster type acts in turn; within a type, focus is chosen for
+        # all monsters at once, then they move and attack in id order
+        board = self._board()
+        targets = [p for p in self.players if p["current_hp"] > 0]
+        if not targets:
+            return []
+        
+        # Characters block monsters but monsters never block each other, so
+        # the route fields only depend on attack range and are shared by all
+        # types with the same range this phase
+        target_hexes = np.array([board.index[tuple(p["position"])] for p in targets])
+        blocked = np.zeros(len(board.hexes), dtype=bool)
+        blocked[target_hexes] = True
+        monster_hexes = np.array([board.index[tuple(m["position"])] for m in self.monsters if m["current_hp"] > 0])
+        fields_by_range = {}
+        
+        actions = []
+        for monster_type in dict.fromkeys(m["type"] for m in self.monsters):
+            group = [m for m in self.monsters if m["type"] == monster_type and m["current_hp"] > 0]
+            
+            for level in sorted({m["level"] for m in group}):
+                stats = _monster_stats(monster_type, level)
+                attack_range = max(stats["range"], 1)
+                if attack_range not in fields_by_range:
+                    # fields[t, h]: moves from h to a hex target t can be
+                    # attacked from
+                    attack_from = board.attack_hexes(target_hexes, attack_range)
+                    fields = board.distance_fields(attack_from, blocked, until=monster_hexes)
+                    fields_by_range[attack_range] = (attack_from, fields)
+                
+                members = [m for m in group if m["level"] == level]
+                actions.extend(self._monster_group_turn(
+                    board, members, targets, target_hexes, stats, *fields_by_range[attack_range]
+                ))
+        
+        return actions
+    
+    def _monster_group_turn(self, board: HexBoard, members: List[Dict], targets: List[Dict],
+                            target_hexes: np.ndarray, stats: Dict, attack_from: np.ndarray,
+                            fields: np.ndarray) -> List[Dict]:
+        # Focus: fewest moves to attack, then nearest, then lowest id
+        positions = np.array([board.index[tuple(m["position"])] for m in members])
+        moves_needed = fields[:, positions].T
+        proximity = board.distance[positions][:, target_hexes]
+        order = np.broadcast_to(np.arange(len(targets)), moves_needed.shape)
+        focus = np.lexsort((order, proximity, moves_needed), axis=-1)[:, 0]
+        
+        actions = []
+        for monster, hex_index, target_index in zip(members, positions.tolist(), focus.tolist()):
+            field = fields[target_index]
+            if field[hex_index] >= UNREACHABLE:
+                actions.append({"monster_id": monster["id"], "action": "idle"})
+                continue
             
-            for player in self.players:
-                if player["role"] != "dungeon_master":
-                    player["energy"] += player["production"]["energy"]
-                    player["heat"] += player["energy"]
-                    player["energy"] = 0
+            path = self._monster_path(board, hex_index, field, stats["move"])
+            monster["position"] = board.hexes[path[-1]]
+            action = {
+                "monster_id": monster["id"],
+                "action": "move" if len(path) > 1 else "hold",
+                "focus": targets[target_index]["id"],
+                "path": [board.hexes[i] for i in path]
+            }
+            
+            target = targets[target_index]
+            if target["current_hp"] > 0 and attack_from[target_index, path[-1]]:
+                target["current_hp"] = max(0, target["current_hp"] - stats["attack"])
+                action["action"] = "attack"
+                action["damage"] = stats["attack"]
+                action["target_hp"] = target["current_hp"]
+            
+            actions.append(action)
+        
+        return actions
+    
+    def _monster_path(self, board: HexBoard, start: int, field: np.ndarray, move: int) -> List[int]:
+        # Walk downhill towards the focus for up to `move` hexes, then back
+        # off to the last hex no other figure stands on
+        taken = {board.index[tuple(p["position"])] for p in self.players}
+        taken.update(board.index[tuple(m["position"])] for m in self.monsters if m["current_hp"] > 0)
+        taken.discard(start)
+        
+        path = [start]
+        while len(path) <= move and field[path[-1]] > 0:
+            here = path[-1]
+            path.append(next(n for n in board.neighbors[here].tolist() if n < len(board.hexes) and field[n] == field[here] - 1))
+        
+        while path[-1] in taken:
+            path.pop()
+        return path
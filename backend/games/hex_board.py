@@ -0,0 +1,100 @@
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Axial hex coordinates (q, r); the six directions in clockwise order from east
+HEX_DIRECTIONS = [(1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)]
+UNREACHABLE = 1 << 20
+
+
+def hex_room(q0: int, r0: int, columns: int, rows: int) -> List[Tuple[int, int]]:
+    # A rectangular block of hexes (odd rows shifted right) in axial coordinates
+    return [(q0 + column - (row // 2), r0 + row) for row in range(rows) for column in range(columns)]
+
+
+def _hex_round(q: np.ndarray, r: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    s = -q - r
+    rq, rr, rs = np.rint(q), np.rint(r), np.rint(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.intp), rr.astype(np.intp)
+
+
+# The hexes of one scenario map with everything that depends only on the map
+# precomputed: a neighbour table (missing neighbours point at the sentinel
+# index len(hexes)), all-pairs hex distance and all-pairs line of sight.
+# Figures never block sight, so these never change during a game and one
+# board is shared by every game of the scenario.
+class HexBoard:
+    def __init__(self, hexes: Iterable[Tuple[int, int]]):
+        self.hexes = [tuple(hex_) for hex_ in hexes]
+        self.index = {hex_: i for i, hex_ in enumerate(self.hexes)}
+        size = len(self.hexes)
+
+        self.neighbors = np.full((size, len(HEX_DIRECTIONS)), size, dtype=np.intp)
+        for i, (q, r) in enumerate(self.hexes):
+            for direction, (dq, dr) in enumerate(HEX_DIRECTIONS):
+                self.neighbors[i, direction] = self.index.get((q + dq, r + dr), size)
+        self.adjacent = [[self.hexes[j] for j in row if j < size] for row in self.neighbors.tolist()]
+
+        coords = np.array(self.hexes, dtype=np.intp).reshape(size, 2)
+        self.q, self.r = coords[:, 0], coords[:, 1]
+        dq = self.q[:, None] - self.q[None, :]
+        dr = self.r[:, None] - self.r[None, :]
+        self.distance = ((np.abs(dq) + np.abs(dr) + np.abs(dq + dr)) // 2).astype(np.int32)
+        self.line_of_sight = self._line_of_sight()
+
+    def _line_of_sight(self) -> np.ndarray:
+        # Centre-to-centre lines sampled twice per hex crossed; sight is
+        # blocked by any sample outside the map (walls and void). Samples are
+        # nudged off hex edges so lines along them resolve consistently.
+        size = len(self.hexes)
+        q_min, r_min = self.q.min(initial=0), self.r.min(initial=0)
+        on_map = np.zeros((self.q.max(initial=0) - q_min + 3, self.r.max(initial=0) - r_min + 3), dtype=bool)
+        on_map[self.q - q_min + 1, self.r - r_min + 1] = True
+
+        samples = np.linspace(0.0, 1.0, 2 * int(self.distance.max(initial=0)) + 1)
+        visible = np.zeros((size, size), dtype=bool)
+        for i in range(size):
+            lq = self.q[i] + 1e-6 + (self.q - self.q[i])[:, None] * samples
+            lr = self.r[i] + 2e-6 + (self.r - self.r[i])[:, None] * samples
+            hq, hr = _hex_round(lq, lr)
+            visible[i] = on_map[hq - q_min + 1, hr - r_min + 1].all(axis=1)
+        return visible
+
+    def distance_fields(self, sources: np.ndarray, blocked: np.ndarray,
+                        until: Optional[np.ndarray] = None) -> np.ndarray:
+        # Steps from every hex to the nearest source hex, one row per row of
+        # sources, never entering blocked hexes; UNREACHABLE if cut off. All
+        # rows advance together, one wavefront per step, and stop early once
+        # every row has reached all of the `until` hexes.
+        rows, size = sources.shape
+        open_ = ~blocked
+        frontier = sources & open_
+        reached = frontier.copy()
+        fields = np.where(frontier, 0, UNREACHABLE).astype(np.int32)
+
+        padded = np.zeros((rows, size + 1), dtype=bool)
+        step = 0
+        while frontier.any():
+            if until is not None and reached[:, until].all():
+                break
+            step += 1
+            padded[:, :size] = frontier
+            grown = padded[:, self.neighbors[:, 0]]
+            for direction in range(1, len(HEX_DIRECTIONS)):
+                grown |= padded[:, self.neighbors[:, direction]]
+            frontier = grown & open_ & ~reached
+            fields[frontier] = step
+            reached |= frontier
+        return fields
+
+    def attack_hexes(self, targets: np.ndarray, attack_range: int) -> np.ndarray:
+        # For each target hex, the hexes it can be attacked from: adjacent
+        # for melee, otherwise within range and in sight.
+        distance = self.distance[targets]
+        return (distance >= 1) & (distance <= max(attack_range, 1)) & self.line_of_sight[targets]
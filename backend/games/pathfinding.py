@@ -0,0 +1,49 @@
+import heapq
+from itertools import count
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+Node = Hashable
+# steps(node) yields (neighbour, cost of entering it); blocked neighbours are
+# simply not yielded.
+Steps = Callable[[Node], Iterable[Tuple[Node, int]]]
+Reached = Dict[Node, Tuple[int, Optional[Node]]]
+
+
+def reachable(start: Node, budget: int, steps: Steps) -> Reached:
+    # Every node reachable from start for at most `budget`, mapped to
+    # (cost, previous node). Uniform-cost search; with unit costs this is a
+    # plain BFS. Ties are broken by discovery order so results are stable.
+    reached = {start: (0, None)}
+    tie = count()
+    frontier = [(0, next(tie), start)]
+
+    while frontier:
+        cost, _, node = heapq.heappop(frontier)
+        if cost > reached[node][0]:
+            continue
+
+        for neighbour, step_cost in steps(node):
+            new_cost = cost + step_cost
+            if new_cost > budget:
+                continue
+            known = reached.get(neighbour)
+            if known is None or new_cost < known[0]:
+                reached[neighbour] = (new_cost, node)
+                heapq.heappush(frontier, (new_cost, next(tie), neighbour))
+
+    return reached
+
+
+def path_to(reached: Reached, goal: Node) -> List[Node]:
+    # The route from the search start to goal, both included.
+    if goal not in reached:
+        return []
+
+    path = [goal]
+    previous = reached[goal][1]
+    while previous is not None:
+        path.append(previous)
+        previous = reached[previous][1]
+    path.reverse()
+    return path
+
@@ -0,0 +1,22 @@
+import random
+from typing import List
+
+
+# Engines own a seeded random.Random in self.rng. The snapshot is plain JSON
+# (the Mersenne Twister state as a list), so it can be stored next to a saved
+# game and restored before resuming play or replay from that point.
+class RandomStateMixin:
+    rng: random.Random
+
+    # Stored with every action log. An engine bumps it whenever a rule change
+    # makes an existing seed and action log play out differently, so such
+    # logs are refused instead of replayed into a game that never happened.
+    RULES_VERSION = 1
+
+    def rng_snapshot(self) -> List:
+        version, internal, gauss_next = self.rng.getstate()
+        return [version, list(internal), gauss_next]
+
+    def restore_rng(self, snapshot: List):
+        version, internal, gauss_next = snapshot
+        self.rng.setstate((version, tuple(internal), gauss_next))
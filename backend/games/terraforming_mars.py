@@ -1,8 +1,258 @@
-from typing import Dict, List
+from bisect import bisect_right
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 import random
 
-class TerraformingMars:
-    def __init__(self):
+import numpy as np
+
+from .random_state import RandomStateMixin
+from .versioned_state import VersionedStateMixin
+
+# Process-wide card catalog. Cards are integer codes (their position here,
+# which is also the order starting hands have always been sampled from);
+# player hands hold codes and the dicts below are only shared read-only with
+# the API.
+CARD_DATA = [
+    {"id": "ai_central", "name": "AI Central", "cost": 21, "tags": ["science", "building"],
+     "effects": {"vp": 1, "cards_per_gen": 2}},
+    {"id": "asteroid", "name": "Asteroid", "cost": 14, "tags": ["space"],
+     "effects": {"temperature": 1, "titanium": 2}},
+    {"id": "comet", "name": "Comet", "cost": 21, "tags": ["space"],
+     "effects": {"temperature": 1, "ocean": 1}},
+    {"id": "big_asteroid", "name": "Big Asteroid", "cost": 27, "tags": ["space"],
+     "effects": {"temperature": 2, "titanium": 4}},
+    {"id": "water_import", "name": "Water Import from Europa", "cost": 25, "tags": ["space", "jovian"],
+     "effects": {"ocean": 1, "vp": 1}},
+    {"id": "space_elevator", "name": "Space Elevator", "cost": 27, "tags": ["space", "building"],
+     "effects": {"titanium_value": 1, "vp": 2}},
+    {"id": "development_center", "name": "Development Center", "cost": 11, "tags": ["science", "building"],
+     "effects": {"cards": 1}},
+    {"id": "fusion_power", "name": "Fusion Power", "cost": 14, "tags": ["science", "power", "building"],
+     "effects": {"energy": 3}},
+    {"id": "geothermal", "name": "Geothermal Power", "cost": 11, "tags": ["power", "building"],
+     "effects": {"energy": 2}},
+    {"id": "trees", "name": "Trees", "cost": 13, "tags": ["plant"],
+     "effects": {"oxygen": 1, "plant": 3, "vp": 1}},
+    {"id": "fish", "name": "Fish", "cost": 9, "tags": ["animal"],
+     "effects": {"animal_resource": 1, "vp_per_animal": 1}},
+    {"id": "livestock", "name": "Livestock", "cost": 10, "tags": ["animal"],
+     "effects": {"animal_resource": 1, "plant": -1}},
+    {"id": "ironworks", "name": "Ironworks", "cost": 11, "tags": ["building"],
+     "effects": {"oxygen": 1, "energy": -1}},
+    {"id": "mine", "name": "Mine", "cost": 4, "tags": ["building"],
+     "effects": {"steel": 1}},
+    {"id": "aquifer", "name": "Aquifer Pumping", "cost": 18, "tags": [],
+     "effects": {"ocean": 1}}
+]
+
+TAGS = ["building", "space", "science", "power", "jovian", "plant", "animal"]
+TAG_BITS = {tag: 1 << bit for bit, tag in enumerate(TAGS)}
+
+# MC knocked off the price per tag, for paying in steel and titanium
+TAG_DISCOUNTS = {"building": 2, "space": 3}
+# The resource that pays for each discounted tag, one unit per tag
+TAG_RESOURCES = {"building": "steel", "space": "titanium"}
+
+
+def _raise_temperature(steps: int) -> Callable:
+    def apply(game: "TerraformingMars", player: Dict) -> str:
+        game.global_parameters["temperature"] = min(8, game.global_parameters["temperature"] + steps * 2)
+        player["terraform_rating"] += steps
+        return f"Temperature +{steps * 2}"
+    return apply
+
+
+def _raise_oxygen(steps: int) -> Callable:
+    def apply(game: "TerraformingMars", player: Dict) -> str:
+        game.global_parameters["oxygen"] = min(14, game.global_parameters["oxygen"] + steps)
+        player["terraform_rating"] += steps
+        return f"Oxygen +{steps}"
+    return apply
+
+
+def _place_oceans(count: int) -> Callable:
+    def apply(game: "TerraformingMars", player: Dict) -> str:
+        game.global_parameters["oceans"] = min(9, game.global_parameters["oceans"] + count)
+        player["terraform_rating"] += count
+        return f"Ocean +{count}"
+    return apply
+
+
+def _energy_production(amount: int) -> Callable:
+    def apply(game: "TerraformingMars", player: Dict) -> str:
+        player["production"]["energy"] += amount
+        return f"Energy production +{amount}"
+    return apply
+
+
+def _victory_points(amount: int) -> Callable:
+    def apply(game: "TerraformingMars", player: Dict) -> str:
+        player["vp"] += amount
+        return f"VP +{amount}"
+    return apply
+
+
+# Resolved in this order; other effect keys are descriptive only
+EFFECT_COMPILERS = [
+    ("temperature", _raise_temperature),
+    ("oxygen", _raise_oxygen),
+    ("ocean", _place_oceans),
+    ("energy", _energy_production),
+    ("vp", _victory_points)
+]
+
+
+def _compile_effects(effects: Dict) -> Callable[["TerraformingMars", Dict], List[str]]:
+    steps = [compile_(effects[key]) for key, compile_ in EFFECT_COMPILERS if key in effects]
+
+    def apply(game: "TerraformingMars", player: Dict) -> List[str]:
+        return [step(game, player) for step in steps]
+    return apply
+
+
+class Card(NamedTuple):
+    code: int
+    id: str
+    name: str
+    cost: int
+    tag_mask: int
+    discount: int
+    apply: Callable[["TerraformingMars", Dict], List[str]]
+
+
+CATALOG = tuple(
+    Card(
+        code, data["id"], data["name"], data["cost"],
+        sum(TAG_BITS[tag] for tag in set(data["tags"])),
+        sum(TAG_DISCOUNTS.get(tag, 0) for tag in data["tags"]),
+        _compile_effects(data["effects"])
+    )
+    for code, data in enumerate(CARD_DATA)
+)
+CARD_INDEX = {card.id: card.code for card in CATALOG}
+
+# Copies of each card in the game, one per seat, so any card can be in every
+# starting hand
+CARD_COPIES = 5
+
+# Per-card list price and discounted tag counts, for pricing a whole hand at once
+COSTS = np.array([card.cost for card in CATALOG], dtype=np.int32)
+TAG_COUNTS = {
+    tag: np.array([data["tags"].count(tag) for data in CARD_DATA], dtype=np.int32)
+    for tag in TAG_DISCOUNTS
+}
+
+
+def _payment(player: Dict, codes: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    # MC owed for each card once the player's steel and titanium cover what
+    # they can of its tags, and the units of each resource that spends. Both
+    # listing and playing a card price it here.
+    owed = COSTS[codes].copy()
+    spent = {}
+    for tag, discount in TAG_DISCOUNTS.items():
+        resource = TAG_RESOURCES[tag]
+        spent[resource] = np.minimum(TAG_COUNTS[tag][codes], player[resource])
+        owed -= discount * spent[resource]
+    return owed, spent
+
+
+@lru_cache(maxsize=4096)
+def _card_dicts(codes: tuple) -> List[Dict]:
+    # Hands rarely change between state reads, so their API form is shared
+    return [CARD_DATA[code] for code in codes]
+
+
+PLAY_ACTIONS = tuple(
+    {
+        "id": f"play_{data['id']}",
+        "type": "play_card",
+        "card_id": code,
+        "card": data,
+        "cost": data["cost"],
+        "description": f"Play {data['name']} for {data['cost']} MC"
+    }
+    for code, data in enumerate(CARD_DATA)
+)
+
+# Sorted by cost, so the affordable ones are a prefix
+STANDARD_PROJECTS = [
+    {
+        "id": "sell_patents",
+        "type": "standard_project",
+        "name": "Sell Patents",
+        "cost": 0,
+        "effect": "Discard cards for 1 MC each",
+        "description": "Sell patents for credits"
+    },
+    {
+        "id": "power_plant",
+        "type": "standard_project",
+        "name": "Power Plant",
+        "cost": 11,
+        "effect": "Increase energy production by 1",
+        "description": "Build power plant for 11 MC"
+    },
+    {
+        "id": "asteroid_project",
+        "type": "standard_project",
+        "name": "Asteroid",
+        "cost": 14,
+        "effect": "Increase temperature by 1",
+        "description": "Send asteroid for 14 MC"
+    },
+    {
+        "id": "aquifer_project",
+        "type": "standard_project",
+        "name": "Aquifer",
+        "cost": 18,
+        "effect": "Place ocean tile",
+        "description": "Create aquifer for 18 MC"
+    },
+    {
+        "id": "greenery_project",
+        "type": "standard_project",
+        "name": "Greenery",
+        "cost": 23,
+        "effect": "Place greenery tile, increase oxygen by 1",
+        "description": "Plant greenery for 23 MC"
+    },
+    {
+        "id": "city_project",
+        "type": "standard_project",
+        "name": "City",
+        "cost": 25,
+        "effect": "Place city tile",
+        "description": "Build city for 25 MC"
+    }
+]
+PROJECT_COSTS = [project["cost"] for project in STANDARD_PROJECTS]
+
+CONVERT_PLANTS_ACTION = {
+    "id": "convert_plants",
+    "type": "convert",
+    "resource": "plants",
+    "description": "Convert 8 plants to greenery"
+}
+CONVERT_HEAT_ACTION = {
+    "id": "convert_heat",
+    "type": "convert",
+    "resource": "heat",
+    "description": "Convert 8 heat to raise temperature"
+}
+PASS_ACTION = {
+    "id": "pass",
+    "type": "pass",
+    "description": "Pass turn"
+}
+
+class TerraformingMars(RandomStateMixin, VersionedStateMixin):
+    # 2: research draws from a shuffled pile and sell patents discards a card
+    RULES_VERSION = 2
+    
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.players = []
         self.current_turn = 0
         self.generation = 1
@@ -12,7 +262,9 @@ class TerraformingMars:
             "oceans": 0
         }
         self.board = self._initialize_board()
-        self.cards = self._initialize_cards()
+        # Every copy of every card is in exactly one hand, tableau or pile
+        self.deck = []
+        self.discard_pile = []
         
     def _initialize_board(self) -> Dict:
         return {
@@ -33,40 +285,6 @@ class TerraformingMars:
             }
         }
     
-    def _initialize_cards(self) -> List[Dict]:
-        return [
-            {"id": "ai_central", "name": "AI Central", "cost": 21, "tags": ["science", "building"],
-             "effects": {"vp": 1, "cards_per_gen": 2}},
-            {"id": "asteroid", "name": "Asteroid", "cost": 14, "tags": ["space"],
-             "effects": {"temperature": 1, "titanium": 2}},
-            {"id": "comet", "name": "Comet", "cost": 21, "tags": ["space"],
-             "effects": {"temperature": 1, "ocean": 1}},
-            {"id": "big_asteroid", "name": "Big Asteroid", "cost": 27, "tags": ["space"],
-             "effects": {"temperature": 2, "titanium": 4}},
-            {"id": "water_import", "name": "Water Import from Europa", "cost": 25, "tags": ["space", "jovian"],
-             "effects": {"ocean": 1, "vp": 1}},
-            {"id": "space_elevator", "name": "Space Elevator", "cost": 27, "tags": ["space", "building"],
-             "effects": {"titanium_value": 1, "vp": 2}},
-            {"id": "development_center", "name": "Development Center", "cost": 11, "tags": ["science", "building"],
-             "effects": {"cards": 1}},
-            {"id": "fusion_power", "name": "Fusion Power", "cost": 14, "tags": ["science", "power", "building"],
-             "effects": {"energy": 3}},
-            {"id": "geothermal", "name": "Geothermal Power", "cost": 11, "tags": ["power", "building"],
-             "effects": {"energy": 2}},
-            {"id": "trees", "name": "Trees", "cost": 13, "tags": ["plant"],
-             "effects": {"oxygen": 1, "plant": 3, "vp": 1}},
-            {"id": "fish", "name": "Fish", "cost": 9, "tags": ["animal"],
-             "effects": {"animal_resource": 1, "vp_per_animal": 1}},
-            {"id": "livestock", "name": "Livestock", "cost": 10, "tags": ["animal"],
-             "effects": {"animal_resource": 1, "plant": -1}},
-            {"id": "ironworks", "name": "Ironworks", "cost": 11, "tags": ["building"],
-             "effects": {"oxygen": 1, "energy": -1}},
-            {"id": "mine", "name": "Mine", "cost": 4, "tags": ["building"],
-             "effects": {"steel": 1}},
-            {"id": "aquifer", "name": "Aquifer Pumping", "cost": 18, "tags": [],
-             "effects": {"ocean": 1}}
-        ]
-    
     def setup_game(self, player_names: List[str]) -> Dict:
         if len(player_names) != 5:
             raise ValueError("Terraforming Mars requires exactly 5 players")
@@ -102,13 +320,32 @@ class TerraformingMars:
                 "vp": 0
             }
             
-            starting_cards = random.sample(self.cards, 10)
-            player["cards"] = starting_cards
+            player["cards"] = self.rng.sample(range(len(CATALOG)), 10)
             
             self.players.append(player)
         
+        # Starting hands are ten different cards each; the copies left over
+        # form the draw pile.
+        dealt = Counter(code for player in self.players for code in player["cards"])
+        self.deck = [code for code in range(len(CATALOG)) for _ in range(CARD_COPIES - dealt[code])]
+        self.rng.shuffle(self.deck)
+        self.discard_pile = []
+        
         return self.get_game_state()
     
+    def _draw_cards(self, count: int) -> List[int]:
+        # The discard pile is shuffled back in when the draw pile runs out;
+        # with both empty, fewer cards are drawn.
+        drawn = []
+        for _ in range(count):
+            if not self.deck:
+                if not self.discard_pile:
+                    break
+                self.deck, self.discard_pile = self.discard_pile, []
+                self.rng.shuffle(self.deck)
+            drawn.append(self.deck.pop())
+        return drawn
+    
     def _get_starting_credits(self, corp: str) -> int:
         credits = {
             "Credicor": 57,
@@ -129,14 +366,21 @@ class TerraformingMars:
         }
         return production.get(corp, 0)
     
+    def _player_view(self, player: Dict) -> Dict:
+        view = dict(player)
+        view["cards"] = _card_dicts(tuple(player["cards"]))
+        view["played_cards"] = _card_dicts(tuple(player["played_cards"]))
+        return view
+    
     def get_game_state(self) -> Dict:
+        players = [self._player_view(player) for player in self.players]
         return {
             "turn": self.current_turn,
             "generation": self.generation,
             "global_parameters": self.global_parameters,
             "board": self.board,
-            "players": self.players,
-            "current_player": self.players[self.current_turn % len(self.players)] if self.players else None,
+            "players": players,
+            "current_player": players[self.current_turn % len(players)] if players else None,
             "game_end": self._check_game_end()
         }
     
@@ -150,101 +394,23 @@ class TerraformingMars:
             return []
         
         player = self.players[player_id]
-        actions = []
         
-        for card in player["cards"]:
-            cost = card["cost"]
-            
-            steel_discount = card["tags"].count("building") * 2
-            titanium_discount = card["tags"].count("space") * 3
-            
-            can_afford = player["megacredits"] >= cost - steel_discount - titanium_discount
-            
-            if can_afford:
-                actions.append({
-                    "id": f"play_{card['id']}",
-                    "type": "play_card",
-                    "card": card,
-                    "cost": cost,
-                    "description": f"Play {card['name']} for {cost} MC"
-                })
-        
-        standard_projects = [
-            {
-                "id": "sell_patents",
-                "type": "standard_project",
-                "name": "Sell Patents",
-                "cost": 0,
-                "effect": "Discard cards for 1 MC each",
-                "description": "Sell patents for credits"
-            },
-            {
-                "id": "power_plant",
-                "type": "standard_project",
-                "name": "Power Plant",
-                "cost": 11,
-                "effect": "Increase energy production by 1",
-                "description": "Build power plant for 11 MC"
-            },
-            {
-                "id": "asteroid_project",
-                "type": "standard_project",
-                "name": "Asteroid",
-                "cost": 14,
-                "effect": "Increase temperature by 1",
-                "description": "Send asteroid for 14 MC"
-            },
-            {
-                "id": "aquifer_project",
-                "type": "standard_project",
-                "name": "Aquifer",
-                "cost": 18,
-                "effect": "Place ocean tile",
-                "description": "Create aquifer for 18 MC"
-            },
-            {
-                "id": "greenery_project",
-                "type": "standard_project",
-                "name": "Greenery",
-                "cost": 23,
-                "effect": "Place greenery tile, increase oxygen by 1",
-                "description": "Plant greenery for 23 MC"
-            },
-            {
-                "id": "city_project",
-                "type": "standard_project",
-                "name": "City",
-                "cost": 25,
-                "effect": "Place city tile",
-                "description": "Build city for 25 MC"
-            }
-        ]
+        # Every card in hand against what the player would pay for it, in one go
+        hand = np.array(player["cards"], dtype=np.intp)
+        owed, _ = _payment(player, hand)
+        affordable = hand[owed <= player["megacredits"]]
+        # Copies of a card in one hand are played the same way, so they share an action
+        actions = [PLAY_ACTIONS[code] for code in dict.fromkeys(affordable.tolist())]
         
-        for project in standard_projects:
-            if player["megacredits"] >= project["cost"]:
-                actions.append(project)
+        actions.extend(STANDARD_PROJECTS[:bisect_right(PROJECT_COSTS, player["megacredits"])])
         
         if player["plants"] >= 8:
-            actions.append({
-                "id": "convert_plants",
-                "type": "convert",
-                "resource": "plants",
-                "description": "Convert 8 plants to greenery"
-            })
+            actions.append(CONVERT_PLANTS_ACTION)
         
         if player["heat"] >= 8:
-            actions.append({
-                "id": "convert_heat",
-                "type": "convert",
-                "resource": "heat",
-                "description": "Convert 8 heat to raise temperature"
-            })
+            actions.append(CONVERT_HEAT_ACTION)
         
-        actions.append({
-            "id": "pass",
-            "type": "pass",
-            "description": "Pass turn"
-        })
+        actions.append(PASS_ACTION)
         
         return actions
     
@@ -267,49 +433,30 @@ class TerraformingMars:
         return {"success": False, "error": "Unknown action"}
     
     def _execute_play_card(self, player: Dict, action: Dict) -> Dict:
-        card = action.get("card")
-        cost = card["cost"]
-        
-        if player["megacredits"] < cost:
+        code = action.get("card_id")
+        if code is None:
+            # Actions logged before cards had codes
+            code = CARD_INDEX.get((action.get("card") or {}).get("id"))
+        if code is None or not 0 <= code < len(CATALOG):
+            return {"success": False, "error": "Unknown card"}
+        
+        card = CATALOG[code]
+        owed, spent = _payment(player, np.array([code], dtype=np.intp))
+        if player["megacredits"] < owed[0]:
             return {"success": False, "error": "Insufficient credits"}
+        if code not in player["cards"]:
+            return {"success": False, "error": "Card not in hand"}
         
-        player["megacredits"] -= cost
-        player["cards"].remove(card)
-        player["played_cards"].append(card)
-        
-        effects = card.get("effects", {})
-        results = []
-        
-        if "temperature" in effects:
-            temp_increase = effects["temperature"]
-            self.global_parameters["temperature"] = min(8, self.global_parameters["temperature"] + temp_increase * 2)
-            player["terraform_rating"] += temp_increase
-            results.append(f"Temperature +{temp_increase * 2}")
-        
-        if "oxygen" in effects:
-            oxy_increase = effects["oxygen"]
-            self.global_parameters["oxygen"] = min(14, self.global_parameters["oxygen"] + oxy_increase)
-            player["terraform_rating"] += oxy_increase
-            results.append(f"Oxygen +{oxy_increase}")
-        
-        if "ocean" in effects:
-            ocean_increase = effects["ocean"]
-            self.global_parameters["oceans"] = min(9, self.global_parameters["oceans"] + ocean_increase)
-            player["terraform_rating"] += ocean_increase
-            results.append(f"Ocean +{ocean_increase}")
-        
-        if "energy" in effects:
-            player["production"]["energy"] += effects["energy"]
-            results.append(f"Energy production +{effects['energy']}")
-        
-        if "vp" in effects:
-            player["vp"] += effects["vp"]
-            results.append(f"VP +{effects['vp']}")
+        player["megacredits"] -= int(owed[0])
+        for resource, units in spent.items():
+            player[resource] -= int(units[0])
+        player["cards"].remove(code)
+        player["played_cards"].append(code)
         
         return {
             "success": True,
-            "card": card["name"],
-            "effects": results,
+            "card": card.name,
+            "effects": card.apply(self, player),
             "remaining_credits": player["megacredits"]
         }
     
@@ -324,7 +471,14 @@ class TerraformingMars:
         
         results = []
         
-        if project_id == "power_plant":
+        if project_id == "sell_patents":
+            # The longest-held card goes to the discard pile
+            if player["cards"]:
+                code = player["cards"].pop(0)
+                self.discard_pile.append(code)
+                player["megacredits"] += 1
+                results.append(f"Sold {CATALOG[code].name} for 1 MC")
+        elif project_id == "power_plant":
             player["production"]["energy"] += 1
             results.append("Energy production +1")
         elif project_id == "asteroid_project":
@@ -403,7 +557,4 @@ class TerraformingMars:
                 
                 player["megacredits"] += player["terraform_rating"]
                 
-                if self.deck:
-                    for _ in range(4):
-                        if self.deck:
-                            player["cards"].append(self.deck.pop())
+                player["cards"].extend(self._draw_cards(4))
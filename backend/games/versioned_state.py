@@ -0,0 +1,88 @@
+import functools
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .action_families import ActionFamily
+
+
+def _bumps_version(method):
+    @functools.wraps(method)
+    def wrapped(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.state_version += 1
+    return wrapped
+
+
+# Every engine method that can change the game bumps state_version, so legal
+# actions are enumerated once per (player, version) and looked up by id after
+# that. Cached action dicts are shared; callers must not mutate them.
+class VersionedStateMixin:
+    MUTATORS = ("setup_game", "execute_action", "apply_move", "advance_turn")
+    state_version = 0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.MUTATORS:
+            method = cls.__dict__.get(name)
+            if method is not None:
+                setattr(cls, name, _bumps_version(method))
+
+    def legal_actions(self, player_id: int) -> List[Dict]:
+        return self._cached_actions(player_id)[0]
+
+    def resolve_action(self, player_id: int, action_id: Optional[str]) -> Optional[Dict]:
+        return self._cached_actions(player_id)[1].get(action_id)
+
+    def _cached_actions(self, player_id: int) -> Tuple[List[Dict], Dict[str, Dict]]:
+        cache = self.__dict__.setdefault('_action_cache', {})
+        entry = cache.get(player_id)
+
+        if entry is None or entry[0] != self.state_version:
+            actions = self.get_available_actions(player_id)
+            index = {}
+            for action in actions:
+                index.setdefault(action.get('id'), action)
+            entry = cache[player_id] = (self.state_version, actions, index)
+
+        return entry[1], entry[2]
+
+    def cached_for_version(self, key: Hashable, compute: Callable):
+        # Derived values (reachable sets, views) shared by everything that
+        # asks for them until the state changes.
+        cache = self.__dict__.get('_derived_cache')
+        if cache is None or cache[0] != self.state_version:
+            cache = self._derived_cache = (self.state_version, {})
+        values = cache[1]
+        if key not in values:
+            values[key] = compute()
+        return values[key]
+
+    def action_families(self, player_id: int) -> List[ActionFamily]:
+        # Engines with large parametric action spaces override this and build
+        # get_available_actions on top of it; otherwise each action is its own
+        # family.
+        return [ActionFamily.single(action) for action in self.legal_actions(player_id)]
+
+    def iter_actions(self, player_id: int, action_type: Optional[str] = None,
+                     start: int = 0) -> Iterator[Dict]:
+        # Legal actions in get_available_actions order, optionally of one type,
+        # skipping the first `start` without building them.
+        for family in self.action_families(player_id):
+            if action_type is not None and family.action_type != action_type:
+                continue
+
+            size = len(family)
+            if start >= size:
+                start -= size
+                continue
+
+            yield from family.expand(start)
+            start = 0
+
+    def __getstate__(self):
+        # Hibernated games rebuild the caches on first use.
+        state = dict(self.__dict__)
+        state.pop('_action_cache', None)
+        state.pop('_derived_cache', None)
+        return state
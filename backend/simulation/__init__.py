@@ -0,0 +1,10 @@
+from .agents import RandomAgent, NanoAgent, StubLLMAgent
+from .harness import play_game, run_simulation
+
+__all__ = [
+    'RandomAgent',
+    'NanoAgent',
+    'StubLLMAgent',
+    'play_game',
+    'run_simulation'
+]
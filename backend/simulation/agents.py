@@ -0,0 +1,107 @@
+import json
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from ai.character_lore import CHARACTER_LORE
+
+
+class RandomAgent:
+    def __init__(self, game_type: str, player_count: int, rng: random.Random, **options):
+        self.rng = rng
+
+    async def choose(self, player_id: int, game_state: Dict, actions: List[Dict]) -> Dict:
+        return self.rng.choice(actions)
+
+    def choose_move(self, player_id: int, moves: List[int]) -> int:
+        # Engines with a compact move encoding (legal_moves/apply_move) skip
+        # building state and action dicts for agents that never look at them.
+        return self.rng.choice(moves)
+
+
+def _seat_characters(game_type: str, player_count: int) -> List[str]:
+    names = [name for name in CHARACTER_LORE.get(game_type, {}) if name != 'default'] or ['default']
+    return [names[idx % len(names)] for idx in range(player_count)]
+
+
+class NanoAgent:
+    # Every seat plays a lore character through NanoBananaPro: bundled profiles
+    # when a bundle is given, otherwise the default personality, plus any
+    # trained policies in policy_dir.
+    def __init__(self, game_type: str, player_count: int, rng: random.Random,
+                 policy_dir: Optional[str] = None, bundle_path: Optional[str] = None, **options):
+        from ai.nano_banana_pro import NanoBananaPro
+        from ai.profile_bundle import ProfileBundle
+        import numpy as np
+
+        self.game_type = game_type
+        self.nano = NanoBananaPro(policy_dir=policy_dir)
+        self.seats = _seat_characters(game_type, player_count)
+        self._pending = []
+
+        bundle = ProfileBundle.load(bundle_path) if bundle_path else None
+        for name in set(self.seats):
+            entry = bundle.get_entry(game_type, name) if bundle else None
+            if entry:
+                self.nano.register_character(
+                    name, game_type, np.array(entry['embedding'], dtype=np.float32), entry['behavioral_model']
+                )
+            else:
+                self._pending.append(name)
+
+    async def choose(self, player_id: int, game_state: Dict, actions: List[Dict]) -> Dict:
+        while self._pending:
+            await self.nano.train_character_personality(self._pending.pop(), self.game_type, {})
+
+        prediction = await self.nano.predict_action(
+            self.seats[player_id], self.game_type, actions, game_state
+        )
+        return prediction.get('selected_action') or actions[0]
+
+
+class _StubModel:
+    # Answers CharacterMimicry prompts without a network call by picking one of
+    # the action IDs listed in the prompt.
+    def __init__(self, rng: random.Random, latency_ms: float):
+        self.rng = rng
+        self.latency_ms = latency_ms
+
+    def generate_content(self, prompt: str):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        ids = re.findall(r'^\d+\. ID: (.*)$', prompt, re.MULTILINE)
+        reply = {
+            "action_id": self.rng.choice(ids) if ids else "",
+            "reasoning": "stub",
+            "in_character_quote": "",
+            "confidence": 0.5
+        }
+        return type('StubResponse', (), {'text': json.dumps(reply)})()
+
+
+class StubLLMAgent:
+    # Runs the full CharacterMimicry prompt-building and parsing path against a
+    # stub model, with optional simulated model latency.
+    def __init__(self, game_type: str, player_count: int, rng: random.Random,
+                 llm_latency_ms: float = 0.0, **options):
+        from ai.character_mimicry import CharacterMimicry
+
+        self.game_type = game_type
+        self.seats = _seat_characters(game_type, player_count)
+        self.mimicry = CharacterMimicry('', type('Knowledge', (), {'character_knowledge': {}})())
+        self.mimicry.model = _StubModel(rng, llm_latency_ms)
+
+    async def choose(self, player_id: int, game_state: Dict, actions: List[Dict]) -> Dict:
+        decision = await self.mimicry.mimic_character_decision(
+            self.game_type, self.seats[player_id], game_state, actions
+        )
+        return decision.get('action') or actions[0]
+
+
+AGENTS = {
+    'random': RandomAgent,
+    'nano': NanoAgent,
+    'llm': StubLLMAgent
+}
@@ -0,0 +1,244 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import traceback
+
+from simulation.agents import AGENTS
+from utils.game_factory import GameFactory
+
+GAME_TYPES = [
+    'brass_birmingham', 'gloomhaven', 'terraforming_mars',
+    'dune', 'dungeons_dragons', 'exploding_kittens'
+]
+TIMERS = ('state', 'actions', 'agent', 'execute', 'advance')
+
+
+def _new_result(game_type: str, seed: int) -> Dict:
+    return {
+        "game_type": game_type,
+        "seed": seed,
+        "turns": 0,
+        "actions_generated": 0,
+        "completed": False,
+        "error": None,
+        "timings_ns": dict.fromkeys(TIMERS, 0)
+    }
+
+
+async def _play(game, agent, player_count: int, max_turns: int, result: Dict):
+    timings = result['timings_ns']
+    clock = time.perf_counter_ns
+    try:
+        for _ in range(max_turns):
+            started = clock()
+            state = game.get_game_state()
+            after_state = clock()
+            timings['state'] += after_state - started
+
+            if state.get('game_over'):
+                result['completed'] = True
+                break
+
+            player_id = game.current_turn % player_count
+            actions = game.get_available_actions(player_id)
+            after_actions = clock()
+            timings['actions'] += after_actions - after_state
+            result['actions_generated'] += len(actions)
+
+            if actions:
+                action = await agent.choose(player_id, state, actions)
+                after_agent = clock()
+                timings['agent'] += after_agent - after_actions
+
+                game.execute_action(player_id, action)
+                timings['execute'] += clock() - after_agent
+
+            started = clock()
+            game.advance_turn()
+            timings['advance'] += clock() - started
+            result['turns'] += 1
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc(limit=3)
+
+
+def _play_moves(game, agent, player_count: int, max_turns: int, result: Dict):
+    # Same loop as _play over the engine's integer-coded moves; the same
+    # seed and agent pick the same game as the dict path.
+    timings = result['timings_ns']
+    clock = time.perf_counter_ns
+    try:
+        for _ in range(max_turns):
+            started = clock()
+            game_over = game.is_game_over()
+            after_state = clock()
+            timings['state'] += after_state - started
+
+            if game_over:
+                result['completed'] = True
+                break
+
+            player_id = game.current_turn % player_count
+            moves = game.legal_moves(player_id)
+            after_actions = clock()
+            timings['actions'] += after_actions - after_state
+            result['actions_generated'] += len(moves)
+
+            if moves:
+                move = agent.choose_move(player_id, moves)
+                after_agent = clock()
+                timings['agent'] += after_agent - after_actions
+
+                game.apply_move(player_id, move)
+                timings['execute'] += clock() - after_agent
+
+            started = clock()
+            game.advance_turn()
+            timings['advance'] += clock() - started
+            result['turns'] += 1
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc(limit=3)
+
+
+def play_game(game_type: str, agent_name: str = 'random', seed: int = 0,
+              max_turns: int = 200, options: Optional[Dict] = None) -> Dict:
+    started = time.perf_counter()
+    result = _new_result(game_type, seed)
+
+    game = GameFactory.create_game(game_type, seed=seed)
+    player_count = GameFactory.get_player_count(game_type)
+    game.setup_game([{"name": f"Player{idx}"} for idx in range(player_count)])
+    # Agents get their own stream so their choices never shift the engine's.
+    agent = AGENTS[agent_name](game_type, player_count, random.Random(seed ^ 0x5EED), **(options or {}))
+
+    if hasattr(game, 'legal_moves') and hasattr(agent, 'choose_move'):
+        _play_moves(game, agent, player_count, max_turns, result)
+    else:
+        asyncio.run(_play(game, agent, player_count, max_turns, result))
+
+    result['wall_s'] = time.perf_counter() - started
+    return result
+
+
+def _play_job(job) -> Dict:
+    return play_game(*job)
+
+
+def run_simulation(game_types: List[str], games_per_type: int, agent_name: str = 'random',
+                   workers: int = 0, max_turns: int = 200, seed: int = 0,
+                   options: Optional[Dict] = None) -> Dict:
+    jobs = [
+        (game_type, agent_name, seed + idx, max_turns, options or {})
+        for game_type in game_types
+        for idx in range(games_per_type)
+    ]
+
+    started = time.perf_counter()
+    if workers == 1:
+        results = [_play_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or None) as pool:
+            results = list(pool.map(_play_job, jobs, chunksize=max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))))
+    wall = time.perf_counter() - started
+
+    return summarize(results, wall)
+
+
+def summarize(results: List[Dict], wall: float) -> Dict:
+    engines = {}
+    for result in results:
+        engine = engines.setdefault(result['game_type'], {
+            "games": 0, "completed": 0, "errors": {}, "turns": 0, "actions_generated": 0,
+            "cpu_s": 0.0, "timings_ns": dict.fromkeys(TIMERS, 0)
+        })
+        engine['games'] += 1
+        engine['completed'] += 1 if result['completed'] else 0
+        engine['turns'] += result['turns']
+        engine['actions_generated'] += result['actions_generated']
+        engine['cpu_s'] += result['wall_s']
+        if result['error']:
+            engine['errors'][result['error']] = engine['errors'].get(result['error'], 0) + 1
+        for name, value in result['timings_ns'].items():
+            engine['timings_ns'][name] += value
+
+    report = {}
+    for game_type, engine in engines.items():
+        turns = engine['turns'] or 1
+        timings = engine.pop('timings_ns')
+        cpu_s = engine.pop('cpu_s')
+        report[game_type] = {
+            **engine,
+            "games_per_s": round(engine['games'] / cpu_s, 2) if cpu_s else 0.0,
+            "turns_per_s": round(engine['turns'] / cpu_s, 1) if cpu_s else 0.0,
+            "mean_actions": round(engine['actions_generated'] / turns, 1),
+            "us_per_turn": {name: round(value / turns / 1000, 2) for name, value in timings.items()}
+        }
+
+    total_games = len(results)
+    total_turns = sum(result['turns'] for result in results)
+    return {
+        "wall_s": round(wall, 3),
+        "games": total_games,
+        "turns": total_turns,
+        "games_per_s": round(total_games / wall, 2) if wall else 0.0,
+        "turns_per_s": round(total_turns / wall, 1) if wall else 0.0,
+        "engines": report
+    }
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"{report['games']} games, {report['turns']} turns in {report['wall_s']}s: "
+        f"{report['games_per_s']} games/s, {report['turns_per_s']} turns/s",
+        "",
+        f"{'engine':<20}{'games':>6}{'done':>6}{'err':>5}{'games/s':>9}{'turns/s':>10}"
+        f"{'actions':>9}{'gen us':>9}{'agent us':>10}{'exec us':>9}"
+    ]
+    for game_type, engine in report['engines'].items():
+        timings = engine['us_per_turn']
+        lines.append(
+            f"{game_type:<20}{engine['games']:>6}{engine['completed']:>6}{sum(engine['errors'].values()):>5}"
+            f"{engine['games_per_s']:>9}{engine['turns_per_s']:>10}{engine['mean_actions']:>9}"
+            f"{timings['actions']:>9}{timings['agent']:>10}{timings['execute']:>9}"
+        )
+        for error, count in engine['errors'].items():
+            lines.append(f"    {count}x {error}")
+    lines.append("")
+    lines.append("games/s and turns/s per engine are per worker process; timings are per turn.")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play headless games with pluggable agents and report engine throughput')
+    parser.add_argument('--games', nargs='+', default=GAME_TYPES, choices=GAME_TYPES)
+    parser.add_argument('--count', type=int, default=20, help='games per engine')
+    parser.add_argument('--agent', default='random', choices=sorted(AGENTS))
+    parser.add_argument('--workers', type=int, default=0, help='processes (0 = one per CPU, 1 = in-process)')
+    parser.add_argument('--max-turns', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy-dir', default=None)
+    parser.add_argument('--bundle', default=None)
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0)
+    parser.add_argument('--json', action='store_true', help='print the raw report as JSON')
+    args = parser.parse_args()
+
+    options = {}
+    if args.agent == 'nano':
+        options = {"policy_dir": args.policy_dir, "bundle_path": args.bundle}
+    elif args.agent == 'llm':
+        options = {"llm_latency_ms": args.llm_latency_ms}
+
+    report = run_simulation(
+        args.games, args.count, args.agent, args.workers, args.max_turns, args.seed, options
+    )
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == '__main__':
+    main()
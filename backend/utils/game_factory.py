@@ -1,3 +1,5 @@
+from typing import Optional
+
 from games.brass_birmingham import BrassBirmingham
 from games.gloomhaven import Gloomhaven
 from games.terraforming_mars import TerraformingMars
@@ -7,7 +9,7 @@ from games.exploding_kittens import ExplodingKittens
 
 class GameFactory:
     @staticmethod
-    def create_game(game_type: str):
+    def create_game(game_type: str, seed: Optional[int] = None):
         games = {
             'brass_birmingham': BrassBirmingham,
             'gloomhaven': Gloomhaven,
@@ -19,7 +21,9 @@ class GameFactory:
         
         game_class = games.get(game_type)
         if game_class:
-            return game_class()
+            # Engines draw all randomness from a generator seeded here, so a
+            # game can be rebuilt exactly from its seed and action log.
+            return game_class(seed=seed)
         
         raise ValueError(f"Unknown game type: {game_type}")
     
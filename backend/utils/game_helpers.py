@@ -1,21 +1,25 @@
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-def roll_dice(sides: int, count: int = 1) -> List[int]:
-    return [random.randint(1, sides) for _ in range(count)]
+# Helpers that draw randomness take the engine's generator; the module-level
+# one is only a fallback for callers outside a game.
 
-def roll_d20() -> int:
-    return random.randint(1, 20)
+def roll_dice(sides: int, count: int = 1, rng: Optional[random.Random] = None) -> List[int]:
+    rng = rng or random
+    return [rng.randint(1, sides) for _ in range(count)]
 
-def roll_d6() -> int:
-    return random.randint(1, 6)
+def roll_d20(rng: Optional[random.Random] = None) -> int:
+    return (rng or random).randint(1, 20)
+
+def roll_d6(rng: Optional[random.Random] = None) -> int:
+    return (rng or random).randint(1, 6)
 
 def calculate_modifier(stat: int) -> int:
     return (stat - 10) // 2
 
-def shuffle_deck(deck: List[Any]) -> List[Any]:
+def shuffle_deck(deck: List[Any], rng: Optional[random.Random] = None) -> List[Any]:
     shuffled = deck.copy()
-    random.shuffle(shuffled)
+    (rng or random).shuffle(shuffled)
     return shuffled
 
 def draw_cards(deck: List[Any], count: int) -> tuple:
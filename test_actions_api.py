@@ -0,0 +1,173 @@
+import tempfile
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+DATA_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_PATH"] = DATA_DIR
+os.environ["HIBERNATION_PATH"] = os.path.join(DATA_DIR, "hibernated")
+
+import app as server
+
+PLAYERS = [{"name": f"Player{idx}"} for idx in range(4)]
+
+def _create_game(client, game_id, seed=1):
+    response = client.post('/api/games/create', json={
+        "game_type": "brass_birmingham", "game_id": game_id, "players": PLAYERS, "seed": seed
+    })
+    assert response.status_code == 200
+    return server.active_games[game_id]["instance"]
+
+def test_execute_resolves_the_action_by_id():
+    client = server.app.test_client()
+    game = _create_game(client, "resolve")
+    actions = client.get('/api/games/resolve/actions?player_id=0').get_json()["actions"]
+    build = next(action for action in actions if action["type"] == "build")
+    money = game.players[0]["money"]
+
+    response = client.post('/api/games/resolve/execute', json={"player_id": 0, "action_id": build["id"]})
+    assert response.status_code == 200 and response.get_json()["success"]
+    assert game.players[0]["money"] == money - build["cost"]
+
+def test_client_cost_is_ignored():
+    client = server.app.test_client()
+    game = _create_game(client, "spoof")
+    actions = client.get('/api/games/spoof/actions?player_id=0').get_json()["actions"]
+    build = max((action for action in actions if action["type"] == "build"), key=lambda a: a["cost"])
+    money = game.players[0]["money"]
+
+    spoofed = {**build, "cost": 0, "location": "birmingham"}
+    response = client.post('/api/games/spoof/execute', json={"player_id": 0, "action": spoofed})
+    assert response.status_code == 200
+    assert game.players[0]["money"] == money - build["cost"]
+    assert any(
+        industry["player"] == 0 and industry["type"] == build["industry"]
+        for industry in game.board["cities"][build["location"]]["industries"]
+    )
+
+def test_unavailable_actions_conflict():
+    client = server.app.test_client()
+    game = _create_game(client, "conflict")
+    before = game.get_game_state()
+    version = game.state_version
+
+    response = client.post('/api/games/conflict/execute', json={"player_id": 0, "action_id": "build_coal_nowhere"})
+    assert response.status_code == 409
+    assert response.get_json() == {"success": False, "error": "Action not available", "state_version": version}
+    assert client.post('/api/games/conflict/execute', json={"player_id": 0}).status_code == 409
+    assert game.get_game_state() == before and game.state_version == version
+
+def test_state_version_moves_with_the_game():
+    client = server.app.test_client()
+    _create_game(client, "version")
+    listed = client.get('/api/games/version/actions?player_id=0').get_json()
+    build = next(action for action in listed["actions"] if action["type"] == "build")
+
+    executed = client.post('/api/games/version/execute', json={"player_id": 0, "action_id": build["id"]}).get_json()
+    assert executed["state_version"] > listed["state_version"]
+    assert client.get('/api/games/version/actions?player_id=0').get_json()["state_version"] == executed["state_version"]
+
+    # The build spent the only card naming that city, so the listed id is stale.
+    again = client.post('/api/games/version/execute', json={"player_id": 0, "action_id": build["id"]})
+    assert again.status_code == 409
+    assert again.get_json()["state_version"] == executed["state_version"]
+
+def test_unknown_game_is_not_found():
+    client = server.app.test_client()
+    response = client.post('/api/games/missing/execute', json={"player_id": 0, "action_id": "pass"})
+    assert response.status_code == 404
+
+def _pages(client, url):
+    pages, cursor = [], None
+    while True:
+        page = client.get(url + (f"&cursor={cursor}" if cursor else "")).get_json()
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+def test_pages_concatenate_to_the_legal_actions():
+    client = server.app.test_client()
+    game = _create_game(client, "pages")
+    legal = client.get('/api/games/pages/actions?player_id=0').get_json()["actions"]
+    assert legal == game.legal_actions(0) and len(legal) > 7
+
+    for limit in (1, 7, len(legal), 1000):
+        pages = _pages(client, f'/api/games/pages/actions?player_id=0&limit={limit}')
+        assert [action for page in pages for action in page["actions"]] == legal
+        assert all(len(page["actions"]) == limit for page in pages[:-1])
+        assert len(pages) == -(-len(legal) // limit)
+
+    links = _pages(client, '/api/games/pages/actions?player_id=0&limit=5&type=link')
+    assert [action for page in links for action in page["actions"]] == \
+           [action for action in legal if action["type"] == "link"]
+
+def test_stale_cursors_conflict():
+    client = server.app.test_client()
+    _create_game(client, "stale")
+    first = client.get('/api/games/stale/actions?player_id=0&limit=5').get_json()
+    build = next(action for action in first["actions"] if action["type"] == "build")
+    client.post('/api/games/stale/execute', json={"player_id": 0, "action_id": build["id"]})
+
+    response = client.get(f'/api/games/stale/actions?player_id=0&limit=5&cursor={first["next_cursor"]}')
+    assert response.status_code == 409
+    assert response.get_json()["state_version"] > first["state_version"]
+
+def test_bad_limits_and_cursors_are_rejected():
+    client = server.app.test_client()
+    _create_game(client, "bad")
+    version = client.get('/api/games/bad/actions?player_id=0').get_json()["state_version"]
+    for query in ("limit=ten", "player_id=zero", "cursor=abc", f"cursor={version}", f"cursor={version}:-5",
+                  f"cursor={version}:1:2"):
+        response = client.get(f'/api/games/bad/actions?{query}')
+        assert response.status_code == 400, query
+
+    # Out-of-range limits are clamped rather than rejected.
+    assert len(client.get('/api/games/bad/actions?limit=0').get_json()["actions"]) == 1
+    past_end = client.get(f'/api/games/bad/actions?limit=5&cursor={version}:100000').get_json()
+    assert past_end["actions"] == [] and past_end["next_cursor"] is None
+
+def test_families_summarise_the_action_space():
+    client = server.app.test_client()
+    client.post('/api/games/create', json={
+        "game_type": "dune", "game_id": "families", "players": [{"name": f"P{idx}"} for idx in range(6)], "seed": 1
+    })
+    game = server.active_games["families"]["instance"]
+    families = client.get('/api/games/families/actions?player_id=0&view=families').get_json()["families"]
+    assert sum(family["count"] for family in families) == len(game.legal_actions(0))
+    assert {family["type"] for family in families} == {action["type"] for action in game.legal_actions(0)}
+
+    bids = client.get('/api/games/families/actions?player_id=0&view=families&type=bid').get_json()["families"]
+    assert [family["type"] for family in bids] == ["bid"]
+    assert bids[0]["count"] == sum(action["type"] == "bid" for action in game.legal_actions(0))
+
+def test_recreated_games_start_a_fresh_history():
+    client = server.app.test_client()
+    _create_game(client, "again")
+    actions = client.get('/api/games/again/actions?player_id=0').get_json()["actions"]
+    build = next(action for action in actions if action["type"] == "build")
+    client.post('/api/games/again/execute', json={"player_id": 0, "action_id": build["id"]})
+    assert server.persistence.flush(5)
+    assert len(list(server.game_state_db.iter_actions("again"))) == 1
+
+    game = _create_game(client, "again", seed=2)
+    assert server.persistence.flush(5)
+    history = server.game_state_db.get_game_history("again")
+    assert [entry["state"] for entry in history] == [game.get_game_state()]
+    assert list(server.game_state_db.iter_actions("again")) == []
+    assert server.game_state_db.load_action_log("again")["seed"] == 2
+
+def test_default_game_ids_are_unique():
+    client = server.app.test_client()
+    created = [
+        client.post('/api/games/create', json={"game_type": "brass_birmingham", "players": PLAYERS}).get_json()
+        for _ in range(2)
+    ]
+    assert created[0]["game_id"] != created[1]["game_id"]
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,149 @@
+import copy
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from games.brass_birmingham import BrassBirmingham, CITIES, CONNECTIONS, ROUTES, _build_cost
+
+PLAYERS = [{"name": f"Player{idx}"} for idx in range(4)]
+
+def _new_game(seed):
+    game = BrassBirmingham(seed=seed)
+    game.setup_game(PLAYERS)
+    return game
+
+def _board_network(game, player_id):
+    # The cities a player has built in or linked to, and their tile count,
+    # read off the board rather than the engine's masks.
+    industries = [city for city, data in game.board["cities"].items()
+                  for industry in data["industries"] if industry["player"] == player_id]
+    links = [link for link in game.board["canals"] + game.board["rails"] if link["player"] == player_id]
+    return set(industries) | {end for link in links for end in (link["from"], link["to"])}, len(industries) + len(links)
+
+def _reference_builds(game, player_id):
+    # Builds as the rules describe them, straight from the hand and board.
+    player = game.players[player_id]
+    network, tiles = _board_network(game, player_id)
+    if not tiles:
+        network = set(CITIES)
+
+    options = set()
+    for card in player["hand"]:
+        if card["type"] == "location":
+            options |= {(industry, card["value"]) for industry in player["industries"]}
+        else:
+            options |= {(card["value"], city) for city in network}
+
+    return {
+        (industry, city) for industry, city in options
+        if player["industries"][industry] and
+        player["money"] >= _build_cost(industry, player["industries"][industry][0], city)
+    }
+
+def _play(seed, turns=48):
+    game, agent = _new_game(seed), random.Random(seed)
+    for _ in range(turns):
+        player_id = game.current_turn % len(PLAYERS)
+        actions = game.get_available_actions(player_id)
+        yield game, player_id, actions
+
+        action = agent.choice(actions)
+        assert game.execute_action(player_id, action)["success"], action
+        game.advance_turn()
+
+def test_routes_are_undirected_and_unique():
+    edges = {frozenset((a, b)) for a, neighbours in CONNECTIONS.items() for b in neighbours}
+    assert len(ROUTES) == len(edges) == 17
+    assert {frozenset(route) for route in ROUTES} == edges
+
+def test_actions_are_unique_and_follow_the_rules():
+    for seed in range(15):
+        for game, player_id, actions in _play(seed):
+            ids = [action["id"] for action in actions]
+            assert len(ids) == len(set(ids))
+
+            builds = {(a["industry"], a["location"]) for a in actions if a["type"] == "build"}
+            assert builds == _reference_builds(game, player_id)
+            for action in actions:
+                if action["type"] == "build":
+                    level = game.players[player_id]["industries"][action["industry"]][0]
+                    assert action["level"] == level
+                    assert action["cost"] == _build_cost(action["industry"], level, action["location"])
+
+def test_links_extend_the_network_and_are_never_offered_twice():
+    for seed in range(15):
+        for game, player_id, actions in _play(seed):
+            built = {frozenset((link["from"], link["to"])) for link in game.board[f"{game.current_phase}s"]}
+            for action in actions:
+                if action["type"] != "link":
+                    continue
+                assert frozenset((action["from"], action["to"])) not in built
+                if game.tiles_placed[player_id]:
+                    assert game._in_network(player_id, action["from"]) or game._in_network(player_id, action["to"])
+
+def _reference_links(game, player_id):
+    # Links found the way the engine did before the route table: walk every
+    # city's connections on the board, skipping what this era has built.
+    player = game.players[player_id]
+    if player["money"] < (3 if game.current_phase == "canal" else 5) or player["links"] <= 0:
+        return set()
+
+    network, tiles = _board_network(game, player_id)
+    built = {frozenset((link["from"], link["to"])) for link in game.board[f"{game.current_phase}s"]}
+    return {
+        frozenset((city, other))
+        for city, data in game.board["cities"].items() for other in data["connections"]
+        if frozenset((city, other)) not in built and (not tiles or city in network or other in network)
+    }
+
+def test_route_masks_match_a_walk_of_the_board():
+    for seed in range(15):
+        for game, player_id, actions in _play(seed):
+            links = {frozenset((a["from"], a["to"])) for a in actions if a["type"] == "link"}
+            assert links == _reference_links(game, player_id)
+
+            for other in range(len(PLAYERS)):
+                network, tiles = _board_network(game, other)
+                assert game.tiles_placed[other] == tiles
+                assert game.networks[other] == sum(1 << CITIES.index(city) for city in network)
+        assert game.current_phase == "rail"
+
+def test_every_offered_action_executes():
+    game = _new_game(3)
+    for _ in range(12):
+        player_id = game.current_turn % len(PLAYERS)
+        for action in game.get_available_actions(player_id):
+            trial = copy.deepcopy(game)
+            assert trial.execute_action(player_id, action)["success"], action
+        game.execute_action(player_id, game.get_available_actions(player_id)[0])
+        game.advance_turn()
+
+def test_builds_outside_the_rules_are_rejected():
+    game = _new_game(4)
+    player = game.players[0]
+    player["hand"] = [{"type": "industry", "value": "coal"}]
+    game._extend_network(0, 1 << CITIES.index("birmingham"))
+    game.tiles_placed[0] = 1
+
+    result = game.execute_action(0, {
+        "type": "build", "industry": "coal", "location": "belper", "level": 1, "cost": 8
+    })
+    assert result == {"success": False, "error": "Location not reachable with cards in hand"}
+
+    result = game.execute_action(0, {"type": "link", "from": "gloucester", "to": "worcester", "cost": 3})
+    assert result["success"] is False
+
+def test_duplicate_cards_do_not_duplicate_actions():
+    game = _new_game(5)
+    game.players[0]["hand"] = [{"type": "location", "value": "derby"}] * 3
+    builds = [a["id"] for a in game.get_available_actions(0) if a["type"] == "build"]
+    assert sorted(builds) == sorted(f"build_{industry}_derby" for industry in game.players[0]["industries"]
+                                    if game.players[0]["money"] >= _build_cost(industry, 1, "derby"))
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,123 @@
+import threading
+import sys
+import os
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database import character_metrics
+from database.character_metrics import CharacterMetrics, HOUR, MINUTE, percentile, _pack, _unpack
+
+# A fixed hour boundary, so minutes below stay inside one hourly bucket.
+START = 1_700_000_000 // HOUR * HOUR
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def _record_in_threads(metrics, calls):
+    # Each thread gets its own buffer; recording from several exercises the merge.
+    threads = [threading.Thread(target=lambda chunk=chunk: [metrics.record(*call) for call in chunk])
+               for chunk in (calls[0::3], calls[1::3], calls[2::3])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def _by_character(results):
+    return {(r["game_type"], r["character"]): r for r in results}
+
+def test_histogram_pack_round_trips():
+    histogram = [3, 0, 1] + [0] * 45
+    assert _unpack(_pack(histogram)) == histogram
+    assert _unpack(_pack([0] * 48)) == [0] * 48
+    assert percentile([0] * 48, 0.5) == 0.0
+
+def test_buffered_and_flushed_queries_agree():
+    clock = Clock(START + 10)
+    with mock.patch.object(character_metrics.time, 'time', clock):
+        metrics = CharacterMetrics(flush_interval=0)
+        calls = [("dune", "Paul", i % 7 != 0, 5.0 + i) for i in range(60)]
+        calls += [("dune", "Jessica", True, 100.0) for _ in range(9)]
+
+        _record_in_threads(metrics, calls)
+        buffered = _by_character(metrics.query(window=5))
+        metrics.flush(force=True)
+        flushed = _by_character(metrics.query(window=5))
+        metrics.close()
+
+    assert buffered == flushed
+    paul = flushed[("dune", "Paul")]
+    assert paul["decisions"] == 60
+    assert paul["successes"] == sum(1 for i in range(60) if i % 7 != 0)
+    assert paul["latency_ms"]["max"] == 64.0
+    assert paul["latency_ms"]["mean"] == round(sum(5.0 + i for i in range(60)) / 60, 2)
+    assert flushed[("dune", "Jessica")]["failure_rate"] == 0.0
+
+def test_flushes_merge_into_existing_rollups():
+    clock = Clock(START + 10)
+    with mock.patch.object(character_metrics.time, 'time', clock):
+        metrics = CharacterMetrics(flush_interval=0)
+        for minute in range(3):
+            clock.now = START + minute * MINUTE + 10
+            _record_in_threads(metrics, [("catan", "Bob", True, 10.0 * (minute + 1))] * 6)
+            metrics.flush(force=True)
+
+        # A second flush of the same minute merges instead of replacing.
+        _record_in_threads(metrics, [("catan", "Bob", False, 1000.0)] * 3)
+        metrics.flush(force=True)
+
+        hours = metrics.query(resolution="hour", window=1, series=True)
+        minutes = metrics.query(resolution="minute", window=10, series=True)
+        metrics.close()
+
+    assert len(hours) == 1 and hours[0]["decisions"] == 21 and hours[0]["successes"] == 18
+    assert [point["bucket"] for point in hours[0]["series"]] == [START]
+    assert [point["decisions"] for point in minutes[0]["series"]] == [6, 6, 9]
+    assert minutes[0]["latency_ms"]["max"] == 1000.0
+    assert {key: hours[0][key] for key in ("decisions", "successes", "latency_ms")} == \
+           {key: minutes[0][key] for key in ("decisions", "successes", "latency_ms")}
+
+def test_open_minutes_stay_buffered_until_closed():
+    clock = Clock(START + 30)
+    with mock.patch.object(character_metrics.time, 'time', clock):
+        metrics = CharacterMetrics(flush_interval=0)
+        metrics.record("dune", "Paul", True, 10.0)
+        metrics.flush()
+        assert metrics._conn.execute("SELECT COUNT(*) FROM rollups").fetchone()[0] == 0
+
+        clock.now = START + MINUTE + 10
+        metrics.flush()
+        assert metrics._conn.execute("SELECT COUNT(*) FROM rollups").fetchone()[0] == 2
+        assert metrics.query(window=2)[0]["decisions"] == 1
+        metrics.close()
+
+def test_expired_minutes_are_dropped_and_filters_apply():
+    clock = Clock(START + 10)
+    with mock.patch.object(character_metrics.time, 'time', clock):
+        metrics = CharacterMetrics(flush_interval=0)
+        metrics.record("dune", "Paul", True, 10.0)
+        metrics.record("gloomhaven", "Brute", True, 10.0)
+        metrics.flush(force=True)
+
+        assert [r["character"] for r in metrics.query(game_type="gloomhaven")] == ["Brute"]
+        assert metrics.query(character_name="Nobody") == []
+
+        clock.now = START + 25 * HOUR
+        metrics.record("dune", "Paul", True, 10.0)
+        metrics.flush(force=True)
+        minute_rows = metrics._conn.execute(
+            "SELECT COUNT(*) FROM rollups WHERE resolution = ?", (MINUTE,)
+        ).fetchone()[0]
+        assert minute_rows == 1
+        assert metrics.query(resolution="hour", window=26, game_type="dune")[0]["decisions"] == 2
+        metrics.close()
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
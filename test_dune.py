@@ -0,0 +1,102 @@
+import hashlib
+import json
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from games.dune import Dune, SECTOR_TERRITORIES, TERRITORIES
+
+PLAYERS = [{"name": f"Player{idx}"} for idx in range(6)]
+
+# Digests of _trace from the engine as it was before action families and
+# before territories were indexed by sector and forces by player, when
+# actions were listed one by one and every lookup scanned the board.
+# Actions, results and states must still match turn for turn.
+SCANNING_ENGINE_TRACES = {
+    0: "cf51c39e84d8a2c7",
+    1: "a1a5d4f83de745f7",
+    2: "7c76c194b17be35f",
+    3: "2cd3a8909239ab0d",
+    4: "fdb0c769d11b129c",
+    5: "6eaa01628ab4ca92"
+}
+
+def _new_game(seed):
+    game = Dune(seed=seed)
+    game.setup_game(PLAYERS)
+    # Spice on every territory, so collection has options to offer.
+    for territory in game.board["territories"].values():
+        territory["spice"] = 4
+    return game
+
+def _trace(seed, turns=180, check=None):
+    game, agent = _new_game(seed), random.Random(seed)
+    digest = hashlib.sha256()
+    for _ in range(turns):
+        player_id = game.current_turn % len(PLAYERS)
+        actions = game.get_available_actions(player_id)
+        digest.update(json.dumps([actions, game.get_game_state()], sort_keys=True, default=str).encode())
+        if actions:
+            result = game.execute_action(player_id, agent.choice(actions))
+            digest.update(json.dumps(result, sort_keys=True, default=str).encode())
+        game.advance_turn()
+        if check:
+            check(game)
+    return digest.hexdigest()[:16]
+
+def _check_stacks(game):
+    # The index holds exactly the board's occupant entries, as the same objects.
+    for player_id, stacks in enumerate(game.stacks):
+        on_board = {
+            territory: occupant for territory, data in game.board["territories"].items()
+            for occupant in data["occupants"] if occupant["player_id"] == player_id
+        }
+        assert stacks.keys() == on_board.keys()
+        assert all(stacks[territory] is occupant for territory, occupant in on_board.items())
+
+def test_sectors_cover_every_territory():
+    listed = [(sector, territory) for sector, territories in SECTOR_TERRITORIES.items() for territory in territories]
+    assert sorted(listed) == sorted((sector, name) for name, data in TERRITORIES.items() for sector in data["sectors"])
+
+def test_seeded_games_match_the_scanning_engine():
+    for seed, digest in SCANNING_ENGINE_TRACES.items():
+        assert _trace(seed) == digest, seed
+
+def test_force_index_tracks_the_board():
+    for seed in range(10):
+        _trace(seed, check=_check_stacks)
+
+def _check_families(game):
+    for player_id in range(len(PLAYERS)):
+        families = game.action_families(player_id)
+        expanded = [list(family.expand()) for family in families]
+        assert [action for actions in expanded for action in actions] == game.get_available_actions(player_id)
+        for family, actions in zip(families, expanded):
+            assert len(family) == len(actions)
+            assert all(action["type"] == family.action_type for action in actions)
+            assert list(family.expand(len(actions) // 2)) == actions[len(actions) // 2:]
+
+def test_families_expand_to_the_legal_actions():
+    for seed in range(4):
+        _trace(seed, turns=90, check=_check_families)
+
+def test_the_storm_clears_the_sector_it_stops_on():
+    game = _new_game(1)
+    for territory in TERRITORIES:
+        game._add_forces(0, territory, 2)
+    reserve = game.players[0]["forces_reserve"]
+
+    game.advance_storm()
+    caught = SECTOR_TERRITORIES.get(game.storm_position, [])
+    assert all(not game.board["territories"][territory]["occupants"] for territory in caught)
+    assert not set(caught) & set(game.stacks[0])
+    assert game.players[0]["forces_reserve"] > reserve or not caught
+    _check_stacks(game)
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
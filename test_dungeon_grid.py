@@ -0,0 +1,164 @@
+import copy
+import pickle
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from games.dungeon_grid import DungeonGrid, TERRAIN, KING_MOVES, MOVE_COST, TERRAIN_CODE
+from games.dungeons_dragons import DungeonsAndDragons, FEET_PER_SQUARE
+from games.pathfinding import reachable
+
+def _random_grid(rng, size=16):
+    grid = DungeonGrid(size, size)
+    for x in range(size):
+        for y in range(size):
+            grid.set_terrain(x, y, rng.choice(["stone_floor"] * 5 + ["wall", "rubble", "door"]))
+    for occupant in range(4):
+        grid.set_occupant(rng.randrange(size), rng.randrange(size), occupant)
+    return grid
+
+def _random_write(rng, grid):
+    x, y = rng.randrange(grid.width), rng.randrange(grid.height)
+    kind = rng.randrange(4)
+    if kind == 0:
+        grid.set_terrain(x, y, rng.choice(TERRAIN))
+    elif kind == 1:
+        grid.fill_terrain(x, y, x + rng.randrange(1, 4), y + rng.randrange(1, 4), rng.choice(TERRAIN))
+    elif kind == 2:
+        grid.set_occupant(x, y, rng.choice([None, 1, 2]))
+    else:
+        grid.add_item(x, y, {"name": f"item{rng.randrange(100)}"})
+
+def test_live_view_tracks_writes():
+    rng = random.Random(1)
+    grid = _random_grid(rng)
+    for _ in range(300):
+        region = (rng.randrange(-2, 10), rng.randrange(-2, 10), rng.randrange(1, 10), rng.randrange(1, 10))
+        grid.live_view(*region)
+        for _ in range(rng.randrange(4)):
+            _random_write(rng, grid)
+        assert grid.live_view(*region) == grid.view(*region)
+
+def test_held_views_never_change():
+    rng = random.Random(2)
+    grid = _random_grid(rng)
+    held = []
+    for _ in range(200):
+        view = grid.live_view(2, 3, 8, 8)
+        held.append((view, copy.deepcopy(view)))
+        _random_write(rng, grid)
+    assert all(view == snapshot for view, snapshot in held)
+
+def test_untouched_regions_are_shared():
+    grid = DungeonGrid(10, 10)
+    first = grid.live_view(0, 0, 4, 4)
+    grid.set_terrain(8, 8, "wall")
+    assert grid.live_view(0, 0, 4, 4) is first
+
+    grid.set_occupant(1, 2, 7)
+    second = grid.live_view(0, 0, 4, 4)
+    assert second is not first and second[1][2]["occupant"] == 7
+    assert second[0] is first[0] and second[1][1] is first[1][1]
+    assert first[1][2]["occupant"] is None
+
+def test_pickled_grids_drop_the_live_view():
+    grid = DungeonGrid(6, 6)
+    grid.live_view(0, 0, 3, 3)
+    restored = pickle.loads(pickle.dumps(grid))
+    assert restored._live is None
+    assert restored.live_view(0, 0, 3, 3) == grid.view(0, 0, 3, 3)
+
+def _steps(grid, pass_occupied=False):
+    # The grid's movement rules, one cell at a time, for the generic search.
+    def steps(node):
+        x, y = node
+        for dx, dy in KING_MOVES:
+            nx, ny = x + dx, y + dy
+            if grid.in_bounds(nx, ny) and (pass_occupied or grid.occupant_at(nx, ny) is None):
+                cost = int(MOVE_COST[TERRAIN_CODE[grid.terrain_at(nx, ny)]])
+                if cost:
+                    yield (nx, ny), cost
+    return steps
+
+def test_distance_map_matches_search():
+    rng = random.Random(3)
+    for _ in range(40):
+        grid = _random_grid(rng)
+        origin = (rng.randrange(grid.width), rng.randrange(grid.height))
+        budget = rng.randrange(1, 9)
+        reached = reachable(origin, budget, _steps(grid))
+        expected = {node: cost for node, (cost, _) in reached.items() if node != origin}
+        assert grid.movement_costs(origin, budget) == dict(sorted(expected.items()))
+
+def test_traced_paths_cost_what_the_map_says():
+    rng = random.Random(4)
+    for _ in range(40):
+        grid = _random_grid(rng)
+        origin = (rng.randrange(grid.width), rng.randrange(grid.height))
+        window, distance = grid.distance_map(origin, 6)
+        for goal, cost in grid.stops(window, distance).items():
+            path = grid.trace_path(window, distance, goal)
+            assert path[0] == origin and path[-1] == goal
+            assert all(max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1 for a, b in zip(path, path[1:]))
+            assert sum(int(MOVE_COST[grid.terrain[x, y]]) for x, y in path[1:]) == cost
+
+def test_party_moves_match_the_search():
+    # One movement action reaches what one-square steps chained up to the
+    # character's speed would, walking through allies but not stopping on them.
+    rng = random.Random(5)
+    for seed in range(10):
+        game = DungeonsAndDragons(seed=seed)
+        game.setup_game([{"name": f"Player{idx}"} for idx in range(6)])
+        for x in range(12):
+            for y in range(12):
+                if game.grid.occupant_at(x, y) is None:
+                    game.grid.set_terrain(x, y, rng.choice(["stone_floor"] * 4 + ["wall", "rubble"]))
+
+        for _ in range(10):
+            player = rng.choice(game.players[1:])
+            origin = tuple(player["position"])
+            reached = reachable(origin, player["speed"] // FEET_PER_SQUARE, _steps(game.grid, pass_occupied=True))
+            expected = {node: cost for node, (cost, _) in reached.items()
+                        if node != origin and game.grid.occupant_at(*node) is None}
+
+            moves = [a for a in game.get_available_actions(player["id"]) if a["type"] == "movement"]
+            assert {tuple(move["destination"]): move["squares"] for move in moves} == expected
+            if not moves:
+                continue
+
+            move = rng.choice(moves)
+            result = game.execute_action(player["id"], move)
+            path = result["path"]
+            assert path[0] == origin and path[-1] == tuple(move["destination"])
+            assert all(max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1 for a, b in zip(path, path[1:]))
+            assert sum(int(MOVE_COST[game.grid.terrain[x, y]]) for x, y in path[1:]) == result["squares"]
+            assert game.grid.occupant_at(*move["destination"]) == player["id"]
+            assert game.grid.occupant_at(*origin) is None
+
+def test_walls_block_sight_but_are_seen():
+    grid = DungeonGrid(9, 9)
+    grid.fill_terrain(4, 0, 5, 9, "wall")
+    window, visible = grid.line_of_sight((2, 4), 6)
+    seen = set(grid.cells(window, visible))
+    assert (4, 4) in seen and (6, 4) not in seen and (3, 8) in seen
+
+def test_areas_of_effect():
+    grid = DungeonGrid(21, 21)
+    for occupant, cell in enumerate([(10, 12), (10, 17), (13, 10)]):
+        grid.set_occupant(*cell, occupant)
+
+    window, cube = grid.area_of_effect("cube", (10, 10), 2)
+    assert len(grid.cells(window, cube)) == 25
+    window, line = grid.area_of_effect("line", (10, 10), 5, (0, 1))
+    assert grid.cells(window, line) == [(10, 11 + step) for step in range(5)]
+    assert grid.occupants_in(window, line) == [0]
+    window, sphere = grid.area_of_effect("sphere", (10, 10), 3)
+    assert grid.occupants_in(window, sphere) == [0, 2]
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,52 @@
+import json
+import tempfile
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from ai.embedding_store import EmbeddingStore, INDEX_FILE, MODELS_FILE
+
+def test_readers_see_writes_from_other_stores():
+    directory = tempfile.mkdtemp()
+    writer, reader = EmbeddingStore(directory, 4), EmbeddingStore(directory, 4)
+    assert reader.get("dune_Paul") is None
+
+    writer.put("dune_Paul", np.arange(4), {"traits": ["calm"]})
+    vector, model = reader.get("dune_Paul")
+    assert list(vector) == [0, 1, 2, 3] and model == {"traits": ["calm"]}
+    assert not os.path.exists(os.path.join(directory, MODELS_FILE))
+
+def test_replaced_index_is_noticed_with_the_same_mtime():
+    directory = tempfile.mkdtemp()
+    writer, reader = EmbeddingStore(directory, 2), EmbeddingStore(directory, 2)
+    writer.put("dune_Paul", np.ones(2), {"version": 1})
+    assert reader.get("dune_Paul")[1] == {"version": 1}
+
+    index_path = os.path.join(directory, INDEX_FILE)
+    before = os.stat(index_path)
+    writer.put("dune_Paul", np.ones(2), {"version": 2})
+    os.utime(index_path, ns=(before.st_atime_ns, before.st_mtime_ns))
+    assert reader.get("dune_Paul")[1] == {"version": 2}
+
+def test_stores_with_a_separate_models_file_still_load():
+    directory = tempfile.mkdtemp()
+    np.ones(3, dtype=np.float32).tofile(os.path.join(directory, "embeddings.f32"))
+    with open(os.path.join(directory, INDEX_FILE), "w") as f:
+        json.dump({"dim": 3, "rows": {"dune_Leto": 0}}, f)
+    with open(os.path.join(directory, MODELS_FILE), "w") as f:
+        json.dump({"dune_Leto": {"traits": ["noble"]}}, f)
+
+    store = EmbeddingStore(directory, 3)
+    assert store.get("dune_Leto")[1] == {"traits": ["noble"]}
+    store.put("dune_Jessica", np.zeros(3), {})
+    assert sorted(store.keys()) == ["dune_Jessica", "dune_Leto"]
+    assert store.get("dune_Leto")[1] == {"traits": ["noble"]}
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
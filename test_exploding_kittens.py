@@ -0,0 +1,156 @@
+import hashlib
+import json
+import random
+import sys
+import os
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from games.exploding_kittens import (
+    ExplodingKittens, CARDS, CARD_KIND, DEFUSE, EXPLODING, FIRST_CAT, NUM_KINDS, NUM_PLAYERS
+)
+
+PLAYERS = [{"name": f"Player{idx}"} for idx in range(NUM_PLAYERS)]
+
+# Final-state digests of seeded random games played by the engine as it was
+# when cards were dicts (seeding the global random module); the integer-coded
+# engine must keep dealing and playing exactly these games.
+DICT_ENGINE_GAMES = {
+    0: "66261094157c6671",
+    1: "2e12e52768eef9cf",
+    2: "e358b1c790cdd0d3",
+    3: "b3ac40d25a108ffb",
+    4: "e8fdbdc9f224e682"
+}
+
+def _new_game(seed):
+    game = ExplodingKittens(seed=seed)
+    game.setup_game(PLAYERS)
+    return game
+
+def _all_cards(game):
+    cards = list(game.deck) + list(game.discard_pile)
+    for hand in game.hands:
+        cards.extend(hand)
+    return cards
+
+def _check_invariants(game):
+    # Every card is in exactly one place, except the kittens that blew a
+    # player up, and the per-kind counts match the hands.
+    cards = _all_cards(game)
+    assert len(cards) == len(set(cards))
+    missing = set(range(len(CARDS))) - set(cards)
+    assert len(missing) == len(game.exploded_players)
+    assert all(CARD_KIND[code] == EXPLODING for code in missing)
+    for hand, counts in zip(game.hands, game.kind_counts):
+        assert counts == [Counter(CARD_KIND[code] for code in hand)[kind] for kind in range(NUM_KINDS)]
+
+def _play_moves(seed, turns=200):
+    game, agent = _new_game(seed), random.Random(seed)
+    for _ in range(turns):
+        if game.is_game_over():
+            break
+        player_id = game.current_turn % NUM_PLAYERS
+        moves = game.legal_moves(player_id)
+        if moves:
+            assert game.apply_move(player_id, agent.choice(moves))["success"]
+        game.advance_turn()
+        _check_invariants(game)
+    return game
+
+def _play_actions(seed, turns=200):
+    game, agent = _new_game(seed), random.Random(seed)
+    for _ in range(turns):
+        if game.get_game_state()["game_over"]:
+            break
+        player_id = game.current_turn % NUM_PLAYERS
+        actions = game.get_available_actions(player_id)
+        if actions:
+            game.execute_action(player_id, agent.choice(actions))
+        game.advance_turn()
+    return game
+
+def test_setup_deals_seven_cards_and_a_defuse():
+    game = _new_game(1)
+    _check_invariants(game)
+    for hand, counts in zip(game.hands, game.kind_counts):
+        assert len(hand) == 8 and counts[DEFUSE] >= 1 and counts[EXPLODING] == 0
+    assert sum(CARD_KIND[code] == EXPLODING for code in game.deck) == NUM_PLAYERS - 1
+
+def test_moves_and_actions_correspond():
+    for seed in range(20):
+        game, agent = _new_game(seed), random.Random(seed)
+        for _ in range(60):
+            if game.is_game_over():
+                break
+            player_id = game.current_turn % NUM_PLAYERS
+            moves = game.legal_moves(player_id)
+            actions = game.get_available_actions(player_id)
+            assert [game.move_to_action(player_id, move) for move in moves] == actions
+            assert len({action["id"] for action in actions}) == len(actions)
+            game.apply_move(player_id, agent.choice(moves))
+            game.advance_turn()
+
+def test_compact_and_dict_paths_play_the_same_game():
+    for seed in range(30):
+        compact = _play_moves(seed)
+        full = _play_actions(seed)
+        assert json.dumps(compact.get_game_state()) == json.dumps(full.get_game_state())
+        assert list(compact.deck) == list(full.deck)
+
+def test_seeded_games_match_the_dict_engine():
+    for seed, digest in DICT_ENGINE_GAMES.items():
+        state = json.dumps(_play_actions(seed).get_game_state(), sort_keys=True)
+        assert hashlib.sha256(state.encode()).hexdigest()[:16] == digest, seed
+
+def test_pairs_are_offered_only_with_two_of_a_kind():
+    game = _new_game(3)
+    for player_id, counts in enumerate(game.kind_counts):
+        offered = {action["cards"][0]["subtype"] for action in game.get_available_actions(player_id)
+                   if action["type"] == "play_pair"}
+        expected = {CARDS[code]["subtype"] for code in game.hands[player_id]
+                    if CARD_KIND[code] >= FIRST_CAT and counts[CARD_KIND[code]] >= 2}
+        assert offered == expected
+
+def test_defuse_puts_the_kitten_back():
+    game = _new_game(4)
+    kitten = next(code for code in game.deck if CARD_KIND[code] == EXPLODING)
+    game.deck.remove(kitten)
+    game.deck.append(kitten)
+    defuses = game.kind_counts[0][DEFUSE]
+
+    result = game.execute_action(0, {"type": "draw"})
+    assert result["defused"] and not result["exploded"]
+    assert game.kind_counts[0][DEFUSE] == defuses - 1
+    assert kitten in game.deck and game.players[0]["alive"]
+    _check_invariants(game)
+
+def test_exploding_without_defuse_eliminates():
+    game = _new_game(5)
+    for code in [code for code in game.hands[0] if CARD_KIND[code] == DEFUSE]:
+        game._remove_from_hand(0, code)
+        game.discard_pile.append(code)
+    kitten = next(code for code in game.deck if CARD_KIND[code] == EXPLODING)
+    game.deck.remove(kitten)
+    game.deck.append(kitten)
+
+    assert game.execute_action(0, {"type": "draw"})["exploded"]
+    assert not game.players[0]["alive"]
+    assert game.legal_moves(0) == []
+    assert game.execute_action(0, {"type": "draw"}) == {"success": False, "error": "Player is eliminated"}
+
+def test_cards_not_in_hand_are_rejected():
+    game = _new_game(6)
+    missing = next(card for code, card in enumerate(CARDS) if code not in game.hands[0])
+    before = json.dumps(game.get_game_state())
+    result = game.execute_action(0, {"type": "play_card", "card": missing})
+    assert result == {"success": False, "error": "Card not in hand"}
+    assert game.execute_action(0, {"type": "play_card", "card": {"id": "nonexistent"}})["success"] is False
+    assert json.dumps(game.get_game_state()) == before
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
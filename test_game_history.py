@@ -0,0 +1,125 @@
+import copy
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database.state_diff import diff_states, apply_diff
+from database.game_state import GameStateDatabase, KEYFRAME, DELTA
+
+def _random_value(rng, depth=0):
+    kind = rng.randrange(6 if depth < 3 else 3)
+    if kind == 0:
+        return rng.randrange(100)
+    if kind == 1:
+        return rng.choice(["a", "b", "c", None, True])
+    if kind == 2:
+        return rng.random()
+    if kind == 3:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randrange(6))]
+    return {rng.choice("pqrstu"): _random_value(rng, depth + 1) for _ in range(rng.randrange(5))}
+
+def _mutate(rng, value, depth=0):
+    if isinstance(value, dict) and value and rng.random() < 0.8:
+        key = rng.choice(list(value))
+        roll = rng.random()
+        if roll < 0.2:
+            del value[key]
+        elif roll < 0.4:
+            value[rng.choice("vwxyz")] = _random_value(rng, depth + 1)
+        else:
+            value[key] = _mutate(rng, value[key], depth + 1)
+        return value
+    if isinstance(value, list) and value and rng.random() < 0.8:
+        roll = rng.random()
+        if roll < 0.2:
+            del value[rng.randrange(len(value)):]
+        elif roll < 0.4:
+            value.extend(_random_value(rng, depth + 1) for _ in range(rng.randrange(1, 4)))
+        elif roll < 0.5:
+            rng.shuffle(value)
+        else:
+            i = rng.randrange(len(value))
+            value[i] = _mutate(rng, value[i], depth + 1)
+        return value
+    return _random_value(rng, depth)
+
+def test_diff_round_trips():
+    rng = random.Random(7)
+    for _ in range(2000):
+        old = _random_value(rng)
+        new = _mutate(rng, copy.deepcopy(old))
+        ops = diff_states(old, new)
+        assert apply_diff(copy.deepcopy(old), ops) == new
+        assert diff_states(new, new) == []
+
+def test_applied_values_do_not_alias_the_diff():
+    old = {"players": [{"hand": [1]}]}
+    new = {"players": [{"hand": [1]}, {"hand": [2, 3]}]}
+    ops = diff_states(old, new)
+    state = apply_diff(copy.deepcopy(old), ops)
+    state["players"][1]["hand"].append(4)
+    assert apply_diff(copy.deepcopy(old), ops) == new
+
+def _play(db, games, saves, seed):
+    rng = random.Random(seed)
+    expected = {}
+    for _ in range(saves):
+        game_id = f"game_{rng.randrange(games)}"
+        states = expected.setdefault(game_id, [{"turn": 0, "log": [], "board": {}}])
+        state = copy.deepcopy(states[-1])
+        state["turn"] += 1
+        state["log"].append(rng.randrange(10))
+        state["board"][str(rng.randrange(8))] = rng.randrange(100)
+        db.save_game_state(game_id, "test", state)
+        states.append(state)
+    return {game_id: states[1:] for game_id, states in expected.items()}
+
+def test_history_reconstructs_every_saved_state():
+    db = GameStateDatabase(keyframe_interval=5)
+    expected = _play(db, games=3, saves=120, seed=1)
+
+    for game_id, states in expected.items():
+        assert [entry["state"] for entry in db.get_game_history(game_id)] == states
+        for seq, state in enumerate(states):
+            assert db.get_state_at(game_id, seq) == state
+        assert db.load_game_state(game_id) == states[-1]
+
+        stats = db.history_storage_stats(game_id)
+        assert stats["entries"] == len(states)
+        assert stats["keyframes"] == (len(states) + 4) // 5
+    db.close()
+
+def test_later_mutation_does_not_leak_into_history():
+    db = GameStateDatabase()
+    state = {"turn": 1, "hand": [1, 2]}
+    db.save_game_state("g", "test", state)
+    state["hand"].append(3)
+    state["turn"] = 2
+    db.save_game_state("g", "test", state)
+
+    history = [entry["state"] for entry in db.get_game_history("g")]
+    assert history == [{"turn": 1, "hand": [1, 2]}, {"turn": 2, "hand": [1, 2, 3]}]
+    db.close()
+
+def test_last_state_cache_is_bounded():
+    db = GameStateDatabase(keyframe_interval=50, cached_states=2)
+    expected = _play(db, games=6, saves=200, seed=2)
+
+    assert len(db._last_states) <= 2
+    for game_id, states in expected.items():
+        rows = db._conn.execute(
+            "SELECT kind FROM history WHERE game_id = ? ORDER BY seq", (game_id,)
+        ).fetchall()
+        # Evicted games are diffed against their rebuilt state, not re-keyframed.
+        assert [kind for kind, in rows[1:]] == [DELTA] * (len(rows) - 1)
+        assert rows[0][0] == KEYFRAME
+        assert [entry["state"] for entry in db.get_game_history(game_id)] == states
+    db.close()
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,180 @@
+import copy
+import random
+import sys
+import os
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+import numpy as np
+
+from games.gloomhaven import Gloomhaven, _monster_stats, _move_value, scenario_board
+from games.hex_board import HEX_DIRECTIONS, UNREACHABLE, HexBoard, hex_room
+
+CLASSES = ["brute", "tinkerer", "spellweaver", "scoundrel"]
+PLAYERS = [{"name": f"Player{idx}", "class": char_class} for idx, char_class in enumerate(CLASSES)]
+
+def _new_game(seed, scatter=True):
+    game = Gloomhaven(seed=seed)
+    game.setup_game(PLAYERS)
+    if scatter:
+        # Spread everyone over the map so focus and movement see varied boards.
+        rng = random.Random(seed)
+        spots = rng.sample(game._board().hexes, len(game.players) + len(game.monsters))
+        for figure, hex_ in zip(game.players + game.monsters, spots):
+            figure["position"] = hex_
+    return game
+
+def _bfs(board, start, blocked):
+    # Plain breadth-first search over the map's hexes, one hex at a time.
+    steps = {start: 0}
+    queue = deque([start])
+    while queue:
+        q, r = queue.popleft()
+        for dq, dr in HEX_DIRECTIONS:
+            neighbour = (q + dq, r + dr)
+            if neighbour in board.index and neighbour not in blocked and neighbour not in steps:
+                steps[neighbour] = steps[(q, r)] + 1
+                queue.append(neighbour)
+    return steps
+
+def _hex_distance(a, b):
+    dq, dr = a[0] - b[0], a[1] - b[1]
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+def test_tables_match_the_coordinates():
+    board = HexBoard(hex_room(0, 0, 5, 4) + hex_room(6, 0, 3, 3))
+    for i, hex_ in enumerate(board.hexes):
+        expected = {(hex_[0] + dq, hex_[1] + dr) for dq, dr in HEX_DIRECTIONS} & set(board.hexes)
+        assert set(board.adjacent[i]) == expected
+        assert [board.distance[i, board.index[other]] for other in board.hexes] == \
+               [_hex_distance(hex_, other) for other in board.hexes]
+    assert (board.line_of_sight == board.line_of_sight.T).all() and board.line_of_sight.diagonal().all()
+
+def test_distance_fields_match_one_search_per_source():
+    board = scenario_board(1)
+    rng = random.Random(1)
+    for _ in range(30):
+        blocked = set(rng.sample(board.hexes, rng.randrange(8)))
+        sources = [rng.sample(board.hexes, rng.randrange(1, 4)) for _ in range(3)]
+        rows = np.zeros((len(sources), len(board.hexes)), dtype=bool)
+        for row, hexes in enumerate(sources):
+            rows[row, [board.index[hex_] for hex_ in hexes]] = True
+        mask = np.zeros(len(board.hexes), dtype=bool)
+        mask[[board.index[hex_] for hex_ in blocked]] = True
+
+        fields = board.distance_fields(rows, mask)
+        for row, hexes in enumerate(sources):
+            for hex_ in board.hexes:
+                if hex_ in blocked:
+                    continue
+                reached = _bfs(board, hex_, blocked)
+                expected = min((reached[s] for s in hexes if s in reached), default=UNREACHABLE)
+                assert fields[row, board.index[hex_]] == expected
+
+def _reference_focus(game, monster):
+    # Focus the way a single monster would pick it on its own: search from
+    # its hex to every hex each character can be attacked from.
+    board = game._board()
+    targets = [p for p in game.players if p["current_hp"] > 0]
+    blocked = {tuple(p["position"]) for p in targets}
+    attack_range = max(_monster_stats(monster["type"], monster["level"])["range"], 1)
+    reached = _bfs(board, tuple(monster["position"]), blocked)
+
+    options = []
+    for order, target in enumerate(targets):
+        position = tuple(target["position"])
+        attack_from = [
+            hex_ for hex_ in board.hexes
+            if 1 <= _hex_distance(hex_, position) <= attack_range and
+            board.line_of_sight[board.index[position], board.index[hex_]]
+        ]
+        moves = min((reached[hex_] for hex_ in attack_from if hex_ in reached), default=UNREACHABLE)
+        options.append((moves, _hex_distance(tuple(monster["position"]), position), order, target["id"]))
+
+    moves, _, _, target_id = min(options)
+    return None if moves >= UNREACHABLE else target_id
+
+def _check_monster_phase(game):
+    expected = {monster["id"]: _reference_focus(game, monster) for monster in game.monsters if monster["current_hp"] > 0}
+    before = copy.deepcopy(game)
+    actions = game._monster_phase()
+
+    # Living characters block monsters; the fallen no longer do.
+    characters = {tuple(p["position"]) for p in before.players if p["current_hp"] > 0}
+    assert sorted(action["monster_id"] for action in actions) == sorted(expected)
+    for action in actions:
+        assert action.get("focus") == expected[action["monster_id"]]
+        if action["action"] == "idle":
+            continue
+        path = action["path"]
+        monster = before.monsters[action["monster_id"]]
+        stats = _monster_stats(monster["type"], monster["level"])
+        assert path[0] == tuple(monster["position"]) and len(path) <= stats["move"] + 1
+        assert all(_hex_distance(a, b) == 1 for a, b in zip(path, path[1:]))
+        assert not set(path) & characters
+
+def test_monster_focus_matches_a_search_per_monster():
+    for seed in range(40):
+        _check_monster_phase(_new_game(seed))
+
+def test_played_games_keep_the_focus_rules():
+    for seed in range(10):
+        game, agent = _new_game(seed, scatter=False), random.Random(seed)
+        for _ in range(24):
+            player_id = game.current_turn % len(PLAYERS)
+            actions = game.get_available_actions(player_id)
+            if actions:
+                game.execute_action(player_id, agent.choice(actions))
+            if (game.current_turn + 1) % len(PLAYERS) == 0:
+                _check_monster_phase(copy.deepcopy(game))
+            game.advance_turn()
+
+def test_card_moves_reach_what_a_search_reaches():
+    for seed in range(20):
+        game = _new_game(seed)
+        board = game._board()
+        for player in game.players:
+            start = tuple(player["position"])
+            enemies = {tuple(m["position"]) for m in game.monsters if m["current_hp"] > 0}
+            taken = enemies | {tuple(p["position"]) for p in game.players if p is not player}
+            reached = _bfs(board, start, enemies)
+
+            for action in game.get_available_actions(player["id"]):
+                if action["type"] != "play_card" or not _move_value(action["action"]):
+                    continue
+                move = _move_value(action["action"])
+                destination = tuple(action.get("destination", start))
+                assert destination == start or (0 < reached[destination] <= move and destination not in taken)
+
+            offered = {
+                (action["card_id"], action["half"], tuple(action.get("destination", start)))
+                for action in game.get_available_actions(player["id"]) if action["type"] == "play_card"
+            }
+            for card in player["hand"]:
+                for half in ("top", "bottom"):
+                    move = _move_value(card[half])
+                    expected = {start} | {hex_ for hex_, steps in reached.items()
+                                          if 0 < steps <= move and hex_ not in taken}
+                    assert {d for c, h, d in offered if (c, h) == (card["id"], half)} == expected
+
+def test_executed_moves_follow_a_path():
+    for seed in range(20):
+        game = _new_game(seed)
+        moves = [a for a in game.get_available_actions(0) if "destination" in a]
+        if not moves:
+            continue
+        action = random.Random(seed).choice(moves)
+        start = tuple(game.players[0]["position"])
+        result = game.execute_action(0, action)
+        path = result["moved"]["path"]
+        assert path[0] == start and path[-1] == tuple(action["destination"])
+        assert all(_hex_distance(a, b) == 1 for a, b in zip(path, path[1:]))
+        assert len(path) - 1 <= _move_value(action["action"])
+        assert game.players[0]["position"] == tuple(action["destination"])
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import threading
+import time
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database.hibernation import HibernatingStore
+
+def _store(**kwargs):
+    return HibernatingStore(tempfile.mkdtemp(), sweep_interval=0, **kwargs)
+
+class SlowPickle:
+    # Blocks while being pickled until the test lets it go.
+    def __init__(self):
+        self.started, self.release = threading.Event(), threading.Event()
+
+    def __getstate__(self):
+        self.started.set()
+        self.release.wait(5)
+        return {}
+
+    def __setstate__(self, state):
+        self.started, self.release = threading.Event(), threading.Event()
+
+def test_least_recently_used_games_are_evicted():
+    store = _store(max_resident=2)
+    for key in "abc":
+        store[key] = {"game": key}
+    assert store.stats()["resident"] == 2 and store.stats()["hibernated"] == 1
+    assert os.path.exists(store._path("a"))
+
+    # Reading b makes c the oldest resident entry.
+    assert store["b"] == {"game": "b"}
+    assert store["a"] == {"game": "a"}
+    assert set(store._resident) == {"a", "b"} and store._hibernated == {"c"}
+    assert sorted(store) == ["a", "b", "c"] and len(store) == 3
+
+def test_idle_games_are_swept():
+    store = _store(idle_ttl=0.05)
+    store["old"], store["new"] = 1, 2
+    time.sleep(0.1)
+    assert store["new"] == 2
+    assert store.sweep() == 1
+    assert store._hibernated == {"old"} and "old" in store
+    assert store.stats()["hibernations"] == 1
+
+def test_rehydrated_games_round_trip():
+    directory = tempfile.mkdtemp()
+    store = HibernatingStore(directory, sweep_interval=0)
+    game = {"players": [{"name": "Paul", "spice": 5}], "turn": 3}
+    store["game/1"] = game
+    store.hibernate_all()
+    assert store._resident == {} and os.listdir(directory) == [os.path.basename(store._path("game/1"))]
+
+    # A new process finds hibernated games on disk.
+    reopened = HibernatingStore(directory, sweep_interval=0)
+    assert "game/1" in reopened and reopened["game/1"] == game
+    assert os.listdir(directory) == []
+    assert reopened.stats()["rehydrations"] == 1
+
+    reopened.hibernate_all()
+    reopened["game/1"] = {"turn": 0}
+    assert os.listdir(directory) == [] and reopened["game/1"] == {"turn": 0}
+    del reopened["game/1"]
+    assert "game/1" not in reopened
+
+def test_pinned_games_stay_resident():
+    store = _store(max_resident=1, idle_ttl=0)
+    store["a"] = "a"
+    with store.pinned("a"):
+        store["b"] = "b"
+        assert store.sweep() == 1
+        store.hibernate_all()
+        assert set(store._resident) == {"a"}
+    store.hibernate_all()
+    assert store._resident == {} and store._hibernated == {"a", "b"}
+
+def test_other_games_are_served_while_one_is_pickled():
+    store = _store()
+    slow = store["slow"] = SlowPickle()
+    store["fast"] = "fast"
+    worker = threading.Thread(target=store._hibernate, args=("slow",))
+    worker.start()
+    assert slow.started.wait(5)
+
+    assert store["fast"] == "fast" and "slow" in store and len(store) == 2
+    store["other"] = "other"
+
+    # A lookup of the game being written waits for it, then loads it back.
+    loaded = []
+    reader = threading.Thread(target=lambda: loaded.append(store["slow"]))
+    reader.start()
+    time.sleep(0.05)
+    assert not loaded
+    slow.release.set()
+    worker.join(5)
+    reader.join(5)
+    assert isinstance(loaded[0], SlowPickle) and loaded[0] is not slow
+    assert store.stats()["hibernations"] == 1 and store.stats()["rehydrations"] == 1
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
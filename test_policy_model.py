@@ -0,0 +1,99 @@
+import asyncio
+import json
+import random
+import tempfile
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from ai.nano_banana_pro import NanoBananaPro
+from ai.policy_model import PolicyModel
+from ai.policy_trainer import PolicyTrainer, build_decision_record, load_decisions, MANIFEST_FILE
+from database.game_state import GameStateDatabase
+
+ACTIONS = [
+    {"id": "attack_north", "type": "attack", "description": "Attack the northern stronghold", "cost": 2},
+    {"id": "build_wall", "type": "build", "description": "Build a wall", "cost": 5},
+    {"id": "draw", "type": "draw", "description": "Draw a card"},
+    {"id": "pass", "type": "pass", "description": "Pass turn"}
+]
+
+def _log_games(db, decisions=60, seed=1):
+    # A character who always attacks, whatever else is on offer.
+    rng = random.Random(seed)
+    db.start_action_log("g1", "dune", seed, [], 1)
+    for turn in range(decisions):
+        offered = [ACTIONS[0]] + rng.sample(ACTIONS[1:], rng.randrange(1, len(ACTIONS)))
+        rng.shuffle(offered)
+        state = {"turn": turn, "phase": "main"}
+        db.record_action("g1", 0, ACTIONS[0], build_decision_record("Paul", state, offered, ACTIONS[0]))
+
+def _train(output_dir):
+    db = GameStateDatabase()
+    _log_games(db)
+    export_path = os.path.join(output_dir, "decisions.json")
+    with open(export_path, "w") as f:
+        f.write(db.export_decisions())
+    db.close()
+    return PolicyTrainer(min_examples=20).train_all(load_decisions(export_path), output_dir)
+
+def test_decisions_export_and_filter():
+    db = GameStateDatabase()
+    _log_games(db, decisions=5)
+    state = {"turn": 0}
+    db.start_action_log("g2", "catan", 1, [], 1)
+    db.record_action("g2", 1, ACTIONS[3], build_decision_record("Bob", state, ACTIONS, ACTIONS[3]))
+
+    exported = json.loads(db.export_decisions())
+    assert [record["game_name"] for record in exported] == ["dune"] * 5 + ["catan"]
+    assert exported[-1]["decision"]["chosen"] == 3
+    assert [record["decision"]["character"] for record in json.loads(db.export_decisions("catan"))] == ["Bob"]
+    db.close()
+
+def test_trained_policy_picks_the_characters_move():
+    output_dir = tempfile.mkdtemp()
+    manifest = _train(output_dir)
+    assert set(manifest) == {"dune", "dune_Paul"}
+    assert manifest["dune_Paul"]["train_accuracy"] == 1.0
+    with open(os.path.join(output_dir, MANIFEST_FILE)) as f:
+        assert json.load(f) == manifest
+
+    nano = NanoBananaPro(output_dir, confidence_threshold=0.6)
+    prediction = asyncio.run(nano.predict_action("Paul", "dune", ACTIONS, {"phase": "main"}))
+    assert prediction["source"] == "policy" and prediction["use_local"]
+    assert prediction["selected_action"]["id"] == "attack_north"
+
+    # Other characters in the same game fall back to the per-game model.
+    prediction = asyncio.run(nano.predict_action("Leto", "dune", ACTIONS[::-1], {"phase": "main"}))
+    assert prediction["source"] == "policy" and prediction["selected_action"]["id"] == "attack_north"
+
+def test_unconfident_policies_fall_through():
+    output_dir = tempfile.mkdtemp()
+    PolicyModel().save(os.path.join(output_dir, "dune.npz"))
+    nano = NanoBananaPro(output_dir, confidence_threshold=0.6)
+
+    prediction = asyncio.run(nano.predict_action("Paul", "dune", ACTIONS, {}))
+    assert prediction["source"] == "default" and prediction["selected_action"] == ACTIONS[0]
+
+    asyncio.run(nano.train_character_personality("Paul", "dune", {"traits": ["aggressive"]}))
+    prediction = asyncio.run(nano.predict_action("Paul", "dune", ACTIONS, {}))
+    assert prediction["source"] == "heuristic" and not prediction["use_local"]
+
+def test_confidence_is_measured_from_the_uniform_baseline():
+    nano = NanoBananaPro(confidence_threshold=0.6)
+    untrained = PolicyModel()
+    for count in (2, 4, 40):
+        actions = [{"id": f"a{idx}", "type": "move", "description": f"Move {idx}"} for idx in range(count)]
+        prediction = nano._predict_with_policy(untrained, actions, {})
+        assert abs(prediction["confidence"]) < 1e-6 and not prediction["use_local"]
+
+    # With nothing to choose between there is nothing to be unsure about.
+    prediction = nano._predict_with_policy(untrained, ACTIONS[:1], {})
+    assert prediction["confidence"] == 1.0 and prediction["use_local"]
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,94 @@
+import asyncio
+import tempfile
+import sys
+import os
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+DATA_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_PATH"] = DATA_DIR
+os.environ["HIBERNATION_PATH"] = os.path.join(DATA_DIR, "hibernated")
+
+import app as server
+from ai.character_lore import get_character_lore
+from ai.enhanced_character_learning import EnhancedCharacterLearning
+from ai.nano_banana_pro import NanoBananaPro, EMBEDDING_DIM
+from ai.profile_bundle import ProfileBundle
+
+def _entry(game_type, character_name, aggression):
+    return {
+        "game_type": game_type,
+        "lore": get_character_lore(game_type, character_name),
+        "profile": {"personality": {"extraversion": aggression}},
+        "embedding": [aggression] * EMBEDDING_DIM,
+        "behavioral_model": {"aggression": aggression}
+    }
+
+def _bundle():
+    return ProfileBundle({"dune_atreides": _entry("dune", "atreides", 0.3)})
+
+def _learning():
+    return EnhancedCharacterLearning("test-key", NanoBananaPro())
+
+def test_bundled_profiles_are_final():
+    learning = _learning()
+    profile = _bundle().hydrate("dune", "atreides", learning)
+    assert profile == {"personality": {"extraversion": 0.3}}
+    assert "dune_atreides" not in learning.provisional_profiles
+    assert learning.nano.behavioral_patterns["dune_atreides"] == {"aggression": 0.3}
+
+def test_nearest_profiles_are_provisional():
+    learning, bundle = _learning(), _bundle()
+    assert bundle.hydrate("dune", "fremen", learning) is None
+    assert bundle.hydrate("dune", "fremen", learning, provisional=True) == {"personality": {"extraversion": 0.3}}
+    assert "dune_fremen" in learning.provisional_profiles
+
+    # A later exact match replaces the stand-in and clears the flag.
+    bundle.profiles["dune_fremen"] = _entry("dune", "fremen", 0.9)
+    bundle.hydrate("dune", "fremen", learning)
+    assert "dune_fremen" not in learning.provisional_profiles
+
+def test_deep_learning_settles_provisional_profiles():
+    learning = _learning()
+    learning.provisional_profiles.add("dune_emperor")
+
+    with mock.patch.object(learning.model, 'generate_content', side_effect=RuntimeError("offline")):
+        asyncio.run(learning.deep_learn_character("dune", "emperor", ["lore"]))
+    assert "dune_emperor" in learning.provisional_profiles
+    assert "dune_emperor" not in learning.character_knowledge
+
+    reply = SimpleNamespace(text='{"extraversion": 0.8}')
+    with mock.patch.object(learning.model, 'generate_content', return_value=reply):
+        profile = asyncio.run(learning.deep_learn_character("dune", "emperor", ["lore"]))
+    assert "dune_emperor" not in learning.provisional_profiles
+    assert learning.character_knowledge["dune_emperor"] == profile
+
+def test_stand_ins_stay_provisional_across_games():
+    learning = _learning()
+    with mock.patch.object(server, 'profile_bundle', None), \
+         mock.patch.object(server, 'enhanced_learning', learning):
+        first, final = server._provisional_profile("dune", "guild")
+        assert not final and "dune_guild" in learning.provisional_profiles
+
+        again, final = server._provisional_profile("dune", "guild")
+        assert again is first and not final
+
+        learning.provisional_profiles.discard("dune_guild")
+        assert server._provisional_profile("dune", "guild") == (first, True)
+
+def test_nearest_bundle_profiles_are_reported_provisional():
+    learning = _learning()
+    with mock.patch.object(server, 'profile_bundle', _bundle()), \
+         mock.patch.object(server, 'enhanced_learning', learning):
+        assert server._provisional_profile("dune", "atreides")[1] is True
+        profile, final = server._provisional_profile("dune", "harkonnen")
+        assert profile == {"personality": {"extraversion": 0.3}} and not final
+        assert server._provisional_profile("dune", "harkonnen") == (profile, False)
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
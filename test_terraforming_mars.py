@@ -0,0 +1,186 @@
+import copy
+import hashlib
+import json
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from games.terraforming_mars import (
+    TerraformingMars, CARD_COPIES, CARD_DATA, CATALOG, CARD_INDEX, TAG_BITS, STANDARD_PROJECTS
+)
+
+PLAYERS = [f"Player{idx}" for idx in range(5)]
+
+# Digests of the state after setup_game, from the engine as it was when
+# hands held card dicts; the catalog engine must keep dealing these hands.
+# Play differs since rules version 2, so only the deal is compared.
+DICT_ENGINE_DEALS = {
+    0: "cbcc1db2e817232a",
+    1: "aa1ba1cadaf5aa35",
+    2: "0ac64e9cbacac013",
+    3: "aca39e02ffe6ebf2",
+    4: "37a2639a97da49cf"
+}
+
+def _new_game(seed):
+    game = TerraformingMars(seed=seed)
+    game.setup_game(PLAYERS)
+    return game
+
+def _play(seed, turns, check=None):
+    game, agent = _new_game(seed), random.Random(seed)
+    for turn in range(turns):
+        player_id = game.current_turn % len(PLAYERS)
+        game.execute_action(player_id, agent.choice(game.get_available_actions(player_id)))
+        if turn < turns - 1:
+            game.advance_turn()
+        if check:
+            check(game)
+    return game
+
+def _check_cards(game):
+    # Every copy of every card is in exactly one hand, tableau or pile.
+    places = list(game.deck) + list(game.discard_pile)
+    for player in game.players:
+        places += player["cards"] + player["played_cards"]
+    assert sorted(places) == sorted(list(range(len(CATALOG))) * CARD_COPIES)
+
+def _digest(game):
+    state = json.dumps(game.get_game_state(), sort_keys=True)
+    return hashlib.sha256(state.encode()).hexdigest()[:16]
+
+def test_catalog_matches_the_card_data():
+    for code, (card, data) in enumerate(zip(CATALOG, CARD_DATA)):
+        assert card.code == code and CARD_INDEX[data["id"]] == code
+        assert (card.id, card.name, card.cost) == (data["id"], data["name"], data["cost"])
+        assert card.tag_mask == sum(TAG_BITS[tag] for tag in set(data["tags"]))
+        assert card.discount == 2 * data["tags"].count("building") + 3 * data["tags"].count("space")
+
+def test_hands_are_codes_and_the_view_is_dicts():
+    game = _new_game(1)
+    for player, view in zip(game.players, game.get_game_state()["players"]):
+        assert len(player["cards"]) == len(set(player["cards"])) == 10
+        assert all(isinstance(code, int) for code in player["cards"])
+        assert view["cards"] == [CARD_DATA[code] for code in player["cards"]]
+
+def _owed(player, data):
+    # Steel pays 2 MC of a building tag, titanium 3 MC of a space tag
+    steel = min(player["steel"], data["tags"].count("building"))
+    titanium = min(player["titanium"], data["tags"].count("space"))
+    return data["cost"] - 2 * steel - 3 * titanium, steel, titanium
+
+def _random_player(rng):
+    game = _new_game(rng.randrange(1000))
+    player = game.players[0]
+    player["megacredits"] = rng.randrange(30)
+    player["steel"], player["titanium"] = rng.randrange(3), rng.randrange(3)
+    player["cards"] += rng.sample([code for code in range(len(CATALOG)) if code not in player["cards"]], 3)
+    return game, player
+
+def test_offers_use_the_price_actually_paid():
+    rng = random.Random(2)
+    for _ in range(200):
+        game, player = _random_player(rng)
+        expected = [f"play_{CARD_DATA[code]['id']}" for code in player["cards"]
+                    if player["megacredits"] >= _owed(player, CARD_DATA[code])[0]]
+        projects = [p["id"] for p in STANDARD_PROJECTS if player["megacredits"] >= p["cost"]]
+
+        actions = [action["id"] for action in game.get_available_actions(0)]
+        assert actions == expected + projects + ["pass"]
+
+def test_offered_cards_can_be_paid_for():
+    rng = random.Random(3)
+    for _ in range(200):
+        game, player = _random_player(rng)
+        for action in game.get_available_actions(0):
+            if action["type"] != "play_card":
+                continue
+            trial = copy.deepcopy(game)
+            payer = trial.players[0]
+            owed, steel, titanium = _owed(payer, action["card"])
+            assert trial.execute_action(0, action)["success"], action["id"]
+            assert (payer["megacredits"], payer["steel"], payer["titanium"]) == \
+                   (player["megacredits"] - owed, player["steel"] - steel, player["titanium"] - titanium)
+
+def test_cards_are_played_by_code_or_id():
+    game = _new_game(3)
+    player = game.players[0]
+    player["megacredits"] = 200
+    first, second = player["cards"][:2]
+
+    assert game.execute_action(0, {"type": "play_card", "card_id": first})["success"]
+    assert game.execute_action(0, {"type": "play_card", "card": {"id": CATALOG[second].id}})["success"]
+    assert player["played_cards"] == [first, second]
+    assert player["megacredits"] == 200 - CATALOG[first].cost - CATALOG[second].cost
+    assert game.get_game_state()["players"][0]["played_cards"] == [CARD_DATA[first], CARD_DATA[second]]
+
+    assert game.execute_action(0, {"type": "play_card", "card_id": first}) == \
+           {"success": False, "error": "Card not in hand"}
+    assert game.execute_action(0, {"type": "play_card", "card_id": len(CATALOG)})["success"] is False
+
+def test_card_effects_apply():
+    game = _new_game(4)
+    player = game.players[0]
+    player["megacredits"], player["cards"] = 100, [CARD_INDEX["comet"]]
+    result = game.execute_action(0, {"type": "play_card", "card_id": CARD_INDEX["comet"]})
+    assert result["effects"] == ["Temperature +2", "Ocean +1"]
+    assert game.global_parameters["temperature"] == -28 and game.global_parameters["oceans"] == 1
+    assert player["terraform_rating"] == 22
+
+def test_seeded_deals_match_the_dict_engine():
+    for seed, digest in DICT_ENGINE_DEALS.items():
+        assert _digest(_new_game(seed)) == digest, seed
+        assert TerraformingMars.RULES_VERSION == 2
+
+def test_cards_are_conserved():
+    for seed in range(20):
+        _check_cards(_play(seed, 200, check=_check_cards))
+
+def test_research_draws_from_the_pile():
+    game = _new_game(5)
+    assert len(game.deck) == len(CATALOG) * CARD_COPIES - 10 * len(PLAYERS)
+    for _ in range(len(PLAYERS)):
+        game.advance_turn()
+    assert [len(player["cards"]) for player in game.players] == [14] * len(PLAYERS)
+    assert len(game.deck) == len(CATALOG) * CARD_COPIES - 14 * len(PLAYERS)
+
+    # Once the pile and the discards are empty, research draws nothing more.
+    for _ in range(3 * len(PLAYERS)):
+        game.advance_turn()
+    assert game.deck == [] and game.discard_pile == []
+    assert sum(len(player["cards"]) for player in game.players) == len(CATALOG) * CARD_COPIES
+    _check_cards(game)
+
+def test_sold_patents_are_reshuffled_into_the_pile():
+    game = _new_game(6)
+    player = game.players[0]
+    game.deck, oldest = [], player["cards"][0]
+    money = player["megacredits"]
+
+    result = game.execute_action(0, {"id": "sell_patents", "type": "standard_project", "cost": 0})
+    assert result["effects"] == [f"Sold {CATALOG[oldest].name} for 1 MC"]
+    assert game.discard_pile == [oldest] and player["megacredits"] == money + 1
+
+    assert game._draw_cards(4) == [oldest]
+    assert game.deck == [] and game.discard_pile == []
+
+def test_copies_in_hand_share_an_action():
+    game = _new_game(7)
+    player = game.players[0]
+    player["megacredits"], player["cards"] = 100, [CARD_INDEX["mine"]] * 2 + [CARD_INDEX["fish"]]
+    plays = [action["id"] for action in game.get_available_actions(0) if action["type"] == "play_card"]
+    assert plays == ["play_mine", "play_fish"]
+    assert game.execute_action(0, {"type": "play_card", "card_id": CARD_INDEX["mine"]})["success"]
+    assert player["cards"] == [CARD_INDEX["mine"], CARD_INDEX["fish"]]
+
+def test_same_seed_plays_the_same_game():
+    for seed in range(5):
+        assert _digest(_play(seed, 40)) == _digest(_play(seed, 40))
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
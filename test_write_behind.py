@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database.game_state import GameStateDatabase
+from database.write_behind import WriteBehindQueue
+
+def _queue(window=0.2):
+    db = GameStateDatabase()
+    return db, WriteBehindQueue(db, window=window)
+
+def test_coalesced_saves_write_the_state_once():
+    db, persistence = _queue(window=5)
+    persistence.start_action_log("g", "dune", 1, [], 1)
+    state = {"turn": 0, "spice": 0}
+    for turn in range(5):
+        persistence.record_action("g", 0, {"id": f"move{turn}"}, decision={"chosen": turn, "turn": turn})
+        state["turn"], state["spice"] = turn + 1, 10 * (turn + 1)
+        persistence.save("g", "dune", state)
+    persistence.close()
+
+    history = db.get_game_history("g")
+    assert [entry["state"] for entry in history] == [{"turn": 5, "spice": 50}]
+    assert all("decision" not in entry for entry in history)
+
+    # Each decision sits on the action it chose, in the order they were made.
+    assert json.loads(db.export_decisions()) == [
+        {"game_name": "dune", "decision": {"chosen": turn, "turn": turn}} for turn in range(5)
+    ]
+    assert [action["id"] for _, _, action in db.iter_actions("g")] == [f"move{turn}" for turn in range(5)]
+
+def test_states_are_copied_when_queued():
+    db, persistence = _queue(window=5)
+    state = {"turn": 1, "board": {"spice": 3}}
+    persistence.save("g", "dune", state)
+    # The engine object moves on, or is swapped out, before the worker runs.
+    state["board"]["spice"] = 99
+    state["turn"] = 7
+    persistence.close()
+    assert db.load_game_state("g") == {"turn": 1, "board": {"spice": 3}}
+
+def test_flush_times_out_behind_a_slow_write():
+    db, persistence = _queue(window=0)
+    release = threading.Event()
+    persistence.submit(release.wait)
+    assert persistence.flush(timeout=0.05) is False
+    release.set()
+    assert persistence.flush(timeout=5) is True and persistence.pending() == 0
+    persistence.close()
+
+def test_flush_ignores_writes_queued_after_it():
+    db, persistence = _queue(window=0)
+    first, second = threading.Event(), threading.Event()
+    persistence.submit(first.wait)
+
+    def keep_writing():
+        time.sleep(0.05)
+        persistence.submit(second.wait)
+        first.set()
+
+    threading.Thread(target=keep_writing).start()
+    assert persistence.flush(timeout=5) is True
+    assert persistence.pending() == 1
+    second.set()
+    persistence.close()
+
+def test_legacy_history_decisions_are_still_exported():
+    db = GameStateDatabase()
+    db.save_game_state("old", "catan", {"turn": 0})
+    db._conn.execute("UPDATE history SET decision = ? WHERE game_id = 'old'", (json.dumps({"chosen": 1}),))
+    db.start_action_log("new", "catan", 1, [], 1)
+    db.record_action("new", 0, {"id": "pass"}, {"chosen": 2})
+    assert [record["decision"]["chosen"] for record in json.loads(db.export_decisions("catan"))] == [2, 1]
+    db.close()
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")